@@ -10,6 +10,7 @@ setup(
         'boto3',
         'python-dotenv',
         'reportlab',
+        'pypdf',
         'Pillow',
         'fastmcp'
     ]
@@ -1,6 +1,18 @@
-import boto3
+import logging
 import os
+import re
+import threading
 from dotenv import load_dotenv
+from src.config.aws_clients import get_client
+from src.config.aws_config import METRICS_CONFIG, OFFLINE_CONFIG
+from src.config.prompts import SESSION_RECAP_PROMPT
+from src.services.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from src.services.metrics_service import METRICS
+from src.services.rate_limiter import get_rate_limiter
+
+
+# Session used when no game session has been started
+DEFAULT_SESSION_ID = "default-session"
 
 
 class BedrockAgent:
@@ -9,6 +21,10 @@ class BedrockAgent:
     
     This class handles communication with the AWS Bedrock Agent service,
     allowing the application to send prompts and receive AI-generated responses.
+    Each game gets its own agent session, which is rotated once it has
+    served a configured number of turns so its memory stays small. The
+    first turn of a rotated session is prefixed with a recap of the story,
+    taken from the optional `recap_provider`.
     """
     
     def __init__(self):
@@ -19,10 +35,26 @@ class BedrockAgent:
         the Bedrock Agent client.
         """
         load_dotenv()
+        self.logger = logging.getLogger(__name__)
         self._validate_env_vars()
         self.agent_id = os.getenv('BEDROCK_AGENT_ID')
         self.agent_alias_id = os.getenv('BEDROCK_AGENT_ALIAS_ID')
+        # Ask the agent to stream the final response token by token instead of as one chunk
+        self.stream_final_response = os.getenv('BEDROCK_AGENT_STREAM_FINAL_RESPONSE', 'false').lower() == 'true'
         self.client = self._connect_to_bedrock()
+        # Agent invocations share one bucket and one circuit breaker per agent across all sessions
+        self.rate_limiter = get_rate_limiter(f"agent/{self.agent_id}")
+        self.circuit_breaker = get_circuit_breaker(f"agent/{self.agent_id}")
+        # Agent session of the current game
+        self.max_session_turns = int(os.getenv('BEDROCK_AGENT_MAX_SESSION_TURNS', '40'))
+        self.session_base_id = None
+        self.session_generation = 0
+        self.session_turns = 0
+        self._session_lock = threading.Lock()
+        self._calls_in_flight = 0  # Calls currently running on the game session
+        # Callable returning the story so far, carried into rotated sessions
+        self.recap_provider = None
+        self._recap_pending = False
     
     def _validate_env_vars(self):
         """
@@ -31,6 +63,9 @@ class BedrockAgent:
         Raises:
             ValueError: If any required environment variables are missing
         """
+        if OFFLINE_CONFIG['enabled']:
+            # The offline stand-in accepts any agent
+            return
         required_vars = ['AWS_REGION', 'BEDROCK_AGENT_ID', 'BEDROCK_AGENT_ALIAS_ID']
         missing = [var for var in required_vars if not os.getenv(var)]
         if missing:
@@ -38,35 +73,287 @@ class BedrockAgent:
     
     def _connect_to_bedrock(self):
         """
-        Create and return a boto3 client for the Bedrock Agent runtime.
+        Return the process-wide boto3 client for the Bedrock Agent runtime.
         
         Returns:
             boto3.client: Configured Bedrock Agent runtime client
         """
-        return boto3.client(
-            service_name='bedrock-agent-runtime',
-            region_name=os.getenv('AWS_REGION')
-        )
+        return get_client('bedrock-agent-runtime')
     
-    def get_response(self, prompt, session_id="default-session"):
+    @property
+    def session_id(self):
         """
-        Send a prompt to the Bedrock Agent and get a response.
+        Get the agent session identifier of the current game.
+        
+        Returns:
+            str: The session id, or the shared default session if no game session was started
+        """
+        if self.session_base_id is None:
+            return DEFAULT_SESSION_ID
+        return f"{self.session_base_id}-{self.session_generation}"
+    
+    def start_session(self, base_id):
+        """
+        Start a dedicated agent session for a game.
+        
+        Args:
+            base_id (str): Identifier of the game, e.g. the character id
+            
+        Returns:
+            str: The new session id
+        """
+        with self._session_lock:
+            # Session ids only allow [0-9a-zA-Z._:-] and are limited to 100 characters
+            self.session_base_id = re.sub(r'[^0-9a-zA-Z._:-]', '-', str(base_id))[:90]
+            self.session_generation = 0
+            self.session_turns = 0
+            self._recap_pending = False
+            return self.session_id
+    
+    def session_state(self):
+        """
+        Get the agent session of the current game, to continue it in another process.
+        
+        Returns:
+            dict: The base id, generation and turn count of the session
+        """
+        with self._session_lock:
+            return {
+                'base_id': self.session_base_id,
+                'generation': self.session_generation,
+                'turns': self.session_turns
+            }
+    
+    def resume_session(self, base_id, generation, turns):
+        """
+        Continue an agent session started in another process.
+        
+        Args:
+            base_id (str): Base id of the session, as returned by session_state()
+            generation (int): Number of rotations of the session
+            turns (int): Turns already served by the current generation
+        """
+        with self._session_lock:
+            self.session_base_id = base_id
+            self.session_generation = generation
+            self.session_turns = turns
+            self._recap_pending = False
+    
+    def end_session(self, session_id=None):
+        """
+        End an agent session so Bedrock releases its memory.
+        
+        Ending is best effort: failures are logged and otherwise ignored.
+        
+        Args:
+            session_id (str): The session to end, defaults to the current game session
+        """
+        if session_id is None:
+            with self._session_lock:
+                session_id = self.session_id
+        if session_id == DEFAULT_SESSION_ID:
+            return
+        try:
+            response = self.client.invoke_agent(
+                agentId=self.agent_id,
+                agentAliasId=self.agent_alias_id,
+                sessionId=session_id,
+                endSession=True
+            )
+            # Drain the stream so the request completes
+            for _ in response['completion']:
+                pass
+        except Exception as e:
+            self.logger.warning(f"Error ending agent session {session_id}: {str(e)}", exc_info=True)
+    
+    def _advance_generation(self):
+        """
+        Switch the game to a fresh agent session; the caller holds the session lock.
+        
+        Returns:
+            str: The id of the session left behind
+        """
+        previous_session_id = self.session_id
+        self.session_generation += 1
+        self.session_turns = 0
+        self._recap_pending = self.recap_provider is not None
+        return previous_session_id
+    
+    def rotate_session(self):
+        """
+        End the current agent session and continue the game in a fresh one.
+        
+        Returns:
+            str: The new session id
+        """
+        with self._session_lock:
+            previous_session_id = self._advance_generation()
+            session_id = self.session_id
+        self.end_session(previous_session_id)
+        return session_id
+    
+    def begin_turn(self):
+        """
+        Count a player turn (or the launch) in the game session, rotating it first if it is full.
+        
+        Only turns are counted: suggestions and other background calls share
+        the session without using it up. A full session is not rotated while
+        a call is still running on it; the rotation waits for a later turn.
+        Retries of a turn must reuse the returned session id.
+        
+        Returns:
+            str: The session id to use for the turn
+        """
+        previous_session_id = None
+        with self._session_lock:
+            if self.session_base_id is None:
+                return DEFAULT_SESSION_ID
+            full = self.max_session_turns and self.session_turns >= self.max_session_turns
+            if full and not self._calls_in_flight:
+                previous_session_id = self._advance_generation()
+            self.session_turns += 1
+            session_id = self.session_id
+        if previous_session_id:
+            self.end_session(previous_session_id)
+        return session_id
+    
+    def _with_recap(self, prompt):
+        """
+        Prefix the first prompt of a rotated session with the story so far.
+        
+        Args:
+            prompt (str): The text prompt of the turn
+            
+        Returns:
+            str: The prompt, with the recap if the session was just rotated
+        """
+        with self._session_lock:
+            if not self._recap_pending:
+                return prompt
+            self._recap_pending = False
+        try:
+            context = self.recap_provider()
+        except Exception as e:
+            self.logger.warning(f"Error building session recap: {str(e)}", exc_info=True)
+            return prompt
+        if not context:
+            return prompt
+        return SESSION_RECAP_PROMPT.format(context=context, prompt=prompt)
+    
+    @staticmethod
+    def _trace_usage(trace_event):
+        """
+        Extract the token usage of a model invocation from an agent trace event.
+        
+        Args:
+            trace_event (dict): The 'trace' part of an invoke_agent event
+            
+        Returns:
+            tuple: (input_tokens, output_tokens), zeros if the event has no usage
+        """
+        for step in trace_event.get('trace', {}).values():
+            if isinstance(step, dict):
+                usage = step.get('modelInvocationOutput', {}).get('metadata', {}).get('usage')
+                if usage:
+                    return usage.get('inputTokens', 0), usage.get('outputTokens', 0)
+        return 0, 0
+    
+    def stream_response(self, prompt, session_id=None):
+        """
+        Send a prompt to the Bedrock Agent and yield the response as it arrives.
+        
+        Args:
+            prompt (str): The text prompt to send to the agent
+            session_id (str): Session identifier for conversation context,
+                defaults to the current game session without counting a turn
+                (see begin_turn)
+            
+        Yields:
+            str: Successive text deltas of the agent's response
+            
+        Raises:
+            CircuitOpenError: If the agent keeps failing and is not called for now
+        """
+        try:
+            self.circuit_breaker.check()
+        except CircuitOpenError:
+            METRICS.record_rejection("agent.invoke_agent")
+            raise
+        
+        with self._session_lock:
+            if session_id is None:
+                session_id = self.session_id
+            on_game_session = session_id != DEFAULT_SESSION_ID and session_id == self.session_id
+            if on_game_session:
+                self._calls_in_flight += 1
+        try:
+            if on_game_session:
+                prompt = self._with_recap(prompt)
+            yield from self._invoke(prompt, session_id)
+        finally:
+            if on_game_session:
+                with self._session_lock:
+                    self._calls_in_flight -= 1
+    
+    def _invoke(self, prompt, session_id):
+        """
+        Invoke the agent on a session and yield the response as it arrives.
         
         Args:
             prompt (str): The text prompt to send to the agent
             session_id (str): Session identifier for conversation context
             
+        Yields:
+            str: Successive text deltas of the agent's response
+        """
+        request = {
+            'agentId': self.agent_id,
+            'agentAliasId': self.agent_alias_id,
+            'sessionId': session_id,
+            'inputText': prompt
+        }
+        if self.stream_final_response:
+            request['streamingConfigurations'] = {'streamFinalResponse': True}
+        if METRICS_CONFIG['agent_traces']:
+            request['enableTrace'] = True
+        
+        self.rate_limiter.acquire()
+        span = METRICS.start_span("agent.invoke_agent")
+        span.add_input(len(prompt.encode('utf-8')))
+        try:
+            with METRICS.activate(span):
+                response = self.client.invoke_agent(**request)
+            
+            for event in response['completion']:
+                if event.get('chunk'):
+                    data = event['chunk']['bytes']
+                    text = data.decode()
+                    if text:
+                        span.first_chunk()
+                        span.add_output(len(data))
+                        yield text
+                elif event.get('trace'):
+                    span.add_tokens(*self._trace_usage(event['trace']))
+        except Exception as e:
+            self.circuit_breaker.record_failure(e)
+            span.finish(e)
+            raise
+        else:
+            self.circuit_breaker.record_success()
+        finally:
+            span.finish()
+    
+    def get_response(self, prompt, session_id=None):
+        """
+        Send a prompt to the Bedrock Agent and get a response.
+        
+        Args:
+            prompt (str): The text prompt to send to the agent
+            session_id (str): Session identifier for conversation context,
+                defaults to the current game session
+            
         Returns:
-            str: The agent's response text, or None if no response
-        """
-        response = self.client.invoke_agent(
-            agentId=self.agent_id,
-            agentAliasId=self.agent_alias_id,
-            sessionId=session_id,
-            inputText=prompt
-        )
-        
-        for event in response['completion']:
-            if event.get('chunk'):
-                return event['chunk']['bytes'].decode()
-        return None 
\ No newline at end of file
+            str: The agent's full response text, or None if no response
+        """
+        response = "".join(self.stream_response(prompt, session_id=session_id))
+        return response or None
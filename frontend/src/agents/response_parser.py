@@ -0,0 +1,143 @@
+import re
+from src.config.prompts import SUGGESTIONS_DELIMITER
+
+
+def parse_suggestions(text):
+    """
+    Extract the numbered action suggestions from an agent response.
+
+    Args:
+        text (str): Text containing a numbered list of suggestions
+
+    Returns:
+        list: Up to 3 suggestions, or an empty list if none could be extracted
+    """
+    suggestions = re.findall(r'\d+\.\s+(.*?)(?=\n\s*\d+\.|\Z)', text or "", re.DOTALL)
+
+    # Clean up suggestions
+    suggestions = [s.strip() for s in suggestions if s.strip()]
+    return suggestions[:3]  # Limit to 3 suggestions
+
+
+class SuggestionStreamParser:
+    """
+    Streaming parser for combined turn responses.
+
+    A combined response holds the narrative, then SUGGESTIONS_DELIMITER,
+    then the numbered suggestions. The parser passes the narrative through
+    as it streams, holding back only text that could be the start of the
+    delimiter, and collects everything after the delimiter as suggestions.
+    """
+
+    def __init__(self, delimiter=SUGGESTIONS_DELIMITER):
+        """
+        Initialize the parser.
+
+        Args:
+            delimiter (str): Marker separating the narrative from the suggestions
+        """
+        self.delimiter = delimiter
+        self._marker = delimiter.lower()
+        self._buffer = ""
+        self._suggestions_text = ""
+        self._in_suggestions = False
+        self.narrative = ""
+
+    def _held_back_length(self):
+        """
+        Get the length of the buffer tail that could still become the delimiter.
+
+        Returns:
+            int: Number of trailing characters to keep buffered
+        """
+        lowered = self._buffer.lower()
+        for length in range(min(len(self._marker) - 1, len(lowered)), 0, -1):
+            if self._marker.startswith(lowered[-length:]):
+                return length
+        return 0
+
+    def feed(self, delta):
+        """
+        Consume a text delta of the response.
+
+        Args:
+            delta (str): The next piece of the response
+
+        Returns:
+            str: Narrative text that can be displayed now, possibly empty
+        """
+        if self._in_suggestions:
+            self._suggestions_text += delta
+            return ""
+
+        self._buffer += delta
+        position = self._buffer.lower().find(self._marker)
+        if position >= 0:
+            text = self._buffer[:position]
+            self._suggestions_text = self._buffer[position + len(self._marker):]
+            self._buffer = ""
+            self._in_suggestions = True
+        else:
+            held_back = self._held_back_length()
+            split = len(self._buffer) - held_back
+            text = self._buffer[:split]
+            self._buffer = self._buffer[split:]
+
+        self.narrative += text
+        return text
+
+    def finish(self):
+        """
+        Flush the text held back once the response is complete.
+
+        Returns:
+            str: Remaining narrative text, possibly empty
+        """
+        text = self._buffer
+        self._buffer = ""
+        self.narrative += text
+        return text
+
+    def stream(self, deltas):
+        """
+        Wrap a stream of response deltas, yielding only the narrative.
+
+        Args:
+            deltas (Iterator[str]): Text deltas of a combined response
+
+        Yields:
+            str: Narrative text deltas
+        """
+        for delta in deltas:
+            text = self.feed(delta)
+            if text:
+                yield text
+        text = self.finish()
+        if text:
+            yield text
+
+    @property
+    def suggestions(self):
+        """
+        Get the suggestions found after the delimiter.
+
+        Returns:
+            list: Up to 3 suggestions, or an empty list if the response had none
+        """
+        return parse_suggestions(self._suggestions_text)
+
+    @classmethod
+    def split(cls, text):
+        """
+        Split a complete combined response.
+
+        Args:
+            text (str): The full response text
+
+        Returns:
+            tuple: (narrative, suggestions)
+        """
+        parser = cls()
+        parser.feed(text or "")
+        parser.finish()
+        return parser.narrative.strip(), parser.suggestions
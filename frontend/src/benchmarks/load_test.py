@@ -0,0 +1,356 @@
+"""
+Multi-player load test and per-turn benchmark of the Game Master app.
+
+Plays many games at once in a single process, each player an asyncio task
+driving its own headless GameSession against the offline stand-in backends:
+character creation, the launch prompt, turns typed in the chat, suggestion
+clicks and saves. As in the app, the sessions share the process-wide
+worker pools, rate limiters, circuit breakers and caches, so the results
+include their contention. After each of their turns, a sample of the
+players also have their game rendered by the Streamlit script through
+AppTest, to time the reruns of the page. Results are printed (or written)
+as JSON so they can be compared between releases.
+
+Usage:
+    python -m src.benchmarks.load_test --players 8 --turns 5 --output bench.json
+"""
+import os
+
+# The stand-ins must be selected before any application module reads its configuration
+os.environ.setdefault('BACKEND_MODE', 'offline')
+os.environ.setdefault('OFFLINE_SEED', '42')
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import platform
+import resource
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.testing.v1 import AppTest
+from src.config.aws_config import OFFLINE_CONFIG
+from src.engine.game_session import GameSession
+from src.services.metrics_service import METRICS
+from src.services.suggestion_service import LocalSuggestionEngine
+
+
+APP_SCRIPT = os.path.join(os.path.dirname(__file__), '..', '..', 'app.py')
+
+ACTIONS = [
+    "I look around carefully",
+    "I ask the nearest person what happened here",
+    "I draw my weapon and move forward",
+    "I search for hidden passages",
+    "I rest and tend to my wounds"
+]
+
+
+def _rss_bytes():
+    """
+    Get the resident memory of the process.
+
+    Returns:
+        int: Resident set size in bytes (peak size where the current one is unavailable)
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _percentiles(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    summary = {f"p{q}": round(ordered[min(last, int(round(q / 100 * last)))], 4) for q in (50, 95, 99)}
+    summary['mean'] = round(sum(ordered) / len(ordered), 4)
+    summary['count'] = len(ordered)
+    return summary
+
+
+class PlayerSession:
+    """
+    One simulated player, driving a game session the way the app does.
+    """
+
+    def __init__(self, player, turns, timeout, renders=0, render_executor=None):
+        """
+        Initialize the player.
+
+        Args:
+            player (int): Number of the simulated player
+            turns (int): Number of turns played after the launch prompt
+            timeout (float): Maximum duration of a single step in seconds
+            renders (int): Reruns of the page timed after each turn, none by default
+            render_executor (ThreadPoolExecutor): Single thread running the page reruns
+        """
+        self.player = player
+        self.turns = turns
+        self.timeout = timeout
+        self.renders = renders
+        self.render_executor = render_executor
+        self.game = GameSession()
+        self.at = None  # Page of the game, on its first render
+        self.phases = {}  # phase name -> latencies in seconds
+
+    def _record(self, phase, started_at):
+        self.phases.setdefault(phase, []).append(time.perf_counter() - started_at)
+
+    async def _timed(self, phase, step):
+        """
+        Run a step of the game and record how long it took.
+
+        Args:
+            phase (str): Name of the phase
+            step (Awaitable): The step
+
+        Returns:
+            The result of the step
+        """
+        started_at = time.perf_counter()
+        result = await asyncio.wait_for(step, self.timeout)
+        self._record(phase, started_at)
+        return result
+
+    async def _play_turn(self, phase, action):
+        """
+        Play a turn and read its whole response, as the chat renders it.
+
+        Args:
+            phase (str): Name of the phase
+            action (str): The player's input
+        """
+        started_at = time.perf_counter()
+        stream = await asyncio.wait_for(self.game.start_turn(action), self.timeout)
+        if stream is None:
+            raise RuntimeError(f"{phase}: empty response")
+        first_delta = True
+        async for _ in stream:
+            if first_delta:
+                self._record('first_delta', started_at)
+                first_delta = False
+        self._record(phase, started_at)
+
+    def _render_page(self):
+        """
+        Rerun the Streamlit script on the game, as a widget or polling fragment would.
+
+        Runs on the render thread: AppTest swaps process-wide Streamlit
+        state on every run, so pages are rendered one at a time.
+        """
+        if self.at is None:
+            # The session state is seeded outside a script run, which Streamlit warns about
+            logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').setLevel(logging.ERROR)
+            self.at = AppTest.from_file(APP_SCRIPT, default_timeout=self.timeout)
+            self.at.session_state['game'] = self.game
+            self.at.session_state['character_created'] = True
+            self.at.session_state['current_page'] = 'game'
+            phase, runs = 'first_render', [self.at.run] + [self.at.run] * self.renders
+        else:
+            phase, runs = 'render', [self.at.run] * self.renders
+        for run in runs:
+            started_at = time.perf_counter()
+            run()
+            self._record(phase, started_at)
+            phase = 'render'
+            if self.at.exception:
+                raise RuntimeError(f"render: {self.at.exception[0].message}")
+
+    async def _render(self):
+        """
+        Time the reruns of the page, if this player is sampled, while the other games go on.
+        """
+        if self.renders:
+            await asyncio.get_running_loop().run_in_executor(self.render_executor, self._render_page)
+
+    async def play(self):
+        """
+        Play one game from character creation to the last save.
+
+        Returns:
+            dict: Phase latencies and session size of the player
+        """
+        game = self.game
+        character = {
+            'character_id': str(uuid.uuid4()),
+            'name': f"player{self.player}",
+            'race': "Human",
+            'class': ["Fighter", "Wizard", "Rogue", "Ranger"][self.player % 4],
+            'gender': "Female",
+            'Intelligence': 10,
+            'Strength': 10,
+            'Dexterity': 10,
+            'Constitution': 10,
+            'Wisdom': 10,
+            'Charisma': 10
+        }
+        if not await self._timed('create_character', game.create_character(character)):
+            raise RuntimeError("create_character: the character was not created")
+        if not await self._timed('launch', game.launch()):
+            raise RuntimeError("launch: empty response")
+
+        for turn in range(self.turns):
+            # The player reads the scene while the agent suggestions arrive, then the page prefetches them
+            await self._timed('suggestions_ready', game.settle_suggestions())
+            game.prefetch_suggestion_responses()
+            if turn % 2:
+                # Click the first suggestion, from the agent or computed locally
+                suggestions = game.suggestions or LocalSuggestionEngine.FALLBACK_ACTIONS
+                await self._play_turn('suggestion_click', suggestions[0])
+            else:
+                await self._play_turn('turn', ACTIONS[(self.player + turn) % len(ACTIONS)])
+            await self._render()
+
+        started_at = time.perf_counter()
+        if not game.request_save():
+            raise RuntimeError("save_request: nothing to save")
+        self._record('save_request', started_at)
+        started_at = time.perf_counter()
+        while game.storage.is_saving():
+            if time.perf_counter() - started_at > self.timeout:
+                raise RuntimeError("save_complete: timed out")
+            await asyncio.sleep(0.05)
+        self._record('save_complete', started_at)
+        success, result = game.storage.last_save_result
+        if not success:
+            raise RuntimeError(f"save_complete: {result}")
+
+        session_bytes = sum(len(message['content'].encode('utf-8')) for message in game.messages)
+        session_bytes += game.generated_images.memory_bytes()
+        return {
+            'phases': self.phases,
+            'session_bytes': session_bytes
+        }
+
+
+class LoadTest:
+    """
+    Simulates players concurrently and aggregates their per-phase latencies.
+    """
+
+    def __init__(self, players, turns, timeout, render_players=0, renders=3):
+        """
+        Initialize the load test.
+
+        Args:
+            players (int): Number of simulated players, all playing at once
+            turns (int): Number of turns played by each player after the launch prompt
+            timeout (float): Maximum duration of a single step in seconds
+            render_players (int): Number of players whose page is rendered after each turn
+            renders (int): Reruns of the page timed after each turn of those players
+        """
+        self.players = players
+        self.turns = turns
+        self.timeout = timeout
+        self.render_players = min(render_players, players)
+        self.renders = renders
+
+    async def _play_all(self):
+        """
+        Play every game at once on the event loop.
+
+        Returns:
+            tuple: (results or exceptions by player, resident memory in bytes
+                held once every game is over and before they are released)
+        """
+        render_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+        sessions = [
+            PlayerSession(
+                player, self.turns, self.timeout,
+                self.renders if player < self.render_players else 0, render_executor
+            )
+            for player in range(self.players)
+        ]
+        results = await asyncio.gather(*(session.play() for session in sessions), return_exceptions=True)
+        render_executor.shutdown()
+        # Images are generated in the background, let them land before measuring the sessions
+        deadline = time.perf_counter() + self.timeout
+        while any(session.game.has_pending_images() for session in sessions) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        return results, _rss_bytes()
+
+    def run(self):
+        """
+        Run every player concurrently, as tasks of one event loop in this process.
+
+        Returns:
+            dict: The benchmark results
+        """
+        # Memory held before any game starts, imports included
+        rss_baseline = _rss_bytes()
+        started_at = time.perf_counter()
+        results, rss = asyncio.run(self._play_all())
+        wall_seconds = time.perf_counter() - started_at
+
+        phases = {}
+        errors = []
+        completed = []
+        for player, result in enumerate(results):
+            if isinstance(result, BaseException):
+                errors.append(f"player {player}: {type(result).__name__}: {str(result)}")
+                continue
+            completed.append(result)
+            for phase, samples in result['phases'].items():
+                phases.setdefault(phase, []).extend(samples)
+
+        completed_turns = len(phases.get('turn', [])) + len(phases.get('suggestion_click', []))
+        return {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'config': {
+                'players': self.players,
+                'turns': self.turns,
+                'render_players': self.render_players,
+                'renders': self.renders,
+                'backend_mode': 'offline' if OFFLINE_CONFIG['enabled'] else 'aws',
+                'latency_scale': OFFLINE_CONFIG['latency_scale'],
+                'throttle_rate': OFFLINE_CONFIG['throttle_rate'],
+                'error_rate': OFFLINE_CONFIG['error_rate']
+            },
+            'wall_seconds': round(wall_seconds, 3),
+            'throughput': {
+                'turns_per_second': round(completed_turns / wall_seconds, 3) if wall_seconds else None,
+                'completed_players': len(completed)
+            },
+            'phases_seconds': {phase: _percentiles(samples) for phase, samples in sorted(phases.items())},
+            'memory_bytes_per_session': {
+                # Growth of the whole process shared by the games, so pools, caches and rendered pages are included
+                'rss': round((rss - rss_baseline) / self.players),
+                'session_state': _percentiles([result['session_bytes'] for result in completed])
+            },
+            'backend_calls': METRICS.snapshot(),
+            'errors': errors
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Game Master app with simulated players")
+    parser.add_argument("--players", type=int, default=4, help="Number of players playing at once")
+    parser.add_argument("--turns", type=int, default=4, help="Turns per player after the launch prompt")
+    parser.add_argument("--timeout", type=float, default=120, help="Maximum duration of a step in seconds")
+    parser.add_argument("--render-players", type=int, default=2, help="Players whose page is rendered after each turn")
+    parser.add_argument("--renders", type=int, default=3, help="Timed reruns of the page after each of their turns")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    # Keep stdout for the results, whatever the services print on their error paths
+    with contextlib.redirect_stdout(sys.stderr):
+        results = LoadTest(args.players, args.turns, args.timeout, args.render_players, args.renders).run()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    # A regression check in CI should fail on errors
+    sys.exit(1 if results['errors'] else 0)
+
+
+if __name__ == "__main__":
+    main()
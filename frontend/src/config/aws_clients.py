@@ -0,0 +1,73 @@
+import threading
+import boto3
+from botocore.config import Config
+from src.config.aws_config import AWS_CONFIG, CLIENT_CONFIG, OFFLINE_CONFIG
+from src.services.metrics_service import instrument_client
+
+
+# Process-wide registry of boto3 clients, keyed by service and config overrides
+_clients = {}
+_clients_lock = threading.Lock()
+_session = None
+
+
+def _build_config(**overrides):
+    """
+    Build the botocore configuration shared by all clients.
+    
+    Args:
+        **overrides: botocore Config options that replace the defaults
+        
+    Returns:
+        Config: Client configuration with pooling, keep-alive and adaptive retries
+    """
+    options = {
+        'region_name': AWS_CONFIG['region'],
+        'max_pool_connections': CLIENT_CONFIG['max_pool_connections'],
+        'tcp_keepalive': True,
+        'connect_timeout': CLIENT_CONFIG['connect_timeout'],
+        'read_timeout': CLIENT_CONFIG['read_timeout'],
+        'retries': {
+            'max_attempts': CLIENT_CONFIG['max_attempts'],
+            'mode': CLIENT_CONFIG['retry_mode']
+        }
+    }
+    options.update(overrides)
+    return Config(**options)
+
+
+def get_client(service_name, **overrides):
+    """
+    Get the shared boto3 client for a service, creating it on first use.
+    
+    boto3 clients are thread-safe, so one client (and its connection pool)
+    serves every Streamlit session of the process. In offline mode, local
+    stand-ins with injected latency are returned instead.
+    
+    Args:
+        service_name (str): AWS service name, e.g. 'bedrock-runtime'
+        **overrides: botocore Config options specific to this client
+        
+    Returns:
+        botocore.client.BaseClient: The shared client
+    """
+    key = (service_name, tuple(sorted(overrides.items())))
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    
+    global _session
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if OFFLINE_CONFIG['enabled']:
+                from src.offline.clients import create_client
+                client = create_client(service_name)
+            else:
+                # boto3 sessions are not thread-safe, so clients are only created under the lock
+                if _session is None:
+                    _session = boto3.session.Session()
+                client = _session.client(service_name, config=_build_config(**overrides))
+                instrument_client(client)
+            _clients[key] = client
+        return client
@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -11,11 +12,164 @@ AWS_CONFIG = {
 
 # S3 bucket configuration for storing game sessions
 S3_CONFIG = {
-    'bucket_name': os.getenv('S3_BUCKET_NAME', 'dnd-genai-game-assets') # Default bucket name
+    'bucket_name': os.getenv('S3_BUCKET_NAME', 'dnd-genai-game-assets'), # Default bucket name
+    # Multipart upload settings for game saves
+    'multipart_threshold': int(os.getenv('S3_MULTIPART_THRESHOLD_MB', '8')) * 1024 * 1024,
+    'multipart_chunksize': int(os.getenv('S3_MULTIPART_CHUNKSIZE_MB', '8')) * 1024 * 1024,
+    'max_concurrency': int(os.getenv('S3_MAX_CONCURRENCY', '8')),
+    'save_debounce_seconds': float(os.getenv('SAVE_DEBOUNCE_SECONDS', '1.0'))
 }
 
 # DynamoDB configuration for storing character data
 DYNAMODB_CONFIG = {
     'table_name': os.getenv('DYNAMODB_TABLE_NAME', 'dnd-mcp-game-characters'),  # Default table name
     'region': AWS_CONFIG['region']  # Use the same region as general AWS config
-} 
\ No newline at end of file
+} 
+
+# Image prompt generation: 'local' condenses the text locally, 'llm' summarizes it with Claude (slower, higher quality)
+IMAGE_PROMPT_CONFIG = {
+    'mode': os.getenv('IMAGE_PROMPT_MODE', 'local')
+}
+
+# Local disk cache for generated images and image prompt summaries
+IMAGE_CACHE_CONFIG = {
+    'enabled': os.getenv('IMAGE_CACHE_ENABLED', 'true').lower() == 'true',
+    'image_dir': os.getenv('IMAGE_CACHE_DIR', '.cache/images'),
+    'image_max_bytes': int(os.getenv('IMAGE_CACHE_MAX_MB', '512')) * 1024 * 1024,
+    'summary_dir': os.getenv('SUMMARY_CACHE_DIR', '.cache/summaries'),
+    'summary_max_bytes': int(os.getenv('SUMMARY_CACHE_MAX_MB', '16')) * 1024 * 1024
+}
+
+# Nova Canvas resolution: lower values generate faster (multiples of 16, 320 to 4096 pixels)
+IMAGE_GENERATION_CONFIG = {
+    'width': int(os.getenv('IMAGE_WIDTH', '1024')),
+    'height': int(os.getenv('IMAGE_HEIGHT', '1024')),
+    # Nova Canvas answers in seconds; a hung call should fail (and count toward its circuit) quickly
+    'read_timeout': int(os.getenv('IMAGE_READ_TIMEOUT_SECONDS', '30'))
+}
+
+# Batch image generation (variants and storyboards)
+IMAGE_BATCH_CONFIG = {
+    'max_workers': int(os.getenv('IMAGE_BATCH_WORKERS', '4')),  # Whole process
+    'max_images_per_call': 5  # Nova Canvas limit for numberOfImages
+}
+
+# Per-session image store: thumbnails in memory, full-resolution originals spilled to disk
+IMAGE_STORE_CONFIG = {
+    'memory_max_bytes': int(os.getenv('IMAGE_STORE_MEMORY_MB', '8')) * 1024 * 1024,  # Per session
+    'thumbnail_size': int(os.getenv('IMAGE_THUMBNAIL_SIZE', '512')),
+    'thumbnail_format': os.getenv('IMAGE_THUMBNAIL_FORMAT', 'WEBP'),
+    'thumbnail_quality': int(os.getenv('IMAGE_THUMBNAIL_QUALITY', '80')),
+    'spill_dir': os.getenv('IMAGE_STORE_SPILL_DIR', '.cache/originals'),
+    'spill_max_bytes': int(os.getenv('IMAGE_STORE_SPILL_MAX_MB', '1024')) * 1024 * 1024
+}
+
+# Connection settings for the boto3 clients shared by every session
+CLIENT_CONFIG = {
+    'max_pool_connections': int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '50')),
+    'max_attempts': int(os.getenv('AWS_MAX_ATTEMPTS', '3')),
+    'retry_mode': os.getenv('AWS_RETRY_MODE', 'adaptive'),
+    'connect_timeout': int(os.getenv('AWS_CONNECT_TIMEOUT', '10')),
+    'read_timeout': int(os.getenv('AWS_READ_TIMEOUT', '60'))
+}
+
+# MCP server exposing the character tools backed by DynamoDB
+MCP_CONFIG = {
+    'characters_server_url': os.getenv('MCP_CHARACTERS_SERVER_URL', 'http://localhost:8081/sse'),
+    'timeout': float(os.getenv('MCP_TIMEOUT', '30'))
+}
+
+# Requests per second allowed for each Bedrock model (or agent), shared by every session
+RATE_LIMIT_CONFIG = {
+    'default_rps': float(os.getenv('BEDROCK_DEFAULT_RPS', '2.0')),
+    'model_rps': json.loads(os.getenv('BEDROCK_MODEL_RPS', '{}'))  # e.g. {"amazon.nova-canvas-v1:0": 0.5}
+}
+
+# Circuit breaker per Bedrock model (or agent): fail fast while it keeps failing instead of waiting on retries
+CIRCUIT_BREAKER_CONFIG = {
+    'enabled': os.getenv('CIRCUIT_BREAKER_ENABLED', 'true').lower() == 'true',
+    'failure_threshold': int(os.getenv('CIRCUIT_BREAKER_FAILURES', '5')),  # Consecutive failures that open it
+    'reset_seconds': float(os.getenv('CIRCUIT_BREAKER_RESET_SECONDS', '30'))  # Open time before a trial call
+}
+
+# Hedged model calls: a second attempt once a call is slower than the operation's p95, the first result wins
+HEDGING_CONFIG = {
+    # Opt-in (each hedge costs a call), e.g. "image.generate,image.summarize,memory.summarize"
+    'operations': [operation.strip() for operation in os.getenv('HEDGED_OPERATIONS', '').split(',') if operation.strip()],
+    'min_samples': int(os.getenv('HEDGE_MIN_SAMPLES', '20')),  # Latencies needed before the p95 is trusted
+    'default_delay_seconds': float(os.getenv('HEDGE_DEFAULT_DELAY_SECONDS', '5')),  # Until then
+    'max_per_minute': int(os.getenv('HEDGE_MAX_PER_MINUTE', '30'))  # Whole process
+}
+
+# Gameplay settings
+GAME_CONFIG = {
+    # 'combined' asks for the suggestions in the same agent call as the narrative, 'separate' uses a second call
+    'suggestion_mode': os.getenv('SUGGESTION_MODE', 'combined'),
+    # When suggestions need their own call: 'hybrid' shows local ones instantly and replaces them
+    # with the agent's, 'local' never calls the agent
+    'suggestion_engine': os.getenv('SUGGESTION_ENGINE', 'hybrid'),
+    # Number of latest messages always rendered; older ones are shown one page at a time on request
+    'history_window': int(os.getenv('CHAT_HISTORY_WINDOW', '10')),
+    'history_page_size': int(os.getenv('CHAT_HISTORY_PAGE_SIZE', '10'))
+}
+
+# Shared store of the live game sessions, so any app replica can pick up any player's game
+SESSION_STORE_CONFIG = {
+    # 'none' keeps games in the process only (sticky sessions), 'sqlite', 'file' or 'redis' share them
+    'backend': os.getenv('SESSION_STORE', 'none').lower(),
+    'url': os.getenv('SESSION_STORE_URL', ''),  # Database file, directory or redis:// URL
+    'flush_interval_seconds': float(os.getenv('SESSION_STORE_FLUSH_SECONDS', '0.5')),  # Write-behind delay
+    'ttl_seconds': int(os.getenv('SESSION_STORE_TTL_HOURS', '168')) * 3600
+}
+
+# Rolling memory of each game: a summary of older turns plus the latest turns verbatim
+MEMORY_CONFIG = {
+    # 'llm' summarizes with Claude in the background, 'local' keeps the opening sentence of each turn
+    'summarizer': os.getenv('MEMORY_SUMMARIZER', 'llm'),
+    'model_id': os.getenv('MEMORY_MODEL_ID', 'us.anthropic.claude-3-5-haiku-20241022-v1:0'),
+    'summarize_every': int(os.getenv('MEMORY_SUMMARIZE_EVERY', '4')),
+    'verbatim_turns': int(os.getenv('MEMORY_VERBATIM_TURNS', '3')),
+    'max_summary_chars': int(os.getenv('MEMORY_MAX_SUMMARY_CHARS', '1500')),
+    'max_turn_chars': int(os.getenv('MEMORY_MAX_TURN_CHARS', '1200'))
+}
+
+# Speculative prefetch of the agent's responses to the suggestion buttons (opt-in, costs agent calls)
+SPECULATION_CONFIG = {
+    'enabled': os.getenv('SPECULATIVE_PREFETCH', 'false').lower() == 'true',
+    'ttl_seconds': float(os.getenv('SPECULATION_TTL_SECONDS', '300')),
+    'max_per_minute': int(os.getenv('SPECULATION_MAX_PER_MINUTE', '30')),  # Whole process
+    'max_per_session_per_minute': int(os.getenv('SPECULATION_MAX_PER_SESSION_PER_MINUTE', '6')),
+    # Longest wait for an in-flight speculative call, lowered to the agent's p95 once it is measured
+    'max_wait_seconds': float(os.getenv('SPECULATION_MAX_WAIT_SECONDS', '15'))
+}
+
+# Latency and cost metrics of the Bedrock, S3 and MCP calls
+METRICS_CONFIG = {
+    'enabled': os.getenv('METRICS_ENABLED', 'true').lower() == 'true',
+    'sample_size': int(os.getenv('METRICS_SAMPLE_SIZE', '1024')),  # Recent latencies kept per operation
+    'prometheus_port': int(os.getenv('METRICS_PORT', '0')),  # Serves /metrics when set
+    'json_path': os.getenv('METRICS_JSON_PATH', ''),  # Periodic JSON dump when set
+    'json_interval_seconds': float(os.getenv('METRICS_JSON_INTERVAL_SECONDS', '60')),
+    'debug_panel': os.getenv('METRICS_DEBUG_PANEL', 'false').lower() == 'true',
+    # Ask the agent for traces, which carry token usage (larger responses)
+    'agent_traces': os.getenv('METRICS_AGENT_TRACES', 'false').lower() == 'true'
+}
+
+# Offline stand-ins for Bedrock, S3 and the MCP server, for reproducible benchmarks without AWS
+OFFLINE_CONFIG = {
+    'enabled': os.getenv('BACKEND_MODE', 'aws').lower() == 'offline',
+    # Latency by backend, as a log-normal distribution given by its median and p95 in milliseconds
+    'latency_ms': {
+        'bedrock-agent-runtime': {'median': 1500, 'p95': 4000},  # Until the first chunk
+        'bedrock-runtime': {'median': 3000, 'p95': 8000},
+        's3': {'median': 40, 'p95': 150},
+        'mcp': {'median': 30, 'p95': 120},
+        **json.loads(os.getenv('OFFLINE_LATENCY_MS', '{}'))  # e.g. {"s3": {"median": 10, "p95": 20}}
+    },
+    'chunk_delay_ms': float(os.getenv('OFFLINE_CHUNK_DELAY_MS', '20')),  # Between streamed agent chunks
+    'latency_scale': float(os.getenv('OFFLINE_LATENCY_SCALE', '1.0')),  # 0 removes all injected latency
+    'throttle_rate': float(os.getenv('OFFLINE_THROTTLE_RATE', '0.0')),  # Share of calls throttled
+    'error_rate': float(os.getenv('OFFLINE_ERROR_RATE', '0.0')),  # Share of calls failing
+    'seed': os.getenv('OFFLINE_SEED'),  # Makes injected latency and faults reproducible
+    's3_dir': os.getenv('OFFLINE_S3_DIR', '.offline/s3')
+}
@@ -30,6 +30,63 @@ Your suggestions should be varied and interesting, giving the player meaningful
 DO NOT include any explanations or additional text - ONLY the numbered list of 3 suggestions.
 """
 
+# Marker separating the narrative from the suggestions in a combined turn response
+SUGGESTIONS_DELIMITER = "[SUGGESTIONS]"
+
+# Appended to the player's input so a single agent call returns both the narrative and the next suggestions
+COMBINED_TURN_SUFFIX = """
+
+After your response, write the marker """ + SUGGESTIONS_DELIMITER + """ on its own line, followed by EXACTLY 3 short, specific actions (5-10 words each) that {player_name}, a {player_gender} {player_race} {player_class}, could take next.
+Format them as a numbered list, for example:
+""" + SUGGESTIONS_DELIMITER + """
+1. Investigate the strange noise
+2. Talk to the innkeeper about rumors
+3. Search for hidden treasures
+
+Do not write anything after the list, and never mention the marker or the list in your response."""
+
+# Prompt for a speculative turn, run on a throwaway agent session that has no memory of the game
+SPECULATIVE_TURN_PROMPT = """You are the game master of an ongoing fantasy role-playing game.
+The player's name is {player_name}, a {player_gender} {player_race} {player_class}.
+
+The story so far:
+{context}
+
+The player now does the following: {action}
+
+Continue the story from there, describing what happens next in no more than 150 words."""
+
+# Turns answered speculatively, folded into the next prompt sent on the game's real agent session
+SPECULATIVE_SYNC_PROMPT = """Since your last reply, the story went on as follows, and it is now part of the game:
+
+{turns}
+
+{prompt}"""
+
+# One turn answered speculatively, as listed in SPECULATIVE_SYNC_PROMPT
+SPECULATIVE_SYNC_TURN = """The player did the following: {action}
+This is what happened next:
+{response}"""
+
+# Prompt folding the latest turns into the rolling summary of a game
+MEMORY_SUMMARY_PROMPT = """You keep the memory of an ongoing fantasy role-playing game.
+
+Story so far:
+{summary}
+
+Latest turns:
+{turns}
+
+Rewrite the story so far to include the latest turns, in no more than {max_words} words.
+Keep the names of characters and places, open quests, items gained or lost and the player's important choices.
+Reply only with the summary."""
+
+# Prompt carrying the story into a fresh agent session after a rotation
+SESSION_RECAP_PROMPT = """We are continuing an ongoing game in which you are the game master. This is the story so far:
+{context}
+
+Continue the game from there. {prompt}"""
+
 
 class ImagePrompts:
     """
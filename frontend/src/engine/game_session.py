@@ -0,0 +1,654 @@
+import asyncio
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import EventStreamError
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
+from src.agents.bedrock_agent import BedrockAgent
+from src.agents.response_parser import SuggestionStreamParser
+from src.config.aws_config import GAME_CONFIG, SPECULATION_CONFIG
+from src.config.prompts import (
+    LAUNCH_PROMPT,
+    COMBINED_TURN_SUFFIX,
+    SPECULATIVE_TURN_PROMPT,
+    SPECULATIVE_SYNC_PROMPT,
+    SPECULATIVE_SYNC_TURN
+)
+from src.services.character_service import CharacterService
+from src.services.circuit_breaker import CircuitOpenError
+from src.services.image_job_service import ImageJobService
+from src.services.image_service import ImageService
+from src.services.image_store import ImageStore
+from src.services.memory_service import ConversationMemory
+from src.services.metrics_service import METRICS
+from src.services.session_store import get_session_store
+from src.services.speculation_service import SpeculationService
+from src.services.storage_service import StorageService
+from src.services.suggestion_service import AgentSuggestionEngine, LocalSuggestionEngine
+
+
+# Local suggestion engine, stateless and shared by every session
+LOCAL_SUGGESTIONS = LocalSuggestionEngine()
+
+# Shared worker pool for the independent Bedrock calls made after each turn
+TURN_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="turn")
+
+# Shared worker pool running the blocking SDK calls awaited by sessions
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="session-io")
+
+
+async def _run_blocking(func, *args):
+    """
+    Run a blocking call without blocking the event loop.
+
+    Args:
+        func (callable): The blocking function
+        *args: Arguments of the function
+
+    Returns:
+        The result of the function
+    """
+    return await asyncio.get_running_loop().run_in_executor(_IO_EXECUTOR, func, *args)
+
+
+class GameSession:
+    """
+    Headless engine of one player's game.
+
+    Holds the state of a game (character, messages, suggestions, images)
+    and orchestrates its turns: the launch prompt, the streamed agent
+    response, the image, the next suggestions and the saves. Calls that
+    wait on the network are coroutines, so a session can be driven by any
+    asyncio front end; work that is not waited on, like images and agent
+    suggestions, runs in the background and is polled.
+
+    With a shared session store, the state of the game is saved there
+    after every change and images are uploaded to S3 as they are made, so
+    any process can pick the game up from its id.
+    """
+
+    # Version of the state format saved in the session store
+    STATE_VERSION = 1
+
+    def __init__(self, agent=None, storage=None, image_service=None, game_id=None, store=None):
+        """
+        Initialize an empty game session.
+
+        Args:
+            agent (BedrockAgent): Agent of the game, a new one by default
+            storage (StorageService): Storage of the game, a new one by default
+            image_service (ImageService): Image generation of the game, a new one by default
+            game_id (str): Identifier of the game in the session store, a new one by default
+            store (SessionStore): Shared session store, the configured one by default
+        """
+        self.game_id = game_id or uuid.uuid4().hex
+        self.store = store or get_session_store()
+        self.revision = 0  # Increased by every change saved to the session store
+        # Image workers persist too, so revisions and their states must be taken in one step
+        self._persist_lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        self.agent = agent or BedrockAgent()
+        self.storage = storage or StorageService()
+        self.image_service = image_service or ImageService()
+        self.image_jobs = ImageJobService(self.image_service)
+        self.speculation = SpeculationService(self.agent)
+        self.memory = ConversationMemory()
+        # Rotated agent sessions start from the story so far
+        self.agent.recap_provider = self.memory.context
+        self.player_name = None
+        self.character = None
+        self.launched = False
+        self.messages = []
+        self.suggestions = []
+        self.suggestion_job = None  # Pending agent suggestions
+        self.speculative_turns = []  # (action, response) answered speculatively, not yet told to the agent
+        # Thumbnails by message index, originals spilled to disk (or reloaded from S3 once saved)
+        self.generated_images = ImageStore(fallback=self.storage.load_saved_image)
+        self.image_keys = {}  # S3 keys of saved images by message index, for resumed games
+
+    async def create_character(self, character):
+        """
+        Create a character through the shared MCP client connection and start its game.
+
+        Args:
+            character (dict): Character specifications
+
+        Returns:
+            bool: True if character creation was successful, False otherwise
+        """
+        try:
+            await _run_blocking(CharacterService.shared().create_character, character)
+        except Exception as tool_error:
+            self.logger.warning(f"createCharacter tool call error: {str(tool_error)}")
+            return False
+
+        self.player_name = character['name']
+        self.character = character
+        # Give the game its own agent session instead of the shared default one
+        self.agent.start_session(character['character_id'])
+        self.memory.restore([])
+        self._persist()
+        return True
+
+    async def resume(self, player_name):
+        """
+        Resume the last saved game of a player.
+
+        Args:
+            player_name (str): Name of the player
+
+        Returns:
+            bool: True if a saved game was found and restored
+
+        Saved images are downloaded in the background when they are requested.
+        """
+        snapshot = await _run_blocking(self.storage.load_game_session, player_name)
+        if not snapshot:
+            return False
+
+        character = snapshot['character']
+        self.player_name = snapshot['player_name']
+        self.character = character
+        self.messages = snapshot['messages']
+        self.suggestions = snapshot['suggestions']
+        self.suggestion_job = None
+        self.speculative_turns = []
+        self.generated_images.clear()
+        self.image_keys = snapshot['images']
+        self.image_jobs.reset()
+        self.image_service.set_character_info(character)
+        self.agent.start_session(character['character_id'])
+        self.memory.restore(snapshot['messages'])
+        self.launched = True
+        self._persist()
+        return True
+
+    def to_state(self):
+        """
+        Get the state of the game, to continue it in another process.
+
+        Returns:
+            dict: JSON-serializable state, with S3 keys in place of the images
+        """
+        return {
+            'version': self.STATE_VERSION,
+            'revision': self.revision,
+            'game_id': self.game_id,
+            'player_name': self.player_name,
+            'character': self.character,
+            'launched': self.launched,
+            'messages': list(self.messages),
+            'suggestions': list(self.suggestions),
+            'speculative_turns': [list(turn) for turn in self.speculative_turns],
+            'images': {str(index): key for index, key in list(self.storage.image_keys.items())},
+            'agent_session': self.agent.session_state(),
+            'memory': self.memory.state()
+        }
+
+    def restore_state(self, state):
+        """
+        Continue a game from its state, as saved by another process.
+
+        Args:
+            state (dict): State returned by to_state()
+
+        Raises:
+            ValueError: If the state was saved in another format version
+
+        Images are downloaded from S3 in the background when they are requested.
+        """
+        if state.get('version') != self.STATE_VERSION:
+            raise ValueError(f"Unsupported game state version {state.get('version')}, expected {self.STATE_VERSION}")
+        self.game_id = state['game_id']
+        self.revision = state.get('revision', 0)
+        self.player_name = state['player_name']
+        self.character = state['character']
+        self.launched = state['launched']
+        self.messages = state['messages']
+        self.suggestions = state['suggestions']
+        self.suggestion_job = None
+        self.speculative_turns = [tuple(turn) for turn in state.get('speculative_turns', [])]
+        self.generated_images.clear()
+        self.image_keys = {int(index): key for index, key in state['images'].items()}
+        self.storage.image_keys = dict(self.image_keys)
+        self.image_jobs.reset()
+        if self.character:
+            self.image_service.set_character_info(self.character)
+        self.agent.resume_session(**state['agent_session'])
+        self.memory.restore(self.messages, **state['memory'])
+
+    def _persist(self):
+        """
+        Queue the state of the game for the shared session store, if there is one.
+
+        Safe to call from the image workers: states reach the store in
+        revision order, so none is dropped as stale.
+        """
+        if self.store is None:
+            return
+        with self._persist_lock:
+            self.revision += 1
+            self.store.save(self.game_id, self.to_state())
+
+    async def launch(self):
+        """
+        Send the launch prompt and record the opening scene.
+
+        Returns:
+            str: The opening scene, or None if the agent returned nothing
+        """
+        character = self.character
+
+        # Set character info in the image service for consistent image generation
+        self.image_service.set_character_info(character)
+
+        launch_prompt = LAUNCH_PROMPT.format(
+            player_name=character['name'],
+            player_race=character['race'],
+            player_class=character['class'],
+            player_gender=character['gender']
+        )
+
+        response = await _run_blocking(
+            self.agent.get_response, self.turn_prompt(launch_prompt), self.agent.begin_turn()
+        )
+        suggestions = None
+        if response and self.combined_suggestions():
+            response, suggestions = SuggestionStreamParser.split(response)
+        if not response:
+            return None
+
+        self._record_response(response, suggestions)
+        self.launched = True
+        return response
+
+    async def start_turn(self, action):
+        """
+        Record the player's action and open the Game Master's response.
+
+        Args:
+            action (str): The player's input
+
+        Returns:
+            AsyncIterator[str]: Narrative deltas of the response, or None if
+                the agent returned nothing. The response is recorded, with its
+                image and the next suggestions, once the iterator is exhausted.
+
+        Raises:
+            EventStreamError: If the agent is still throttled after every retry
+            CircuitOpenError: If the agent keeps failing and is not called for now
+        """
+        context = self.last_scene()
+        self.messages.append({"role": "user", "content": action})
+
+        # Clear suggestions, including any still being generated for the previous turn
+        self.suggestions.clear()
+        self.suggestion_job = None
+
+        speculative_response = await _run_blocking(self._take_speculative_response, context, action)
+        if speculative_response:
+            return self._narrate(speculative_response, iter(()))
+
+        # Tell the agent about the turns answered speculatively since its last reply
+        speculative_turns = list(self.speculative_turns)
+        prompt = self.turn_prompt(action)
+        if speculative_turns:
+            prompt = SPECULATIVE_SYNC_PROMPT.format(
+                turns="\n\n".join(
+                    SPECULATIVE_SYNC_TURN.format(action=turn_action, response=response)
+                    for turn_action, response in speculative_turns
+                ),
+                prompt=prompt
+            )
+
+        # The turn is counted once, its retries reuse the same agent session
+        opened = await self._open_stream(prompt, self.agent.begin_turn())
+        del self.speculative_turns[:len(speculative_turns)]
+        if opened is None:
+            return None
+        return self._narrate(*opened)
+
+    @retry(
+            stop=stop_after_attempt(3),
+            wait=wait_exponential(multiplier=1, min=4, max=10),
+            # An open circuit fails fast; retrying would only wait it out
+            retry=retry_if_not_exception_type(CircuitOpenError),
+            before_sleep=lambda retry_state: METRICS.record_retry("agent.invoke_agent"),
+            reraise=True
+        )
+    async def _open_stream(self, prompt, session_id):
+        """
+        Open a streamed agent response with exponential backoff retry mechanism.
+
+        The first text delta is read eagerly so that throttling and connection
+        errors surface here, where they can still be retried.
+
+        Args:
+            prompt (str): The prompt sent to the agent
+            session_id (str): The agent session of the turn, as returned by begin_turn()
+
+        Returns:
+            tuple: (first text delta, iterator of the remaining deltas), or None
+                if the agent returned nothing
+        """
+        try:
+            # Rate limiting is applied by the agent's process-wide limiter
+            stream = self.agent.stream_response(prompt, session_id=session_id)
+            first_chunk = await _run_blocking(next, stream, None)
+            if first_chunk is None:
+                return None
+            return first_chunk, stream
+
+        except EventStreamError as e:
+            if "throttlingException" in str(e):
+                self.logger.warning(f"Rate limit hit, retrying with backoff: {str(e)}")
+                raise  # This will trigger the retry
+            raise  # Re-raise other EventStreamErrors
+
+    async def _narrate(self, first_chunk, stream):
+        """
+        Stream the narrative of a response, then record the response.
+
+        Args:
+            first_chunk (str): First text delta of the response
+            stream (Iterator[str]): Remaining text deltas, read without blocking the event loop
+
+        Yields:
+            str: Narrative text deltas; in combined mode the suggestions are held back
+        """
+        parser = SuggestionStreamParser() if self.combined_suggestions() else None
+        deltas = []
+        chunk = first_chunk
+        while chunk is not None:
+            text = parser.feed(chunk) if parser else chunk
+            if text:
+                deltas.append(text)
+                yield text
+            chunk = await _run_blocking(next, stream, None)
+        if parser:
+            text = parser.finish()
+            if text:
+                yield text
+
+        response = parser.narrative.strip() if parser else "".join(deltas)
+        if response:
+            self._record_response(response, parser.suggestions if parser else None)
+
+    def _record_response(self, response, suggestions=None):
+        """
+        Add a Game Master response to the game, then queue its image and suggestions.
+
+        Args:
+            response (str): The response text
+            suggestions (list): Suggestions returned with the response in combined mode;
+                they are only generated when missing
+        """
+        message_index = len(self.messages)
+        last_message = self.messages[-1] if self.messages else None
+        action = last_message["content"] if last_message and last_message["role"] == "user" else None
+        self.messages.append({"role": "assistant", "content": response})
+        self.memory.add_turn(action, response)
+
+        # Neither is waited on: the image is collected when ready, suggestions are available immediately
+        self._queue_image(message_index, response)
+        if suggestions:
+            self.suggestions = suggestions
+            self.suggestion_job = None
+            self.logger.debug(f"Final suggestions set: {self.suggestions}")
+        else:
+            self._generate_suggestions(response)
+        self._persist()
+
+    def _queue_image(self, message_index, text):
+        """
+        Generate the image of a response in the background.
+
+        Args:
+            message_index (int): The index of the response in the chat history
+            text (str): The response text
+        """
+        if self.store is None:
+            self.image_jobs.submit(message_index, text)
+        else:
+            self.image_jobs.submit_task(message_index, self._generate_shared_image, message_index, text)
+
+    def _generate_shared_image(self, message_index, text):
+        """
+        Generate the image of a response and upload it, so other processes can show it.
+
+        Args:
+            message_index (int): The index of the response in the chat history
+            text (str): The response text
+
+        Returns:
+            BytesIO: The generated image, or None on failure
+        """
+        image = self.image_service.generate_image(text)
+        if image is None:
+            return None
+        try:
+            self.storage.save_image(self.character['character_id'], message_index, image)
+            self._persist()
+        except Exception as e:
+            # The image is still shown here, other processes will generate it again
+            self.logger.warning(f"Could not upload image {message_index}: {str(e)}")
+        return image
+
+    def _generate_suggestions(self, context):
+        """
+        Generate action suggestions based on the current context.
+
+        Args:
+            context (str): The current game context (usually the last AI response)
+
+        Local suggestions are available instantly. In hybrid mode the agent is
+        also asked in the background, and its suggestions replace the local
+        ones once ready; if the agent fails or is throttled, the local ones stay.
+        """
+        self.suggestions = LOCAL_SUGGESTIONS.suggest(self.character, context)
+        self.suggestion_job = None
+        self.logger.debug(f"Local suggestions set: {self.suggestions}")
+
+        # The agent is not asked while its circuit is open
+        if GAME_CONFIG['suggestion_engine'] == 'hybrid' and not self.agent.circuit_breaker.is_open():
+            engine = AgentSuggestionEngine(self.agent)
+            # The agent gets the bounded story so far rather than the last scene alone
+            agent_context = self.memory.context() or context
+            self.suggestion_job = TURN_EXECUTOR.submit(engine.suggest, self.character, agent_context)
+
+    def collect_suggestions(self):
+        """
+        Replace the local suggestions with the agent's once they are ready.
+
+        Returns:
+            bool: True if agent suggestions are still pending
+        """
+        job = self.suggestion_job
+        if job is None:
+            return False
+        if not job.done():
+            return True
+
+        self.suggestion_job = None
+        try:
+            suggestions = job.result()
+        except Exception as e:
+            # Throttled or failing agent: keep the local suggestions
+            self.logger.warning(f"Error generating suggestions, keeping local ones: {str(e)}")
+            return False
+        if suggestions:
+            self.suggestions = suggestions
+            self.logger.debug(f"Final suggestions set: {self.suggestions}")
+            self._persist()
+        return False
+
+    async def settle_suggestions(self):
+        """
+        Wait for the pending agent suggestions, if any.
+
+        Returns:
+            list: The final suggestions of the turn
+        """
+        job = self.suggestion_job
+        if job is not None:
+            await asyncio.wait([asyncio.wrap_future(job)])
+            self.collect_suggestions()
+        return self.suggestions
+
+    def last_scene(self):
+        """
+        Get the most recent Game Master response.
+
+        Returns:
+            str: The content of the last assistant message, or an empty string
+        """
+        for message in reversed(self.messages):
+            if message["role"] == "assistant":
+                return message["content"]
+        return ""
+
+    def prefetch_suggestion_responses(self):
+        """
+        Speculatively ask the agent how the story continues for each suggestion.
+
+        The calls run in the background on throwaway agent sessions and are
+        capped by the speculation budgets.
+        """
+        if not SPECULATION_CONFIG['enabled'] or not self.suggestions or not self.messages:
+            return
+        if self.agent.circuit_breaker.is_open():
+            return
+        character = self.character
+        context = self.last_scene()
+        # Throwaway sessions have no memory of the game, so give them the bounded story so far
+        story = self.memory.context() or context
+        prompts = {
+            action: self.turn_prompt(SPECULATIVE_TURN_PROMPT.format(
+                player_name=character['name'],
+                player_race=character['race'],
+                player_class=character['class'],
+                player_gender=character['gender'],
+                context=story,
+                action=action
+            ))
+            for action in self.suggestions[:3]
+        }
+        self.speculation.prefetch(context, prompts)
+
+    def _take_speculative_response(self, context, action):
+        """
+        Use a speculative response for the player's input if one is available.
+
+        Args:
+            context (str): The scene the player responded to
+            action (str): The player's input
+
+        Returns:
+            str: The speculative response, or None on a miss
+
+        On a hit, the turn is kept to be folded into the next prompt sent on
+        the game's real agent session, so the agent's memory stays consistent
+        without a call of its own that could overlap with the next turn.
+        """
+        if not SPECULATION_CONFIG['enabled']:
+            return None
+        # Waiting on a prefetch for longer than a fresh agent call would take is pointless
+        max_wait = SPECULATION_CONFIG['max_wait_seconds']
+        round_trip = METRICS.latency_percentile("agent.invoke_agent", 95, min_samples=5)
+        response = self.speculation.take(context, action, timeout=min(round_trip or max_wait, max_wait))
+        self.speculation.clear()
+        if response:
+            # Only the narrative is told to the agent, not the suggestions returned with it
+            narrative = SuggestionStreamParser.split(response)[0] if self.combined_suggestions() else response
+            self.speculative_turns.append((action, narrative))
+        return response
+
+    def image(self, message_index):
+        """
+        Get the image of a response, queueing it if needed without waiting for it.
+
+        Args:
+            message_index (int): The index of the response in the chat history
+
+        Returns:
+            tuple: (thumbnail bytes or None, ImageJobService status); a READY
+                status with no thumbnail means the image could not be loaded
+        """
+        # Collect the image if its background job has finished
+        if message_index not in self.generated_images:
+            if self.image_jobs.status(message_index) == ImageJobService.READY:
+                self.generated_images.put(message_index, self.image_jobs.take(message_index))
+
+        if message_index in self.generated_images:
+            return self.generated_images.thumbnail(message_index), ImageJobService.READY
+
+        status = self.image_jobs.status(message_index)
+        if status is None:
+            if message_index in self.image_keys:
+                # Download the saved image of a resumed game
+                self.image_jobs.submit_task(message_index, self.storage.load_image, self.image_keys[message_index])
+            else:
+                # Generate a new image in the background if we don't have it yet
+                self._queue_image(message_index, self.messages[message_index]["content"])
+            status = ImageJobService.PENDING
+        return None, status
+
+    def has_pending_images(self):
+        """
+        Check whether any image is still being generated or downloaded.
+
+        Returns:
+            bool: True if an image job is pending
+        """
+        return self.image_jobs.has_pending()
+
+    def request_save(self):
+        """
+        Save the game to S3 in the background.
+
+        Returns:
+            bool: False if there is nothing to save yet
+
+        Progress is reported by the storage service's save_status.
+        """
+        if not self.messages:
+            return False
+        self.storage.request_save(
+            self.messages,
+            self.player_name,
+            self.generated_images.originals(),
+            self.character,
+            self.suggestions
+        )
+        return True
+
+    @staticmethod
+    def combined_suggestions():
+        """
+        Check whether suggestions are requested in the same agent call as the narrative.
+
+        Returns:
+            bool: True in combined suggestion mode
+        """
+        return GAME_CONFIG['suggestion_mode'] == 'combined'
+
+    def turn_prompt(self, prompt):
+        """
+        Build the prompt sent to the agent for a turn.
+
+        Args:
+            prompt (str): The player's input or the launch prompt
+
+        Returns:
+            str: The prompt, asking for suggestions as well in combined mode
+        """
+        if not self.combined_suggestions():
+            return prompt
+        character = self.character
+        return prompt + COMBINED_TURN_SUFFIX.format(
+            player_name=character['name'],
+            player_race=character['race'],
+            player_class=character['class'],
+            player_gender=character['gender']
+        )
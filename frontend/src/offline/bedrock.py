@@ -0,0 +1,171 @@
+import base64
+import io
+import json
+import re
+import time
+import zlib
+from functools import lru_cache
+from botocore.exceptions import EventStreamError
+from PIL import Image, ImageOps
+from src.config.aws_config import OFFLINE_CONFIG
+from src.config.prompts import SUGGESTIONS_DELIMITER
+from src.offline.faults import FaultInjector
+
+
+# Canned scenes of the offline Game Master, picked deterministically from the prompt
+SCENES = [
+    "You stand at the edge of the Greywood Forest as dusk falls. A crumbling tower looms above the "
+    "twisted trees, its windows glowing with a faint blue light. An old hermit waves at you from a "
+    "wooden bridge over a misty river. What do you do?",
+    "The Gilded Flagon tavern is bustling tonight. A bard plays by the fire while a hooded stranger "
+    "watches you from a dark corner. The innkeeper slides a dusty map across the counter and whispers "
+    "about treasure hidden in the old mines. What do you do?",
+    "Torchlight flickers on the damp walls of the dungeon. Ahead, a massive iron door is covered in "
+    "ancient runes, and you hear goblins arguing somewhere beyond it. A rusty key lies in a puddle at "
+    "your feet. What do you do?",
+    "A storm rolls over the mountain pass as you reach the ruined temple. Inside, a silver statue of a "
+    "forgotten goddess holds a glowing crystal. Wolves howl in the valley below, closer than before. "
+    "What do you do?",
+    "The market of the harbor city is loud and colorful. A merchant offers you a strange golden amulet, "
+    "a pickpocket slips through the crowd, and a ship with black sails drops anchor in the bay. What do "
+    "you do?"
+]
+
+SUGGESTIONS = [
+    ["Approach the hermit on the bridge", "Investigate the glowing tower", "Search the forest edge"],
+    ["Talk to the hooded stranger", "Study the dusty map", "Ask the bard about the mines"],
+    ["Pick up the rusty key", "Listen at the iron door", "Examine the ancient runes"],
+    ["Take the glowing crystal", "Prepare for the wolves", "Search the temple ruins"],
+    ["Inspect the golden amulet", "Chase the pickpocket", "Head to the black ship"]
+]
+
+
+class _Body:
+    """
+    Minimal stand-in for the streaming body of a boto3 response.
+    """
+
+    def __init__(self, payload):
+        self._buffer = io.BytesIO(json.dumps(payload).encode('utf-8'))
+
+    def read(self, *args):
+        return self._buffer.read(*args)
+
+
+class FakeAgentRuntime:
+    """
+    Offline stand-in for the 'bedrock-agent-runtime' client.
+
+    Streams canned narratives as InvokeAgent completion events, with the
+    combined-suggestions format when the prompt asks for it, after an
+    injected time to first chunk. Throttling surfaces while reading the
+    stream, as an EventStreamError, like the real service.
+    """
+
+    def __init__(self):
+        self.faults = FaultInjector('bedrock-agent-runtime')
+        self.chunk_delay = OFFLINE_CONFIG['chunk_delay_ms'] * OFFLINE_CONFIG['latency_scale'] / 1000
+
+    def _respond(self, prompt):
+        """
+        Build the canned response to a prompt.
+
+        Args:
+            prompt (str): The input text sent to the agent
+
+        Returns:
+            str: The response text
+        """
+        index = zlib.crc32(prompt.encode('utf-8')) % len(SCENES)
+        suggestions = "\n".join(f"{i}. {action}" for i, action in enumerate(SUGGESTIONS[index], start=1))
+        # Combined turn prompts also ask for exactly 3 actions, so they are matched first
+        if SUGGESTIONS_DELIMITER in prompt:
+            return f"{SCENES[index]}\n{SUGGESTIONS_DELIMITER}\n{suggestions}"
+        if "EXACTLY 3" in prompt:
+            return suggestions
+        return SCENES[index]
+
+    def _completion(self, request):
+        self.faults.delay()
+        self.faults.check('InvokeAgent', throttle_code='throttlingException', error_class=EventStreamError)
+        if request.get('endSession'):
+            return
+        text = self._respond(request.get('inputText', ''))
+        if request.get('streamingConfigurations', {}).get('streamFinalResponse'):
+            chunks = re.findall(r"\S+\s*", text)
+        else:
+            chunks = [text]
+        for i, chunk in enumerate(chunks):
+            if i and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield {'chunk': {'bytes': chunk.encode('utf-8')}}
+
+    def invoke_agent(self, **request):
+        return {'completion': self._completion(request), 'sessionId': request.get('sessionId')}
+
+
+@lru_cache(maxsize=64)
+def _render_image(width, height, color):
+    """
+    Render a gradient placeholder image.
+
+    Args:
+        width (int): Width in pixels
+        height (int): Height in pixels
+        color (int): 24-bit RGB color derived from the prompt
+
+    Returns:
+        bytes: The PNG image
+    """
+    rgb = ((color >> 16) & 255, (color >> 8) & 255, color & 255)
+    gradient = Image.linear_gradient('L').resize((width, height))
+    image = ImageOps.colorize(gradient, black=(20, 20, 30), white=rgb)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class FakeBedrockRuntime:
+    """
+    Offline stand-in for the 'bedrock-runtime' client.
+
+    Nova Canvas requests return gradient images of the requested size and
+    number; Claude requests return a short extractive summary with token
+    usage, after injected latency.
+    """
+
+    def __init__(self):
+        self.faults = FaultInjector('bedrock-runtime')
+
+    def _canvas(self, request):
+        config = request.get('imageGenerationConfig', {})
+        text = request.get('textToImageParams', {}).get('text', '')
+        images = []
+        for index in range(config.get('numberOfImages', 1)):
+            color = zlib.crc32(f"{text}-{config.get('seed', 0)}-{index}".encode('utf-8')) & 0xFFFFFF
+            image = _render_image(config.get('width', 1024), config.get('height', 1024), color)
+            images.append(base64.b64encode(image).decode('ascii'))
+        return {'images': images, 'error': None}
+
+    @staticmethod
+    def _claude(request):
+        prompt = " ".join(
+            message['content'] if isinstance(message['content'], str) else json.dumps(message['content'])
+            for message in request.get('messages', [])
+        )
+        # The text to summarize is the longest paragraph of the prompt
+        text = max(prompt.split("\n\n"), key=len)
+        sentences = re.findall(r"[^.!?\n]+[.!?]", text)
+        summary = " ".join(sentence.strip() for sentence in sentences[:4])[:request.get('max_tokens', 500) * 3]
+        return {
+            'content': [{'type': 'text', 'text': summary}],
+            'usage': {'input_tokens': len(prompt) // 4, 'output_tokens': len(summary) // 4}
+        }
+
+    def invoke_model(self, modelId, body, **kwargs):
+        self.faults.delay()
+        self.faults.check('InvokeModel')
+        request = json.loads(body)
+        if request.get('taskType') == 'TEXT_IMAGE':
+            return {'body': _Body(self._canvas(request)), 'contentType': 'application/json'}
+        return {'body': _Body(self._claude(request)), 'contentType': 'application/json'}
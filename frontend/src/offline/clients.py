@@ -0,0 +1,29 @@
+from src.offline.bedrock import FakeAgentRuntime, FakeBedrockRuntime
+from src.offline.s3 import LocalS3
+
+
+# Offline stand-in for each AWS service used by the application
+_STAND_INS = {
+    'bedrock-agent-runtime': FakeAgentRuntime,
+    'bedrock-runtime': FakeBedrockRuntime,
+    's3': LocalS3
+}
+
+
+def create_client(service_name):
+    """
+    Create the offline stand-in of an AWS service client.
+
+    Args:
+        service_name (str): AWS service name, e.g. 'bedrock-runtime'
+
+    Returns:
+        The stand-in client, exposing the operations the application uses
+
+    Raises:
+        ValueError: If the service has no offline stand-in
+    """
+    stand_in = _STAND_INS.get(service_name)
+    if stand_in is None:
+        raise ValueError(f"No offline stand-in for AWS service {service_name}")
+    return stand_in()
@@ -0,0 +1,105 @@
+import asyncio
+import math
+import random
+import threading
+import time
+from botocore.exceptions import ClientError
+from src.config.aws_config import OFFLINE_CONFIG
+
+
+class FaultInjector:
+    """
+    Latency, throttling and error injection for an offline backend.
+
+    Latencies follow a log-normal distribution fitted to a median and a
+    p95, which matches the long tail of real service calls. With a seed,
+    the sequence of latencies and faults is reproducible.
+    """
+
+    # z-score of the 95th percentile of a normal distribution
+    _Z95 = 1.6449
+
+    def __init__(self, backend, median_ms=None, p95_ms=None, throttle_rate=None, error_rate=None, seed=None):
+        """
+        Initialize the injector of a backend.
+
+        Args:
+            backend (str): Backend name, e.g. 's3', selecting the configured latency
+            median_ms (float): Median latency in milliseconds
+            p95_ms (float): 95th percentile latency in milliseconds
+            throttle_rate (float): Share of calls rejected as throttled
+            error_rate (float): Share of calls failing with a server error
+            seed (str): Seed for reproducible latencies and faults
+        """
+        latency = OFFLINE_CONFIG['latency_ms'].get(backend, {'median': 0, 'p95': 0})
+        self.backend = backend
+        self.median_ms = latency['median'] if median_ms is None else median_ms
+        self.p95_ms = latency['p95'] if p95_ms is None else p95_ms
+        self.scale = OFFLINE_CONFIG['latency_scale']
+        self.throttle_rate = OFFLINE_CONFIG['throttle_rate'] if throttle_rate is None else throttle_rate
+        self.error_rate = OFFLINE_CONFIG['error_rate'] if error_rate is None else error_rate
+        seed = OFFLINE_CONFIG['seed'] if seed is None else seed
+        self._random = random.Random(f"{seed}-{backend}" if seed is not None else None)
+        self._lock = threading.Lock()
+
+    def sample_latency(self):
+        """
+        Draw a latency from the distribution.
+
+        Returns:
+            float: Latency in seconds
+        """
+        if self.median_ms <= 0 or self.scale <= 0:
+            return 0.0
+        sigma = max(math.log(max(self.p95_ms, self.median_ms) / self.median_ms) / self._Z95, 0.0)
+        with self._lock:
+            latency_ms = self._random.lognormvariate(math.log(self.median_ms), sigma)
+        return latency_ms * self.scale / 1000
+
+    def delay(self):
+        """
+        Sleep for a sampled latency.
+        """
+        time.sleep(self.sample_latency())
+
+    async def delay_async(self):
+        """
+        Sleep for a sampled latency without blocking the event loop.
+        """
+        await asyncio.sleep(self.sample_latency())
+
+    def fault(self):
+        """
+        Draw whether the call should fail.
+
+        Returns:
+            str: 'throttle', 'error' or None
+        """
+        with self._lock:
+            draw = self._random.random()
+        if draw < self.throttle_rate:
+            return 'throttle'
+        if draw < self.throttle_rate + self.error_rate:
+            return 'error'
+        return None
+
+    def check(self, operation_name, throttle_code="ThrottlingException", error_class=ClientError):
+        """
+        Raise an AWS-style error if the call should fail.
+
+        Args:
+            operation_name (str): AWS operation name, e.g. 'InvokeModel'
+            throttle_code (str): Error code of a throttled call for this operation
+            error_class (type): ClientError subclass raised by this operation
+        """
+        fault = self.fault()
+        if fault == 'throttle':
+            raise error_class(
+                {"Error": {"Code": throttle_code, "Message": "Rate exceeded (injected)"}},
+                operation_name
+            )
+        if fault == 'error':
+            raise error_class(
+                {"Error": {"Code": "InternalServerException", "Message": "Internal failure (injected)"}},
+                operation_name
+            )
@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import uuid
+from urllib.parse import urlparse
+from fastmcp import FastMCP
+from src.config.aws_config import MCP_CONFIG
+from src.offline.faults import FaultInjector
+
+
+def create_server(faults=None):
+    """
+    Create an in-memory stand-in for the game characters MCP server.
+
+    It implements the tools used by CharacterService with the same names
+    and arguments as the Java server, with injected latency and faults.
+
+    Args:
+        faults (FaultInjector): Latency and fault injection, defaults to the 'mcp' settings
+
+    Returns:
+        FastMCP: The server, usable in process by a fastmcp Client or served over SSE
+    """
+    mcp = FastMCP("game-characters-offline")
+    faults = faults or FaultInjector('mcp')
+    characters = {}
+
+    async def simulate_call():
+        await faults.delay_async()
+        fault = faults.fault()
+        if fault:
+            raise RuntimeError(f"Injected {fault} failure")
+
+    @mcp.tool(name="createCharacter", description="Create a new character with the given details.")
+    async def create_character(character: dict) -> dict:
+        await simulate_call()
+        character = dict(character)
+        character_id = character.get('characterId') or str(uuid.uuid4())
+        character['characterId'] = character_id
+        character.setdefault('level', 1)
+        character.setdefault('experience', 0)
+        characters[character_id] = character
+        return character
+
+    @mcp.tool(name="getCharacter", description="Retrieve a character by their ID from the database")
+    async def get_character(characterId: str) -> dict:
+        await simulate_call()
+        if characterId not in characters:
+            raise ValueError(f"Character not found with ID: {characterId}")
+        return characters[characterId]
+
+    @mcp.tool(name="updateCharacter", description="Update an existing character's details.")
+    async def update_character(characterId: str, updatedCharacter: dict) -> dict:
+        await simulate_call()
+        if characterId not in characters:
+            raise ValueError(f"Character not found with ID: {characterId}")
+        character = dict(updatedCharacter, characterId=characterId)
+        characters[characterId] = character
+        return character
+
+    return mcp
+
+
+def main():
+    url = urlparse(MCP_CONFIG['characters_server_url'])
+    parser = argparse.ArgumentParser(description="Serve the offline game characters MCP server over SSE")
+    parser.add_argument("--host", default=url.hostname or "localhost")
+    parser.add_argument("--port", type=int, default=url.port or 8081)
+    args = parser.parse_args()
+    asyncio.run(create_server().run_sse_async(host=args.host, port=args.port))
+
+
+if __name__ == "__main__":
+    main()
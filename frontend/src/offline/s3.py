@@ -0,0 +1,67 @@
+import io
+import os
+import shutil
+import threading
+from botocore.exceptions import ClientError
+from src.config.aws_config import OFFLINE_CONFIG
+from src.offline.faults import FaultInjector
+
+
+class LocalS3:
+    """
+    Offline stand-in for the 's3' client, storing objects on the local filesystem.
+
+    Implements the operations used by StorageService, with the same error
+    codes as S3 and injected latency.
+    """
+
+    def __init__(self, root=None):
+        """
+        Initialize the store.
+
+        Args:
+            root (str): Directory holding one subdirectory per bucket
+        """
+        self.root = root or OFFLINE_CONFIG['s3_dir']
+        self.faults = FaultInjector('s3')
+
+    def _path(self, bucket, key):
+        path = os.path.normpath(os.path.join(self.root, bucket, key))
+        if not path.startswith(os.path.normpath(os.path.join(self.root, bucket)) + os.sep):
+            raise ClientError({"Error": {"Code": "InvalidKey", "Message": key}}, 'PutObject')
+        return path
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.faults.delay()
+        self.faults.check('PutObject', throttle_code='SlowDown')
+        data = Body.read() if hasattr(Body, 'read') else Body
+        self._write(self._path(Bucket, Key), data if isinstance(data, bytes) else data.encode('utf-8'))
+        return {}
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self.faults.delay()
+        self.faults.check('GetObject', throttle_code='SlowDown')
+        path = self._path(Bucket, Key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            raise ClientError(
+                {"Error": {"Code": "NoSuchKey", "Message": "The specified key does not exist."}},
+                'GetObject'
+            )
+        return {'Body': io.BytesIO(data), 'ContentLength': len(data)}
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Callback=None, Config=None):
+        self.faults.delay()
+        self.faults.check('PutObject', throttle_code='SlowDown')
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(Filename, path)
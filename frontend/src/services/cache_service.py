@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+
+class DiskCache:
+    """
+    Persistent, size-bounded, content-addressed cache on the local disk.
+
+    Entries are stored as one file per key under the cache directory. When
+    the total size exceeds the limit, the least recently used entries are
+    evicted. Instances are shared per directory through `shared()`, so every
+    session of the process sees the same index.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, directory, max_bytes):
+        """
+        Initialize the cache and index the entries already on disk.
+
+        Args:
+            directory (str): Directory holding the cache entries
+            max_bytes (int): Maximum total size of the entries in bytes
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @classmethod
+    def shared(cls, directory, max_bytes):
+        """
+        Get the process-wide cache for a directory, creating it on first use.
+
+        Args:
+            directory (str): Directory holding the cache entries
+            max_bytes (int): Maximum total size of the entries in bytes
+
+        Returns:
+            DiskCache: The cache instance for the directory
+        """
+        with cls._instances_lock:
+            cache = cls._instances.get(directory)
+            if cache is None:
+                cache = cls(directory, max_bytes)
+                cls._instances[directory] = cache
+            return cache
+
+    @staticmethod
+    def make_key(*parts):
+        """
+        Build a cache key from a hash of the given parts.
+
+        Args:
+            *parts: JSON-serializable values identifying the entry
+
+        Returns:
+            str: Hex digest usable as a cache key
+        """
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _load_index(self):
+        """
+        Index existing entries, oldest access first.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            path = self._path(name)
+            if name.endswith('.tmp') or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+            self._total_bytes += size
+        self._evict()
+
+    def get(self, key):
+        """
+        Read an entry and mark it as recently used.
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            bytes: The cached data, or None on a miss
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            path = self._path(key)
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # Keep the access order across restarts
+            return data
+        except OSError:
+            with self._lock:
+                size = self._entries.pop(key, None)
+                if size is not None:
+                    self._total_bytes -= size
+            return None
+
+    def put(self, key, data):
+        """
+        Store an entry, evicting least recently used entries if needed.
+
+        Args:
+            key (str): The cache key
+            data (bytes): The data to cache
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Could not write cache entry {key}: {str(e)}")
+            return
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        """
+        Remove least recently used entries until the cache fits its size limit.
+        """
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
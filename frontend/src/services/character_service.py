@@ -0,0 +1,248 @@
+import asyncio
+import json
+import logging
+import threading
+from fastmcp import Client
+from fastmcp.exceptions import ClientError
+from src.config.aws_config import MCP_CONFIG, OFFLINE_CONFIG
+from src.services.metrics_service import METRICS
+
+
+class CharacterService:
+    """
+    Service for managing characters through the game characters MCP server.
+
+    This class keeps one long-lived MCP client connection per process. The
+    connection lives on a dedicated background event loop, is reused by every
+    call and is re-established when it fails, so a character operation costs
+    a single round trip. Synchronous wrappers are provided for Streamlit code.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, server_url=None, timeout=None):
+        """
+        Initialize the CharacterService and start its background event loop.
+
+        Args:
+            server_url (str): SSE endpoint of the MCP server, defaults to MCP_CONFIG
+            timeout (float): Maximum time in seconds to wait for a call
+        """
+        self.server_url = server_url or MCP_CONFIG['characters_server_url']
+        # What the client connects to: the server URL, or the in-process offline server
+        self.transport = self.server_url
+        if OFFLINE_CONFIG['enabled'] and server_url is None:
+            from src.offline.mcp_server import create_server
+            self.transport = create_server()
+        self.timeout = timeout or MCP_CONFIG['timeout']
+        self.logger = logging.getLogger(__name__)
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mcp-client", daemon=True)
+        self._thread.start()
+
+        # Connection state, only accessed from the background loop
+        self._client = None
+        self._closing = None
+        self._connect_lock = None
+
+    @classmethod
+    def shared(cls):
+        """
+        Get the process-wide CharacterService, creating it on first use.
+
+        Returns:
+            CharacterService: The shared service instance
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    async def _hold_connection(self, ready, closing):
+        """
+        Open an MCP client connection and keep it open until asked to close.
+
+        The connection is entered and exited in this single task, as the
+        underlying SSE transport requires.
+
+        Args:
+            ready (asyncio.Future): Resolved with the connected client
+            closing (asyncio.Event): Set to close the connection
+        """
+        try:
+            async with Client(self.transport) as client:
+                self.logger.info(f"Connected to MCP server at {self.server_url}")
+                ready.set_result(client)
+                await closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                self.logger.warning(f"MCP connection closed with error: {str(e)}")
+
+    async def _get_client(self):
+        """
+        Get the connected client, connecting first if needed.
+
+        Returns:
+            Client: The connected MCP client
+        """
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._client is None:
+                ready = self._loop.create_future()
+                closing = asyncio.Event()
+                self._loop.create_task(self._hold_connection(ready, closing))
+                self._client = await ready
+                self._closing = closing
+            return self._client
+
+    async def _reset(self, client):
+        """
+        Drop a failed connection so the next call reconnects.
+
+        Args:
+            client (Client): The client whose connection failed
+        """
+        async with self._connect_lock:
+            if self._client is client:
+                self._closing.set()
+                self._client = None
+                self._closing = None
+
+    async def _call_tool(self, name, arguments):
+        """
+        Call an MCP tool, reconnecting once if the connection has failed.
+
+        Args:
+            name (str): Name of the tool
+            arguments (dict): Tool arguments
+
+        Returns:
+            list: Content returned by the tool
+        """
+        with METRICS.trace(f"mcp.{name}") as span:
+            span.add_input(len(json.dumps(arguments, default=str)))
+            for attempt in range(2):
+                client = await self._get_client()
+                try:
+                    result = await client.call_tool(name, arguments)
+                    span.add_output(sum(len(getattr(content, 'text', None) or "") for content in result or []))
+                    return result
+                except ClientError:
+                    # The tool itself reported an error, the connection is fine
+                    raise
+                except Exception as e:
+                    self.logger.warning(f"MCP call {name} failed, reconnecting: {str(e)}")
+                    await self._reset(client)
+                    if attempt == 1:
+                        raise
+                    METRICS.record_retry(f"mcp.{name}")
+
+    def call_tool(self, name, arguments):
+        """
+        Call an MCP tool from synchronous code.
+
+        Args:
+            name (str): Name of the tool
+            arguments (dict): Tool arguments
+
+        Returns:
+            list: Content returned by the tool
+        """
+        future = asyncio.run_coroutine_threadsafe(self._call_tool(name, arguments), self._loop)
+        return future.result(timeout=self.timeout)
+
+    @staticmethod
+    def _parse_result(result):
+        """
+        Decode the JSON text content returned by a tool.
+
+        Args:
+            result (list): Content returned by the tool
+
+        Returns:
+            The decoded value, or None if the tool returned no text
+        """
+        for content in result or []:
+            text = getattr(content, 'text', None)
+            if text:
+                try:
+                    return json.loads(text)
+                except ValueError:
+                    return text
+        return None
+
+    @staticmethod
+    def to_payload(character):
+        """
+        Restructure character specifications to match the Java GameCharacters model.
+
+        Args:
+            character (dict): Character specifications from the creation page
+
+        Returns:
+            dict: Character payload for the MCP tools
+        """
+        return {
+            "characterId": character['character_id'],
+            "playerId": character['name'],  # Using character name as playerId for now
+            "name": character['name'],
+            "race": character['race'],
+            "characterClass": character['class'],
+            "gender": character['gender'],
+            "stats": {
+                "intelligence": character['Intelligence'],
+                "strength": character['Strength'],
+                "dexterity": character['Dexterity'],
+                "constitution": character['Constitution'],
+                "wisdom": character['Wisdom'],
+                "charisma": character['Charisma']
+            }
+        }
+
+    def create_character(self, character):
+        """
+        Create a character.
+
+        Args:
+            character (dict): Character specifications from the creation page
+
+        Returns:
+            dict: The created character as stored by the server
+        """
+        result = self.call_tool("createCharacter", {"character": self.to_payload(character)})
+        return self._parse_result(result)
+
+    def get_character(self, character_id):
+        """
+        Retrieve a character by its ID.
+
+        Args:
+            character_id (str): ID of the character
+
+        Returns:
+            dict: The character as stored by the server
+        """
+        result = self.call_tool("getCharacter", {"characterId": character_id})
+        return self._parse_result(result)
+
+    def update_character(self, character_id, character_payload):
+        """
+        Update an existing character.
+
+        Args:
+            character_id (str): ID of the character
+            character_payload (dict): Updated fields following the GameCharacters model
+
+        Returns:
+            dict: The updated character as stored by the server
+        """
+        result = self.call_tool(
+            "updateCharacter",
+            {"characterId": character_id, "updatedCharacter": character_payload}
+        )
+        return self._parse_result(result)
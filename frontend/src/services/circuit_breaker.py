@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+from src.config.aws_config import CIRCUIT_BREAKER_CONFIG
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a model whose circuit breaker is open.
+    """
+
+    def __init__(self, name, retry_after):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} is unavailable right now, please try again in {max(1, round(retry_after))}s")
+
+
+def is_breaker_failure(error):
+    """
+    Check whether an error says something about the health of the model.
+
+    Args:
+        error (Exception): The error raised by a call
+
+    Returns:
+        bool: False for invalid requests, True for throttling, timeouts, server and connection errors
+    """
+    response = getattr(error, 'response', None)
+    code = response.get("Error", {}).get("Code", "") if isinstance(response, dict) else ""
+    return code not in ("ValidationException", "validationException")
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker of one Bedrock model (or agent).
+
+    After a number of consecutive failures the circuit opens: calls fail
+    fast, without waiting on retries and timeouts, so callers can degrade
+    (skip the image, keep local suggestions). Once the reset time has
+    passed, a single trial call is let through; its success closes the
+    circuit, its failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=None, reset_seconds=None):
+        """
+        Initialize a closed circuit breaker.
+
+        Args:
+            name (str): Name of the protected model, for logs and errors
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_seconds (float): Time the circuit stays open before a trial call
+        """
+        self.name = name
+        self.enabled = CIRCUIT_BREAKER_CONFIG['enabled']
+        self.failure_threshold = failure_threshold or CIRCUIT_BREAKER_CONFIG['failure_threshold']
+        self.reset_seconds = reset_seconds or CIRCUIT_BREAKER_CONFIG['reset_seconds']
+        self.logger = logging.getLogger(__name__)
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def _retry_after(self, now):
+        return self.opened_at + self.reset_seconds - now
+
+    def is_open(self):
+        """
+        Check whether calls are currently refused, without claiming the trial call.
+
+        Returns:
+            bool: True while the circuit is open and not yet due for a trial call
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            return self.state != self.CLOSED and self._retry_after(time.monotonic()) > 0
+
+    def allow(self):
+        """
+        Check whether a call may be made now, claiming the trial call when it is due.
+
+        Returns:
+            bool: True if the call may be made, and its outcome must then be recorded
+        """
+        if not self.enabled:
+            return True
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self._retry_after(now) > 0:
+                return False
+            # Due for a trial call, or the previous trial call never reported back
+            self.state = self.HALF_OPEN
+            self.opened_at = now
+            self.logger.info(f"Circuit of {self.name} half open, trying one call")
+            return True
+
+    def check(self):
+        """
+        Claim a call like allow(), raising when it is refused.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if not self.allow():
+            with self._lock:
+                retry_after = self._retry_after(time.monotonic())
+            raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self):
+        """
+        Record a successful call, closing the circuit.
+        """
+        with self._lock:
+            if self.state != self.CLOSED:
+                self.logger.info(f"Circuit of {self.name} closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self, error=None):
+        """
+        Record a failed call, opening the circuit after too many in a row.
+
+        Args:
+            error (Exception): The error of the call; invalid requests are not counted
+        """
+        if not self.enabled or (error is not None and not is_breaker_failure(error)):
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.logger.warning(f"Circuit of {self.name} open after {self.failures} failure(s)")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+# Process-wide breakers, one per Bedrock model id
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(model_id):
+    """
+    Get the process-wide circuit breaker for a Bedrock model id.
+
+    Args:
+        model_id (str): Bedrock model id, or another key identifying a backend (e.g. an agent)
+
+    Returns:
+        CircuitBreaker: The breaker shared by every session and service using that model
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(model_id)
+        if breaker is None:
+            breaker = CircuitBreaker(model_id)
+            _breakers[model_id] = breaker
+        return breaker
+
+
+def open_circuits():
+    """
+    Get the models whose circuit is not closed.
+
+    Returns:
+        dict: State by model id
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state for breaker in breakers if breaker.state != CircuitBreaker.CLOSED}
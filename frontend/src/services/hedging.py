@@ -0,0 +1,67 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from src.config.aws_config import HEDGING_CONFIG
+from src.services.metrics_service import METRICS
+from src.services.speculation_service import SpeculationBudget
+
+
+# Process-wide worker pool running the attempts of hedged calls
+_HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+# Hedges allowed per minute across the whole process, so an outage cannot double the load
+_HEDGE_BUDGET = SpeculationBudget(HEDGING_CONFIG['max_per_minute'])
+
+
+def hedge_delay(operation):
+    """
+    Get how long to wait for a call before hedging it.
+
+    Args:
+        operation (str): Name of the operation in the metrics registry
+
+    Returns:
+        float: The p95 latency of the operation in seconds, or the default delay
+               until enough calls were measured
+    """
+    p95 = METRICS.latency_percentile(operation, 95, HEDGING_CONFIG['min_samples'])
+    return HEDGING_CONFIG['default_delay_seconds'] if p95 is None else p95
+
+
+def hedged_call(operation, func, rate_limiter=None):
+    """
+    Make a call, firing a second identical attempt if the first is slower than usual.
+
+    Only operations listed in HEDGING_CONFIG are hedged, and only while the
+    hedge budget and the rate limiter have room: a hedge never waits for a
+    token. The first attempt to succeed wins; the other is left to finish
+    in the background and its result is dropped.
+
+    Args:
+        operation (str): Name of the operation in the metrics registry, e.g. "image.generate"
+        func (callable): Function making the call, safe to run twice concurrently
+        rate_limiter (RateLimiter): Limiter of the model, charged for the hedge
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        Exception: The error of the first attempt if every attempt failed
+    """
+    if operation not in HEDGING_CONFIG['operations']:
+        return func()
+
+    # Attempts run with the caller's context, so botocore retries are credited to its span
+    primary = _HEDGE_EXECUTOR.submit(contextvars.copy_context().run, func)
+    # Not primary.result(timeout): a call failing fast with a socket TimeoutError would look slow
+    wait([primary], timeout=hedge_delay(operation))
+    if primary.done():
+        return primary.result()
+
+    if not _HEDGE_BUDGET.try_spend() or (rate_limiter and not rate_limiter.acquire(blocking=False)):
+        return primary.result()
+    METRICS.record_hedge(operation)
+    hedge = _HEDGE_EXECUTOR.submit(contextvars.copy_context().run, func)
+    for attempt in as_completed([primary, hedge]):
+        if attempt.exception() is None:
+            return attempt.result()
+    return primary.result()
@@ -0,0 +1,120 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Process-wide worker pool shared by every session's image jobs
+_IMAGE_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image")
+
+
+class ImageJobService:
+    """
+    Background job queue for image generation.
+
+    Each Streamlit session owns one instance, which tracks the image jobs
+    of that session keyed by message index. The jobs themselves run on a
+    worker pool shared by the whole process, so page rendering never waits
+    on Nova Canvas.
+    """
+
+    PENDING = 'pending'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self, image_service):
+        """
+        Initialize the job queue for a session.
+
+        Args:
+            image_service (ImageService): Service used to generate the images
+        """
+        self.image_service = image_service
+        self.logger = logging.getLogger(__name__)
+        self._futures = {}
+
+    def submit(self, message_index, text):
+        """
+        Queue image generation for a message, unless a job already exists for it.
+
+        Args:
+            message_index (int): The index of the message in the chat history
+            text (str): The text to generate an image from
+        """
+        self.logger.info(f"Queueing image generation for message {message_index}")
+        self.submit_task(message_index, self.image_service.generate_image, text)
+
+    def submit_task(self, message_index, func, *args):
+        """
+        Queue any function producing the image for a message, e.g. a download of a saved image.
+
+        Args:
+            message_index (int): The index of the message in the chat history
+            func (callable): Function returning the image as BytesIO, or None on failure
+            *args: Arguments passed to the function
+        """
+        if message_index in self._futures:
+            return
+        self._futures[message_index] = _IMAGE_EXECUTOR.submit(func, *args)
+
+    def status(self, message_index):
+        """
+        Get the status of the image job for a message.
+
+        Args:
+            message_index (int): The index of the message in the chat history
+
+        Returns:
+            str: PENDING, READY or FAILED, or None if no job was submitted
+        """
+        future = self._futures.get(message_index)
+        if future is None:
+            return None
+        if not future.done():
+            return self.PENDING
+        if future.exception() is not None or future.result() is None:
+            return self.FAILED
+        return self.READY
+
+    def result(self, message_index):
+        """
+        Get the generated image for a message without blocking.
+
+        Args:
+            message_index (int): The index of the message in the chat history
+
+        Returns:
+            BytesIO: The generated image, or None if it is not ready or failed
+        """
+        if self.status(message_index) != self.READY:
+            return None
+        return self._futures[message_index].result()
+
+    def take(self, message_index):
+        """
+        Get the generated image for a message and forget its job, so the
+        full-resolution result is not kept alive by the queue.
+        
+        Args:
+            message_index (int): The index of the message in the chat history
+            
+        Returns:
+            BytesIO: The generated image, or None if it is not ready or failed
+        """
+        image = self.result(message_index)
+        if image is not None:
+            del self._futures[message_index]
+        return image
+
+    def has_pending(self):
+        """
+        Check whether any image job of this session is still running.
+
+        Returns:
+            bool: True if at least one job is pending
+        """
+        return any(not future.done() for future in self._futures.values())
+
+    def reset(self):
+        """
+        Forget all jobs of this session. Running jobs finish but their results are dropped.
+        """
+        self._futures.clear()
@@ -1,11 +1,30 @@
-import boto3
 import base64
 import json
 import io
 import logging
-from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
 from src.config.prompts import ImagePrompts
+from src.config.aws_config import (
+    IMAGE_BATCH_CONFIG,
+    IMAGE_CACHE_CONFIG,
+    IMAGE_GENERATION_CONFIG,
+    IMAGE_PROMPT_CONFIG
+)
+from src.config.aws_clients import get_client
+from src.services.cache_service import DiskCache
+from src.services.circuit_breaker import get_circuit_breaker
+from src.services.hedging import hedged_call
+from src.services.metrics_service import METRICS
+from src.services.rate_limiter import get_rate_limiter
+from src.services.prompt_condenser import PromptCondenser
+
+
+# Process-wide worker pool for batch generation (storyboards), bounded to protect the rate limit
+_BATCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=IMAGE_BATCH_CONFIG['max_workers'],
+    thread_name_prefix="image-batch"
+)
 
 
 class ImageError(Exception):
@@ -30,13 +49,33 @@ class ImageService:
         """
         Initialize the ImageService with AWS Bedrock client and model settings.
         """
-        self.client = boto3.client(
-            'bedrock-runtime',
-            config=Config(read_timeout=300)
-        )
+        self.client = get_client('bedrock-runtime', read_timeout=IMAGE_GENERATION_CONFIG['read_timeout'])
         self.model_id = 'amazon.nova-canvas-v1:0'  # Using Amazon Nova Canvas
         self.llm_model_id = 'us.anthropic.claude-3-5-haiku-20241022-v1:0'  # Claude 3.5 Haiku for summarization
         self.logger = logging.getLogger(__name__)
+        # 'local' builds image prompts with the condenser, 'llm' summarizes with Claude
+        self.prompt_mode = IMAGE_PROMPT_CONFIG['mode']
+        self.condenser = PromptCondenser()
+        # Nova Canvas generation settings, also part of the image cache key
+        self.image_generation_config = {
+            "numberOfImages": 1,
+            "height": IMAGE_GENERATION_CONFIG['height'],
+            "width": IMAGE_GENERATION_CONFIG['width'],
+            "cfgScale": 8.0,
+            "seed": 0
+        }
+        # Caches shared by every session, so repeated scenes cost no Bedrock calls
+        self.image_cache = None
+        self.summary_cache = None
+        if IMAGE_CACHE_CONFIG['enabled']:
+            self.image_cache = DiskCache.shared(
+                IMAGE_CACHE_CONFIG['image_dir'],
+                IMAGE_CACHE_CONFIG['image_max_bytes']
+            )
+            self.summary_cache = DiskCache.shared(
+                IMAGE_CACHE_CONFIG['summary_dir'],
+                IMAGE_CACHE_CONFIG['summary_max_bytes']
+            )
         # Store character information
         self.character_info = None
     
@@ -50,6 +89,25 @@ class ImageService:
         self.character_info = character_info
         self.logger.info(f"Character info set: {character_info}")
     
+    def _invoke_model(self, model_id, body):
+        """
+        Invoke a Bedrock model and read its whole response.
+        
+        Args:
+            model_id (str): The Bedrock model id
+            body (str): The JSON request body
+            
+        Returns:
+            bytes: The raw JSON response body
+        """
+        response = self.client.invoke_model(
+            modelId=model_id,
+            body=body,
+            accept="application/json",
+            contentType="application/json"
+        )
+        return response.get("body").read()
+    
     def _summarize_text(self, text, max_length=500):
         """
         Use Claude to generate a concise summary of the text for image generation.
@@ -78,6 +136,14 @@ class ImageService:
                 If the text describes the player character or refers to them, ensure the image description 
                 maintains consistency with their gender, race, and class.
                 """
+            
+            cache_key = None
+            if self.summary_cache:
+                cache_key = DiskCache.make_key(self.llm_model_id, max_length, character_context, text)
+                cached_summary = self.summary_cache.get(cache_key)
+                if cached_summary is not None:
+                    self.logger.info("Using cached summary for image prompt")
+                    return cached_summary.decode('utf-8')
                 
             prompt = f"""
             I need a concise, vivid description for image generation based on the following text. 
@@ -106,21 +172,35 @@ class ImageService:
             })
             
             # Invoke Amazon Bedrock Anthropic Claude model for summarization
-            response = self.client.invoke_model(
-                modelId=self.llm_model_id,
-                body=request_body,
-                accept="application/json",
-                contentType="application/json"
-            )
-            
-            # Parse the response
-            response_body = json.loads(response.get("body").read())
+            breaker = get_circuit_breaker(self.llm_model_id)
+            breaker.check()
+            rate_limiter = get_rate_limiter(self.llm_model_id)
+            rate_limiter.acquire()
+            try:
+                with METRICS.trace("image.summarize") as span:
+                    span.add_input(len(request_body))
+                    raw_body = hedged_call(
+                        "image.summarize",
+                        lambda: self._invoke_model(self.llm_model_id, request_body),
+                        rate_limiter
+                    )
+                    
+                    # Parse the response
+                    response_body = json.loads(raw_body)
+                    usage = response_body.get("usage", {})
+                    span.add_tokens(usage.get("input_tokens"), usage.get("output_tokens"))
+            except Exception as e:
+                breaker.record_failure(e)
+                raise
+            breaker.record_success()
             summary = response_body.get("content", [{}])[0].get("text", "")
             
             # Clean up the summary
             summary = summary.strip()
             
             self.logger.info(f"Generated summary for image prompt: {summary[:50]}...")
+            if cache_key and summary:
+                self.summary_cache.put(cache_key, summary.encode('utf-8'))
             return summary
             
         except Exception as e:
@@ -128,62 +208,141 @@ class ImageService:
             # Fall back to simple truncation if summarization fails
             return text[:max_length-3] + "..."
 
-    def generate_image(self, text):
+    def _build_text_to_image_params(self, text):
+        """
+        Build the Nova Canvas text-to-image parameters for a text.
+        
+        Args:
+            text (str): The text description to generate an image from
+            
+        Returns:
+            dict: Parameters with the image prompt, and the negative prompt in local mode
+        """
+        if self.prompt_mode == 'llm':
+            if not get_circuit_breaker(self.llm_model_id).is_open():
+                return {"text": self._summarize_text(text)}
+            # Claude is failing: build the prompt locally rather than waiting on it
+            METRICS.record_rejection("image.summarize")
+        return {
+            "text": self.condenser.condense(text, self.character_info),
+            "negativeText": self.condenser.negative_prompt()
+        }
+    
+    @staticmethod
+    def _image_dimension(pixels):
+        """
+        Round an image dimension to a size Nova Canvas accepts.
+        
+        Args:
+            pixels (int): The requested width or height
+            
+        Returns:
+            int: A multiple of 16 between 320 and 4096
+        """
+        return min(max(int(pixels) // 16 * 16, 320), 4096)
+    
+    def generate_image(self, text, width=None, height=None):
         """
         Generate an image from a text prompt using Nova Canvas.
         
         Args:
             text (str): The text description to generate an image from
+            width (int): Image width in pixels, overriding the configured resolution
+            height (int): Image height in pixels, overriding the configured resolution
             
         Returns:
             BytesIO: Image data as a BytesIO object, or None if generation failed
         """
+        images = self.generate_images(text, width=width, height=height)
+        return images[0] if images else None
+    
+    def generate_images(self, text, count=1, seed=None, width=None, height=None):
+        """
+        Generate one or more images of a text prompt in a single Nova Canvas call.
+        
+        Args:
+            text (str): The text description to generate images from
+            count (int): Number of variants to generate, up to 5
+            seed (int): Generation seed, overriding the configured one
+            width (int): Image width in pixels, overriding the configured resolution
+            height (int): Image height in pixels, overriding the configured resolution
+            
+        Returns:
+            list: Image data as BytesIO objects, or an empty list if generation failed
+        """
         try:
-            self.logger.info(f"Generating image with Amazon Nova Canvas model {self.model_id}")
+            self.logger.info(f"Generating {count} image(s) with Amazon Nova Canvas model {self.model_id}")
+            
+            # Build a concise image prompt, locally or with Claude
+            text_to_image_params = self._build_text_to_image_params(text)
             
-            # Generate a concise summary for image generation
-            image_prompt = self._summarize_text(text)
+            # Lower resolutions generate faster when speed matters
+            image_generation_config = dict(
+                self.image_generation_config,
+                numberOfImages=min(max(int(count), 1), IMAGE_BATCH_CONFIG['max_images_per_call']),
+                seed=self.image_generation_config["seed"] if seed is None else int(seed),
+                width=self._image_dimension(width or self.image_generation_config["width"]),
+                height=self._image_dimension(height or self.image_generation_config["height"])
+            )
+            
+            # Reuse the images if this exact prompt was already generated with the same settings
+            cache_keys = []
+            if self.image_cache:
+                # The first image keeps the key of single-image calls, so earlier cache entries stay valid
+                key_parts = (self.model_id, image_generation_config, text_to_image_params)
+                cache_keys = [
+                    DiskCache.make_key(*key_parts, index) if index else DiskCache.make_key(*key_parts)
+                    for index in range(image_generation_config["numberOfImages"])
+                ]
+                cached_images = [self.image_cache.get(key) for key in cache_keys]
+                if all(image is not None for image in cached_images):
+                    self.logger.info("Using cached images for prompt")
+                    return [io.BytesIO(image) for image in cached_images]
             
             # Format the request for Nova Canvas
             body = json.dumps({
                 "taskType": "TEXT_IMAGE",
-                "textToImageParams": {
-                    "text": image_prompt
-                },
-                "imageGenerationConfig": {
-                    "numberOfImages": 1,
-                    "height": 1024,
-                    "width": 1024,
-                    "cfgScale": 8.0,
-                    "seed": 0
-                }
+                "textToImageParams": text_to_image_params,
+                "imageGenerationConfig": image_generation_config
             })
             
+            # Skip the image rather than queue behind a failing model
+            breaker = get_circuit_breaker(self.model_id)
+            if not breaker.allow():
+                METRICS.record_rejection("image.generate")
+                self.logger.warning(f"Skipping image generation, circuit of {self.model_id} is open")
+                return []
+            
             # Invoke the model
-            response = self.client.invoke_model(
-                modelId=self.model_id,
-                body=body,
-                accept="application/json",
-                contentType="application/json"
-            )
+            rate_limiter = get_rate_limiter(self.model_id)
+            rate_limiter.acquire()
+            try:
+                with METRICS.trace("image.generate") as span:
+                    span.add_input(len(body))
+                    raw_body = hedged_call("image.generate", lambda: self._invoke_model(self.model_id, body), rate_limiter)
+                    span.add_output(len(raw_body))
+            except Exception as e:
+                breaker.record_failure(e)
+                raise
+            breaker.record_success()
             
             # Process the response
-            response_body = json.loads(response.get("body").read())
+            response_body = json.loads(raw_body)
             
             # Check for errors
             error = response_body.get("error")
             if error is not None:
                 raise ImageError(f"Image generation error: {error}")
             
-            # Extract and decode the image
-            base64_image = response_body.get("images")[0]
-            base64_bytes = base64_image.encode('ascii')
-            image_bytes = base64.b64decode(base64_bytes)
+            # Extract and decode the images
+            images = [base64.b64decode(image.encode('ascii')) for image in response_body.get("images", [])]
             
-            self.logger.info(f"Successfully generated image with Amazon Nova Canvas model {self.model_id}")
+            self.logger.info(f"Successfully generated {len(images)} image(s) with Amazon Nova Canvas model {self.model_id}")
+            for key, image_bytes in zip(cache_keys, images):
+                self.image_cache.put(key, image_bytes)
             
             # Return as BytesIO for Streamlit to display
-            return io.BytesIO(image_bytes)
+            return [io.BytesIO(image_bytes) for image_bytes in images]
             
         except ClientError as e:
             # Handle AWS client errors (permissions, throttling, etc.)
@@ -191,14 +350,41 @@ class ImageService:
             error_message = e.response.get("Error", {}).get("Message", "Unknown error")
             self.logger.error(f"Client error: {error_code} - {error_message}")
             print(f"Error generating image: {error_code} - {error_message}")
-            return None
+            return []
         except ImageError as e:
             # Handle specific image generation errors
             self.logger.error(e.message)
             print(f"Image generation error: {e.message}")
-            return None
+            return []
         except Exception as e:
             # Handle any other unexpected errors
             self.logger.error(f"Unexpected error: {str(e)}")
             print(f"Unexpected error generating image: {str(e)}")
-            return None 
\ No newline at end of file
+            return []
+    
+    def generate_storyboard(self, texts, seed=None, width=None, height=None):
+        """
+        Generate one image per scene, fanning out across the batch worker pool.
+        
+        Args:
+            texts (list): The scene descriptions, in story order
+            seed (int): Generation seed shared by every scene, for a consistent look
+            width (int): Image width in pixels, overriding the configured resolution
+            height (int): Image height in pixels, overriding the configured resolution
+            
+        Returns:
+            list: Image data as BytesIO objects, in the order of the texts,
+                  with None for the scenes that failed
+            
+        Calls still go through the shared Nova Canvas rate limit, so a large
+        storyboard cannot starve the interactive sessions of the process.
+        """
+        futures = [
+            _BATCH_EXECUTOR.submit(self.generate_images, text, 1, seed, width, height)
+            for text in texts
+        ]
+        storyboard = []
+        for future in futures:
+            images = future.result()
+            storyboard.append(images[0] if images else None)
+        return storyboard
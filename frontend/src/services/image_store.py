@@ -0,0 +1,217 @@
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+from PIL import Image as PILImage
+from src.config.aws_config import IMAGE_STORE_CONFIG
+from src.services.cache_service import DiskCache
+
+
+class StoredImage:
+    """
+    Lazy handle on the full-resolution original of a stored image.
+
+    Exposes getvalue() like BytesIO, so it can be passed wherever a
+    generated image is expected (snapshots, PDF export) without keeping
+    the original in memory.
+    """
+
+    def __init__(self, store, message_index, key):
+        self._store = store
+        self.message_index = message_index
+        self.key = key
+
+    def getvalue(self):
+        """
+        Read the original image.
+
+        Returns:
+            bytes: The image data, or None if it could not be found anywhere
+        """
+        return self._store.load_original(self.message_index, self.key)
+
+
+class ImageStore:
+    """
+    Compact, per-session store of the generated images.
+
+    Only downscaled WebP (or JPEG) thumbnails are kept in memory, for the
+    chat view, under a per-session memory cap with LRU eviction. The
+    full-resolution originals are spilled to a disk cache shared by the
+    process, with an optional fallback (e.g. the S3 copy of a saved game)
+    for originals evicted from the disk. Evicted thumbnails are rebuilt
+    from the originals on demand.
+    """
+
+    def __init__(self, max_memory_bytes=None, thumbnail_size=None, thumbnail_format=None,
+                 thumbnail_quality=None, fallback=None):
+        """
+        Initialize the store for a session.
+
+        Args:
+            max_memory_bytes (int): Memory cap for the thumbnails of this session
+            thumbnail_size (int): Maximum width and height of thumbnails in pixels
+            thumbnail_format (str): 'WEBP' or 'JPEG'
+            thumbnail_quality (int): Encoding quality of thumbnails
+            fallback (callable): Function returning the original image (BytesIO) of a
+                message index when it is no longer on disk, or None
+        """
+        self.max_memory_bytes = max_memory_bytes or IMAGE_STORE_CONFIG['memory_max_bytes']
+        self.thumbnail_size = thumbnail_size or IMAGE_STORE_CONFIG['thumbnail_size']
+        self.thumbnail_format = (thumbnail_format or IMAGE_STORE_CONFIG['thumbnail_format']).upper()
+        self.thumbnail_quality = thumbnail_quality or IMAGE_STORE_CONFIG['thumbnail_quality']
+        self.fallback = fallback
+        self.logger = logging.getLogger(__name__)
+        self.originals_cache = DiskCache.shared(
+            IMAGE_STORE_CONFIG['spill_dir'],
+            IMAGE_STORE_CONFIG['spill_max_bytes']
+        )
+        self._keys = {}  # message index -> disk cache key of the original
+        self._thumbnails = OrderedDict()  # message index -> thumbnail bytes, least recently used first
+        self._memory_bytes = 0
+        # The chat view, image jobs and background saves use the store from different threads
+        self._lock = threading.Lock()
+
+    def _make_thumbnail(self, data):
+        """
+        Downscale an image for the chat view.
+
+        Args:
+            data (bytes): The original image data
+
+        Returns:
+            bytes: The encoded thumbnail
+        """
+        with PILImage.open(io.BytesIO(data)) as source:
+            thumbnail = source.convert('RGB')
+        thumbnail.thumbnail((self.thumbnail_size, self.thumbnail_size))
+        buffer = io.BytesIO()
+        try:
+            thumbnail.save(buffer, format=self.thumbnail_format, quality=self.thumbnail_quality)
+        except (KeyError, OSError):
+            # Pillow built without WebP support
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, format='JPEG', quality=self.thumbnail_quality)
+        return buffer.getvalue()
+
+    def _remember_thumbnail(self, message_index, thumbnail):
+        """
+        Keep a thumbnail in memory, evicting least recently used ones over the cap.
+
+        The caller holds the lock.
+        """
+        self._memory_bytes -= len(self._thumbnails.pop(message_index, b""))
+        self._thumbnails[message_index] = thumbnail
+        self._memory_bytes += len(thumbnail)
+        # Always keep the newest thumbnail, even if it alone exceeds the cap
+        while self._memory_bytes > self.max_memory_bytes and len(self._thumbnails) > 1:
+            _, evicted = self._thumbnails.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def put(self, message_index, image):
+        """
+        Store the image of a message.
+
+        Args:
+            message_index (int): The index of the message in the chat history
+            image (BytesIO): The full-resolution image
+        """
+        data = image.getvalue() if hasattr(image, 'getvalue') else image
+        key = hashlib.sha256(data).hexdigest()
+        self.originals_cache.put(key, data)
+        thumbnail = self._make_thumbnail(data)
+        with self._lock:
+            self._keys[message_index] = key
+            self._remember_thumbnail(message_index, thumbnail)
+
+    def thumbnail(self, message_index):
+        """
+        Get the thumbnail of a message's image, rebuilding it if it was evicted.
+
+        Args:
+            message_index (int): The index of the message in the chat history
+
+        Returns:
+            BytesIO: The thumbnail, or None if the message has no stored image
+        """
+        with self._lock:
+            if message_index in self._thumbnails:
+                self._thumbnails.move_to_end(message_index)
+                return io.BytesIO(self._thumbnails[message_index])
+            key = self._keys.get(message_index)
+        if key is None:
+            return None
+
+        data = self.load_original(message_index, key)
+        if data is None:
+            return None
+        thumbnail = self._make_thumbnail(data)
+        with self._lock:
+            self._remember_thumbnail(message_index, thumbnail)
+        return io.BytesIO(thumbnail)
+
+    def load_original(self, message_index, key):
+        """
+        Read the full-resolution original of a message's image.
+
+        Args:
+            message_index (int): The index of the message in the chat history
+            key (str): Disk cache key of the original
+
+        Returns:
+            bytes: The image data, or None if it could not be found anywhere
+        """
+        data = self.originals_cache.get(key)
+        if data is not None:
+            return data
+        if self.fallback:
+            try:
+                image = self.fallback(message_index)
+            except Exception as e:
+                self.logger.warning(f"Could not load original image {message_index}: {str(e)}")
+                image = None
+            if image is not None:
+                data = image.getvalue()
+                self.originals_cache.put(key, data)
+                return data
+        # Better a downscaled image than none at all
+        with self._lock:
+            return self._thumbnails.get(message_index)
+
+    def originals(self):
+        """
+        Get lazy handles on the originals of every stored image.
+
+        Returns:
+            dict: StoredImage by message index
+        """
+        with self._lock:
+            keys = list(self._keys.items())
+        return {index: StoredImage(self, index, key) for index, key in keys}
+
+    def memory_bytes(self):
+        """
+        Get the memory used by the thumbnails of this session.
+
+        Returns:
+            int: Size of the thumbnails in bytes
+        """
+        return self._memory_bytes
+
+    def __contains__(self, message_index):
+        with self._lock:
+            return message_index in self._keys
+
+    def __len__(self):
+        with self._lock:
+            return len(self._keys)
+
+    def clear(self):
+        """
+        Forget every image of this session. Originals stay in the shared disk cache until evicted.
+        """
+        with self._lock:
+            self._keys.clear()
+            self._thumbnails.clear()
+            self._memory_bytes = 0
@@ -0,0 +1,301 @@
+import json
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.config.aws_config import MEMORY_CONFIG
+from src.config.aws_clients import get_client
+from src.config.prompts import MEMORY_SUMMARY_PROMPT
+from src.services.circuit_breaker import get_circuit_breaker
+from src.services.hedging import hedged_call
+from src.services.metrics_service import METRICS
+from src.services.rate_limiter import get_rate_limiter
+
+
+# Process-wide worker pool folding turns into the summaries of every session
+_MEMORY_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory")
+
+
+class LocalSummarizer:
+    """
+    Extractive summarizer keeping the player's action and the opening
+    sentence of each narrative. Free and instant, used as the fallback of
+    the Claude summarizer.
+    """
+
+    _FIRST_SENTENCE = re.compile(r"^\s*([^.!?]*[.!?])")
+
+    def summarize(self, summary, turns, max_chars):
+        """
+        Fold turns into a summary.
+
+        Args:
+            summary (str): The summary of the earlier turns, possibly empty
+            turns (list): (action, narrative) tuples to add
+            max_chars (int): Maximum length of the summary
+
+        Returns:
+            str: The new summary
+        """
+        parts = [summary] if summary else []
+        for action, narrative in turns:
+            match = self._FIRST_SENTENCE.match(narrative)
+            sentence = match.group(1).strip() if match else narrative.strip()[:200]
+            if action:
+                action = action.strip().rstrip('.')
+                sentence = f"The player chose to {action[:1].lower()}{action[1:]}. {sentence}"
+            parts.append(sentence)
+        text = " ".join(parts)
+        if len(text) <= max_chars:
+            return text
+        # Keep the most recent events, starting at a sentence boundary
+        text = text[-max_chars:]
+        boundary = re.search(r"[.!?]\s+", text)
+        return text[boundary.end():] if boundary else text
+
+
+class ClaudeSummarizer:
+    """
+    Abstractive summarizer using a small Claude model.
+    """
+
+    def __init__(self, model_id=None):
+        """
+        Initialize the summarizer.
+
+        Args:
+            model_id (str): Bedrock model used for the summaries
+        """
+        self.model_id = model_id or MEMORY_CONFIG['model_id']
+        self.client = get_client('bedrock-runtime')
+        self.fallback = LocalSummarizer()
+        self.logger = logging.getLogger(__name__)
+
+    def _invoke(self, body):
+        response = self.client.invoke_model(
+            modelId=self.model_id,
+            body=body,
+            accept="application/json",
+            contentType="application/json"
+        )
+        return response.get("body").read()
+
+    def summarize(self, summary, turns, max_chars):
+        """
+        Fold turns into a summary, falling back to the local summarizer on errors
+        or while the circuit of the model is open.
+
+        Args:
+            summary (str): The summary of the earlier turns, possibly empty
+            turns (list): (action, narrative) tuples to add
+            max_chars (int): Maximum length of the summary
+
+        Returns:
+            str: The new summary
+        """
+        prompt = MEMORY_SUMMARY_PROMPT.format(
+            summary=summary or "The game has just started.",
+            turns=ConversationMemory.format_turns(turns),
+            max_words=max_chars // 6
+        )
+        body = json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_chars // 3,
+            "temperature": 0.2,
+            "messages": [{"role": "user", "content": prompt}]
+        })
+        breaker = get_circuit_breaker(self.model_id)
+        if not breaker.allow():
+            METRICS.record_rejection("memory.summarize")
+            return self.fallback.summarize(summary, turns, max_chars)
+        try:
+            rate_limiter = get_rate_limiter(self.model_id)
+            rate_limiter.acquire()
+            with METRICS.trace("memory.summarize") as span:
+                span.add_input(len(prompt.encode('utf-8')))
+                raw_body = hedged_call("memory.summarize", lambda: self._invoke(body), rate_limiter)
+                response_body = json.loads(raw_body)
+                usage = response_body.get("usage", {})
+                span.add_tokens(usage.get("input_tokens"), usage.get("output_tokens"))
+            breaker.record_success()
+            new_summary = response_body.get("content", [{}])[0].get("text", "").strip()
+            if new_summary:
+                return new_summary[:max_chars]
+        except Exception as e:
+            breaker.record_failure(e)
+            self.logger.error(f"Error summarizing turns: {str(e)}")
+        return self.fallback.summarize(summary, turns, max_chars)
+
+
+class ConversationMemory:
+    """
+    Bounded memory of a game: a rolling summary plus the latest turns verbatim.
+
+    Each session owns one instance. Every few turns, the turns that left
+    the verbatim window are folded into the summary in the background, so
+    the context handed to the agent (suggestions, speculative turns, a
+    rotated agent session) stays the same size however long the game runs.
+    """
+
+    def __init__(self, summarizer=None, summarize_every=None, verbatim_turns=None,
+                 max_summary_chars=None, max_turn_chars=None):
+        """
+        Initialize the memory of a game.
+
+        Args:
+            summarizer: Object with a summarize(summary, turns, max_chars) method
+            summarize_every (int): Number of turns left out of the window that triggers a summary
+            verbatim_turns (int): Number of latest turns kept verbatim
+            max_summary_chars (int): Maximum length of the summary
+            max_turn_chars (int): Maximum length of each verbatim narrative
+        """
+        if summarizer is None:
+            summarizer = ClaudeSummarizer() if MEMORY_CONFIG['summarizer'] == 'llm' else LocalSummarizer()
+        self.summarizer = summarizer
+        self.summarize_every = summarize_every or MEMORY_CONFIG['summarize_every']
+        self.verbatim_turns = verbatim_turns or MEMORY_CONFIG['verbatim_turns']
+        self.max_summary_chars = max_summary_chars or MEMORY_CONFIG['max_summary_chars']
+        self.max_turn_chars = max_turn_chars or MEMORY_CONFIG['max_turn_chars']
+        self._lock = threading.Lock()
+        self._turns = []  # (action, narrative), the action is None for the opening scene
+        self._summary = ""
+        self._summarized = 0  # Number of turns folded into the summary
+        self._fold_future = None  # At most one summary runs at a time
+        self._generation = 0  # Incremented by restore(), so a summary of the previous game is dropped
+
+    @staticmethod
+    def format_turns(turns, max_turn_chars=None):
+        """
+        Format turns as a transcript.
+
+        Args:
+            turns (list): (action, narrative) tuples
+            max_turn_chars (int): Maximum length of each narrative
+
+        Returns:
+            str: One line per player action and Game Master narrative
+        """
+        lines = []
+        for action, narrative in turns:
+            if action:
+                lines.append(f"Player: {action}")
+            if max_turn_chars and len(narrative) > max_turn_chars:
+                narrative = narrative[:max_turn_chars].rsplit(" ", 1)[0] + "..."
+            lines.append(f"Game Master: {narrative}")
+        return "\n".join(lines)
+
+    def add_turn(self, action, narrative):
+        """
+        Record a turn, folding older turns into the summary if enough have accumulated.
+
+        Args:
+            action (str): The player's action, or None for the opening scene
+            narrative (str): The Game Master's response
+        """
+        with self._lock:
+            self._turns.append((action, narrative))
+        self._maybe_fold()
+
+    def restore(self, messages, summary="", summarized=0):
+        """
+        Rebuild the memory from the chat history of a resumed game.
+
+        Args:
+            messages (list): List of message dictionaries containing the chat history
+            summary (str): Summary already made of the first turns, as returned by state()
+            summarized (int): Number of turns covered by the summary
+        """
+        turns = []
+        action = None
+        for message in messages:
+            if message["role"] == "user":
+                action = message["content"]
+            else:
+                turns.append((action, message["content"]))
+                action = None
+        if summarized > len(turns):
+            # The summary is ahead of the chat history, start over
+            summary, summarized = "", 0
+        with self._lock:
+            self._turns = turns
+            self._summary = summary
+            self._summarized = summarized
+            # A summary still running is discarded by _fold, which then starts the next one
+            self._generation += 1
+        self._maybe_fold()
+
+    def state(self):
+        """
+        Get the summary of the memory, so another process can restore it without summarizing again.
+
+        Returns:
+            dict: The summary and the number of turns it covers
+        """
+        with self._lock:
+            return {'summary': self._summary, 'summarized': self._summarized}
+
+    def _maybe_fold(self):
+        """
+        Start a background summary once enough turns left the verbatim window.
+        """
+        with self._lock:
+            if self._fold_future is not None:
+                return
+            foldable = len(self._turns) - self.verbatim_turns
+            if foldable - self._summarized < self.summarize_every:
+                return
+            turns = self._turns[self._summarized:foldable]
+            self._fold_future = _MEMORY_EXECUTOR.submit(
+                self._fold, self._summary, turns, foldable, self._generation
+            )
+
+    def _fold(self, summary, turns, summarized, generation):
+        """
+        Fold turns into the summary.
+
+        Args:
+            summary (str): The summary the turns are added to
+            turns (list): (action, narrative) tuples to fold
+            summarized (int): Number of turns covered by the new summary
+            generation (int): Generation of the memory the turns were taken from
+        """
+        new_summary = self.summarizer.summarize(summary, turns, self.max_summary_chars)
+        with self._lock:
+            # Drop the result if the memory was restored in the meantime
+            if generation == self._generation:
+                self._summary = new_summary
+                self._summarized = summarized
+            self._fold_future = None
+        # Turns may have kept coming in while summarizing
+        self._maybe_fold()
+
+    def context(self):
+        """
+        Get the bounded context of the game.
+
+        Returns:
+            str: The summary of older turns followed by the latest turns,
+                 or an empty string if the game has no turns yet
+        """
+        with self._lock:
+            summary = self._summary
+            # Turns waiting to be folded stay verbatim until the summary catches up
+            turns = self._turns[self._summarized:]
+        # Bounded even if the summarizer fell behind
+        turns = turns[-(self.verbatim_turns + self.summarize_every):]
+        parts = []
+        if summary:
+            parts.append(f"Story so far: {summary}")
+        if turns:
+            parts.append("Latest turns:\n" + self.format_turns(turns, self.max_turn_chars))
+        return "\n\n".join(parts)
+
+    def turn_count(self):
+        """
+        Get the number of turns of the game.
+
+        Returns:
+            int: Number of Game Master responses recorded
+        """
+        with self._lock:
+            return len(self._turns)
@@ -0,0 +1,434 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.config.aws_config import METRICS_CONFIG
+
+
+def is_throttle(error):
+    """
+    Check whether an error is a throttling error from AWS.
+
+    Args:
+        error (Exception): The error raised by a call
+
+    Returns:
+        bool: True if the call was throttled
+    """
+    response = getattr(error, 'response', None)
+    code = response.get("Error", {}).get("Code", "") if isinstance(response, dict) else ""
+    return code in ("ThrottlingException", "TooManyRequestsException") or "throttlingException" in str(error)
+
+
+# Span of the call being made in the current thread or task, credited with the attempts botocore retries
+_ACTIVE_SPAN = contextvars.ContextVar('active_span', default=None)
+
+
+class Span:
+    """
+    Measurements of a single call, recorded into the registry when finished.
+    """
+
+    def __init__(self, registry, operation):
+        self.registry = registry
+        self.operation = operation
+        self.started_at = time.perf_counter()
+        self.time_to_first_chunk = None
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.throttled = False
+        self.retries = 0  # Attempts retried by botocore inside the call
+        self.throttled_attempts = 0  # Attempts throttled, whether botocore retried them or not
+        self._finished = False
+
+    def first_chunk(self):
+        """
+        Mark the arrival of the first chunk of a streamed response.
+        """
+        if self.time_to_first_chunk is None:
+            self.time_to_first_chunk = time.perf_counter() - self.started_at
+
+    def add_input(self, size):
+        self.input_bytes += size
+
+    def add_output(self, size):
+        self.output_bytes += size
+
+    def add_tokens(self, input_tokens=0, output_tokens=0):
+        self.input_tokens += input_tokens or 0
+        self.output_tokens += output_tokens or 0
+
+    def finish(self, error=None):
+        """
+        Record the call. Only the first call has an effect.
+
+        Args:
+            error (Exception): The error the call failed with, if any
+        """
+        if self._finished:
+            return
+        self._finished = True
+        if error is not None and is_throttle(error):
+            self.throttled = True
+        self.registry.record(self, time.perf_counter() - self.started_at, error)
+
+
+class OperationStats:
+    """
+    Counters and recent latency samples of one operation.
+    """
+
+    COUNTERS = (
+        'calls', 'errors', 'retries', 'throttles', 'hedges', 'rejections',
+        'input_bytes', 'output_bytes', 'input_tokens', 'output_tokens'
+    )
+
+    def __init__(self, sample_size):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.throttles = 0
+        self.hedges = 0  # Second attempts fired for slow calls
+        self.rejections = 0  # Calls refused while the circuit was open
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.latencies = deque(maxlen=sample_size)
+        self.first_chunk_latencies = deque(maxlen=sample_size)
+
+    @staticmethod
+    def _percentiles(samples):
+        if not samples:
+            return {'p50': None, 'p95': None, 'p99': None}
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return {
+            f"p{q}": round(ordered[min(last, int(round(q / 100 * last)))], 4)
+            for q in (50, 95, 99)
+        }
+
+    def snapshot(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'retries': self.retries,
+            'throttles': self.throttles,
+            'hedges': self.hedges,
+            'rejections': self.rejections,
+            'input_bytes': self.input_bytes,
+            'output_bytes': self.output_bytes,
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'latency_seconds': self._percentiles(self.latencies),
+            'time_to_first_chunk_seconds': self._percentiles(self.first_chunk_latencies)
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide latency and cost metrics of the Bedrock, S3 and MCP calls.
+
+    Latency percentiles are computed over the most recent samples of each
+    operation. The registry can be exported as JSON, in the Prometheus
+    text format, or shown in the Streamlit debug panel.
+    """
+
+    def __init__(self, sample_size=None):
+        """
+        Initialize the registry.
+
+        Args:
+            sample_size (int): Number of recent latency samples kept per operation
+        """
+        self.sample_size = sample_size or METRICS_CONFIG['sample_size']
+        self.enabled = METRICS_CONFIG['enabled']
+        self._lock = threading.Lock()
+        self._operations = {}
+
+    def _stats(self, operation):
+        stats = self._operations.get(operation)
+        if stats is None:
+            stats = self._operations[operation] = OperationStats(self.sample_size)
+        return stats
+
+    @contextmanager
+    def trace(self, operation):
+        """
+        Measure a call made inside the block.
+
+        Args:
+            operation (str): Name of the operation, e.g. "agent.invoke_agent"
+
+        Yields:
+            Span: The span of the call, to record chunks, sizes and tokens
+        """
+        span = Span(self, operation)
+        token = _ACTIVE_SPAN.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(e if isinstance(e, Exception) else None)
+            raise
+        finally:
+            _ACTIVE_SPAN.reset(token)
+        span.finish()
+
+    def start_span(self, operation):
+        """
+        Start measuring a call that outlives a block, e.g. a streamed response.
+
+        Args:
+            operation (str): Name of the operation
+
+        Returns:
+            Span: The span of the call, recorded when its finish() is called
+        """
+        return Span(self, operation)
+
+    @contextmanager
+    def activate(self, span):
+        """
+        Credit the AWS calls made inside the block to a span from start_span().
+
+        Args:
+            span (Span): The span of the call
+        """
+        token = _ACTIVE_SPAN.set(span)
+        try:
+            yield span
+        finally:
+            _ACTIVE_SPAN.reset(token)
+
+    def record(self, span, latency, error=None):
+        """
+        Record a finished span.
+
+        Args:
+            span (Span): The finished span
+            latency (float): Duration of the call in seconds
+            error (Exception): The error the call failed with, if any
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._stats(span.operation)
+            stats.calls += 1
+            stats.errors += error is not None
+            # A call that failed throttled counts once even without botocore's counts (e.g. offline)
+            stats.throttles += max(span.throttled_attempts, int(span.throttled))
+            stats.retries += span.retries
+            stats.input_bytes += span.input_bytes
+            stats.output_bytes += span.output_bytes
+            stats.input_tokens += span.input_tokens
+            stats.output_tokens += span.output_tokens
+            stats.latencies.append(latency)
+            if span.time_to_first_chunk is not None:
+                stats.first_chunk_latencies.append(span.time_to_first_chunk)
+
+    def record_retry(self, operation):
+        """
+        Count a retry of an operation.
+
+        Args:
+            operation (str): Name of the operation
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._stats(operation).retries += 1
+
+    def record_hedge(self, operation):
+        """
+        Count a hedged (second) attempt of an operation.
+
+        Args:
+            operation (str): Name of the operation
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._stats(operation).hedges += 1
+
+    def record_rejection(self, operation):
+        """
+        Count a call refused by an open circuit breaker.
+
+        Args:
+            operation (str): Name of the operation
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._stats(operation).rejections += 1
+
+    def latency_percentile(self, operation, q, min_samples=1):
+        """
+        Get a percentile of the recent latencies of an operation.
+
+        Args:
+            operation (str): Name of the operation
+            q (int): Percentile, e.g. 95
+            min_samples (int): Number of samples needed for a meaningful value
+
+        Returns:
+            float: The latency in seconds, or None with fewer samples
+        """
+        with self._lock:
+            stats = self._operations.get(operation)
+            samples = sorted(stats.latencies) if stats else []
+        if len(samples) < max(min_samples, 1):
+            return None
+        last = len(samples) - 1
+        return samples[min(last, int(round(q / 100 * last)))]
+
+    def snapshot(self):
+        """
+        Get the metrics of every operation.
+
+        Returns:
+            dict: Counters and latency percentiles by operation name
+        """
+        with self._lock:
+            return {operation: stats.snapshot() for operation, stats in sorted(self._operations.items())}
+
+    def to_prometheus(self):
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, one sample per line
+        """
+        lines = []
+        for operation, stats in self.snapshot().items():
+            labels = f'operation="{operation}"'
+            for name in OperationStats.COUNTERS:
+                lines.append(f"game_master_{name}_total{{{labels}}} {stats[name]}")
+            for name in ('latency_seconds', 'time_to_first_chunk_seconds'):
+                for quantile, value in stats[name].items():
+                    if value is not None:
+                        q = int(quantile[1:]) / 100
+                        lines.append(f'game_master_{name}{{{labels},quantile="{q}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def dump_json(self, path):
+        """
+        Write the metrics to a JSON file, atomically.
+
+        Args:
+            path (str): Destination file
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'timestamp': time.time(), 'operations': self.snapshot()}, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+# Shared by every session of the process
+METRICS = MetricsRegistry()
+
+
+def _on_aws_attempt(response=None, **kwargs):
+    """
+    Count a throttled attempt of the active span (botocore needs-retry event).
+
+    Args:
+        response (tuple): (HTTP response, parsed response) of the attempt, None on connection errors
+    """
+    span = _ACTIVE_SPAN.get()
+    if span is None or response is None:
+        return
+    code = response[1].get("Error", {}).get("Code", "")
+    if code in ("ThrottlingException", "TooManyRequestsException", "throttlingException"):
+        span.throttled_attempts += 1
+
+
+def _on_aws_call(parsed=None, **kwargs):
+    """
+    Count the attempts botocore retried in a call of the active span (botocore after-call event).
+
+    Args:
+        parsed (dict): The parsed response, with its ResponseMetadata
+    """
+    span = _ACTIVE_SPAN.get()
+    if span is None or not isinstance(parsed, dict):
+        return
+    span.retries += parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+
+
+def instrument_client(client):
+    """
+    Count the throttles and retries that botocore absorbs in a client's calls.
+
+    They are credited to the span of the call (see MetricsRegistry.trace and
+    activate), so the panel shows throttling even when botocore's adaptive
+    retries hide it from the caller.
+
+    Args:
+        client (botocore.client.BaseClient): The client to instrument
+    """
+    client.meta.events.register('needs-retry', _on_aws_attempt)
+    client.meta.events.register('after-call', _on_aws_call)
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+class _PrometheusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = METRICS.to_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _dump_periodically(path, interval):
+    logger = logging.getLogger(__name__)
+    while True:
+        time.sleep(interval)
+        try:
+            METRICS.dump_json(path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics to {path}: {str(e)}")
+
+
+def start_exporters():
+    """
+    Start the configured exporters once per process: a Prometheus endpoint
+    on METRICS_PORT and a JSON dump to METRICS_JSON_PATH.
+    """
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started or not METRICS_CONFIG['enabled']:
+            return
+        _exporters_started = True
+
+    if METRICS_CONFIG['prometheus_port']:
+        try:
+            server = ThreadingHTTPServer(('0.0.0.0', METRICS_CONFIG['prometheus_port']), _PrometheusHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"Could not start the metrics endpoint: {str(e)}")
+    if METRICS_CONFIG['json_path']:
+        threading.Thread(
+            target=_dump_periodically,
+            args=(METRICS_CONFIG['json_path'], METRICS_CONFIG['json_interval_seconds']),
+            name="metrics-json",
+            daemon=True
+        ).start()
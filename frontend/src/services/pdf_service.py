@@ -1,7 +1,17 @@
+import hashlib
 import io
+import json
+import os
+import shutil
+import tempfile
+import weakref
+from xml.sax.saxutils import escape
+from PIL import Image as PILImage
+from pypdf import PdfWriter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 
 
@@ -13,6 +23,52 @@ class PDFService:
     formatted PDF documents.
     """
     
+    # Stylesheet shared by every document, built on first use
+    _styles = None
+    
+    @classmethod
+    def get_styles(cls):
+        """
+        Get the stylesheet with the custom user and assistant message styles.
+        
+        Returns:
+            StyleSheet1: The shared stylesheet
+        """
+        if cls._styles is None:
+            # Get the default styles and add custom styles for user and assistant messages
+            styles = getSampleStyleSheet()
+            
+            styles.add(ParagraphStyle(
+                name='User',
+                parent=styles['Normal'],
+                textColor=colors.blue,
+                spaceAfter=12
+            ))
+            styles.add(ParagraphStyle(
+                name='Assistant',
+                parent=styles['Normal'],
+                textColor=colors.green,
+                spaceAfter=12
+            ))
+            cls._styles = styles
+        return cls._styles
+    
+    @staticmethod
+    def message_paragraph(message):
+        """
+        Build the paragraph for a chat message.
+        
+        Args:
+            message (dict): Message dictionary with role and content
+        
+        Returns:
+            Paragraph: The formatted message
+        """
+        styles = PDFService.get_styles()
+        style = 'User' if message["role"] == "user" else 'Assistant'
+        text = escape(f"{message['role'].title()}: {message['content']}").replace("\n", "<br/>")
+        return Paragraph(text, styles[style])
+    
     @staticmethod
     def create_chat_pdf(messages):
         """
@@ -20,10 +76,10 @@ class PDFService:
         
         Args:
             messages (list): List of message dictionaries containing the chat history
-            
+        
         Returns:
             io.BytesIO: PDF document as a BytesIO buffer
-            
+        
         The PDF will format user and assistant messages differently,
         with user messages in blue and assistant messages in green.
         """
@@ -33,32 +89,172 @@ class PDFService:
         # Create the PDF document with letter size pages
         doc = SimpleDocTemplate(buffer, pagesize=letter)
         
-        # Get the default styles and add custom styles for user and assistant messages
-        styles = getSampleStyleSheet()
-        
-        styles.add(ParagraphStyle(
-            name='User',
-            parent=styles['Normal'],
-            textColor=colors.blue,
-            spaceAfter=12
-        ))
-        styles.add(ParagraphStyle(
-            name='Assistant',
-            parent=styles['Normal'],
-            textColor=colors.green,
-            spaceAfter=12
-        ))
-        
         # Build the PDF content
         story = []
         for message in messages:
-            style = 'User' if message["role"] == "user" else 'Assistant'
-            text = f"{message['role'].title()}: {message['content']}"
-            story.append(Paragraph(text, styles[style]))
+            story.append(PDFService.message_paragraph(message))
             story.append(Spacer(1, 12))
         
         # Build the PDF and reset the buffer position
         doc.build(story)
         buffer.seek(0)
         
-        return buffer 
\ No newline at end of file
+        return buffer
+
+
+class PDFExporter:
+    """
+    Incremental PDF exporter for a single game session.
+    
+    The story is laid out in parts of a fixed number of messages, each
+    written to its own PDF file in a working directory on disk. A full
+    part is kept, so later exports only lay out the messages added since
+    the last full part, then concatenate the parts into the exported file.
+    A part is laid out again only if its messages or images changed, e.g.
+    when an image arrives late. Each part starts on a new page.
+    
+    Each image is prepared once: it is downscaled and spilled to the
+    working directory, so long campaigns are saved in bounded memory.
+    """
+    
+    def __init__(self, image_max_size=512, image_quality=75, image_width=3 * inch, part_messages=20):
+        """
+        Initialize the exporter with its working directory.
+        
+        Args:
+            image_max_size (int): Maximum width and height of embedded images in pixels
+            image_quality (int): JPEG quality of embedded images
+            image_width (float): Width of embedded images on the page in points
+            part_messages (int): Number of messages laid out in each part
+        """
+        self.image_max_size = image_max_size
+        self.image_quality = image_quality
+        self.image_width = image_width
+        self.part_messages = part_messages
+        self.work_dir = tempfile.mkdtemp(prefix="game-master-pdf-")
+        self._images = {}  # message index -> (path, width, height)
+        self._parts = []  # Full parts laid out: (path, first message index, end index, digest of their messages)
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.work_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _digest(messages):
+        return hashlib.sha256(json.dumps(messages, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def _prepare_image(self, index, image):
+        """
+        Downscale an image and write it to the working directory.
+        
+        Args:
+            index (int): The index of the message the image belongs to
+            image (BytesIO): Image data as generated for the chat
+        """
+        data = image.getvalue() if hasattr(image, 'getvalue') else image
+        if data is None:
+            # The original could not be found; export the turn without its image
+            return
+        with PILImage.open(io.BytesIO(data)) as source:
+            thumbnail = source.convert('RGB')
+            thumbnail.thumbnail((self.image_max_size, self.image_max_size))
+            path = os.path.join(self.work_dir, f"image_{index}.jpg")
+            thumbnail.save(path, format='JPEG', quality=self.image_quality)
+            self._images[index] = (path, thumbnail.width, thumbnail.height)
+    
+    def update(self, generated_images=None):
+        """
+        Prepare the images not prepared by a previous export.
+        
+        Args:
+            generated_images (dict): Images by message index
+            
+        Returns:
+            set: Message indices of the images prepared now
+        """
+        prepared = set()
+        for index, image in (generated_images or {}).items():
+            if index not in self._images and image is not None:
+                self._prepare_image(index, image)
+                if index in self._images:
+                    prepared.add(index)
+        return prepared
+    
+    def _invalidate(self, messages, changed_images):
+        """
+        Drop the parts from the first one whose messages or images changed.
+        
+        Args:
+            messages (list): The chat history being exported
+            changed_images (set): Message indices of the images prepared since the last export
+        """
+        for position, (_, start, end, digest) in enumerate(self._parts):
+            if (end > len(messages) or digest != self._digest(messages[start:end])
+                    or any(start <= index < end for index in changed_images)):
+                for path, *_ in self._parts[position:]:
+                    os.remove(path)
+                del self._parts[position:]
+                return
+    
+    def _write_part(self, messages, start, end):
+        """
+        Lay out some messages with their images in a PDF file of their own.
+        
+        Args:
+            messages (list): The chat history
+            start (int): Index of the first message of the part
+            end (int): Index after the last message of the part
+            
+        Returns:
+            str: Path of the part in the working directory
+        """
+        story = []
+        for index in range(start, end):
+            story.append(PDFService.message_paragraph(messages[index]))
+            if index in self._images:
+                path, width, height = self._images[index]
+                story.append(Image(path, width=self.image_width, height=self.image_width * height / width))
+            story.append(Spacer(1, 12))
+        
+        fd, path = tempfile.mkstemp(prefix="part_", suffix=".pdf", dir=self.work_dir)
+        os.close(fd)
+        SimpleDocTemplate(path, pagesize=letter).build(story)
+        return path
+    
+    def export(self, messages, generated_images=None):
+        """
+        Write the chat history to a temporary PDF file, laying out only what changed.
+        
+        Args:
+            messages (list): List of message dictionaries containing the chat history
+            generated_images (dict): Images by message index
+        
+        Returns:
+            str: Path of the PDF file, to be removed by the caller once uploaded
+        """
+        self._invalidate(messages, self.update(generated_images))
+        
+        start = self._parts[-1][2] if self._parts else 0
+        while len(messages) - start >= self.part_messages:
+            end = start + self.part_messages
+            self._parts.append((self._write_part(messages, start, end), start, end, self._digest(messages[start:end])))
+            start = end
+        part_paths = [part[0] for part in self._parts]
+        # The last messages don't fill a part yet, they are laid out again with the next ones
+        tail_path = None
+        if start < len(messages) or not part_paths:
+            tail_path = self._write_part(messages, start, len(messages))
+            part_paths.append(tail_path)
+        
+        writer = PdfWriter()
+        for part_path in part_paths:
+            writer.append(part_path)
+        fd, path = tempfile.mkstemp(prefix="game_session_", suffix=".pdf", dir=self.work_dir)
+        with os.fdopen(fd, 'wb') as f:
+            writer.write(f)
+        if tail_path:
+            os.remove(tail_path)
+        return path
+    
+    def close(self):
+        """
+        Remove the working directory and every file prepared in it.
+        """
+        self._finalizer()
@@ -0,0 +1,143 @@
+import re
+from src.config.prompts import ImagePrompts
+
+
+class PromptCondenser:
+    """
+    Local, extractive builder of image prompts.
+
+    Picks the most visual sentences of a narrative response, prefixes them
+    with the player character's descriptors and appends the shared image
+    style. It replaces the Claude summarization hop before each Nova Canvas
+    call, at no cost and in well under a millisecond.
+    """
+
+    # Words that make a sentence worth illustrating
+    VISUAL_NOUNS = {
+        "forest", "woods", "tree", "trees", "mountain", "mountains", "river", "lake", "sea", "shore",
+        "cave", "cavern", "dungeon", "castle", "tower", "ruins", "temple", "village", "town", "city",
+        "tavern", "inn", "market", "street", "road", "path", "bridge", "gate", "door", "wall", "walls",
+        "hall", "chamber", "room", "throne", "altar", "statue", "pillar", "pillars", "stairs", "fire",
+        "torch", "torches", "candle", "candles", "lantern", "moon", "sun", "sky", "stars", "clouds",
+        "fog", "mist", "rain", "snow", "storm", "shadow", "shadows", "light", "flames", "smoke",
+        "dragon", "goblin", "goblins", "orc", "orcs", "troll", "wolf", "wolves", "skeleton", "undead",
+        "creature", "beast", "monster", "knight", "guard", "guards", "merchant", "innkeeper", "hermit",
+        "wizard", "priest", "bard", "crowd", "horse", "cart", "ship", "sword", "shield", "armor",
+        "staff", "bow", "chest", "treasure", "gold", "map", "book", "scroll", "runes", "crystal",
+        "banner", "campfire", "valley", "hill", "hills", "field", "fields", "swamp", "desert", "ice"
+    }
+    VISUAL_ADJECTIVES = {
+        "dark", "bright", "glowing", "shimmering", "flickering", "misty", "foggy", "ancient", "ruined",
+        "crumbling", "towering", "massive", "tiny", "vast", "narrow", "twisted", "gnarled", "golden",
+        "silver", "crimson", "red", "blue", "green", "black", "white", "grey", "gray", "pale",
+        "shadowy", "moonlit", "sunlit", "torchlit", "stormy", "frozen", "burning", "smoky", "dusty",
+        "ornate", "rusty", "mossy", "overgrown", "bustling", "eerie", "ominous", "colorful", "vibrant"
+    }
+
+    _SENTENCE = re.compile(r"[^.!?\n]+[.!?]*")
+    _WORD = re.compile(r"[a-z']+")
+    _MARKDOWN = re.compile(r"[*_#`>]+")
+
+    def __init__(self, max_length=1000, scene_length=450):
+        """
+        Initialize the condenser.
+
+        Args:
+            max_length (int): Maximum length of the whole prompt (Nova Canvas accepts 1024 characters)
+            scene_length (int): Budget for the sentences taken from the text
+        """
+        self.max_length = max_length
+        self.scene_length = scene_length
+
+    def _score(self, sentence):
+        """
+        Score how much visual content a sentence carries.
+
+        Args:
+            sentence (str): A sentence of the narrative
+
+        Returns:
+            float: Higher for sentences worth illustrating
+        """
+        words = self._WORD.findall(sentence.lower())
+        if not words:
+            return 0.0
+        score = sum(2.0 for word in words if word in self.VISUAL_NOUNS)
+        score += sum(1.0 for word in words if word in self.VISUAL_ADJECTIVES)
+        # Dialogue, questions and prompts to the player describe nothing to draw
+        if '"' in sentence or '“' in sentence:
+            score -= 2.0
+        if sentence.rstrip().endswith('?'):
+            score -= 3.0
+        if re.search(r"\bwhat (do|will) you\b", sentence.lower()):
+            score -= 3.0
+        return score / (len(words) ** 0.5)
+
+    @staticmethod
+    def describe_character(character_info):
+        """
+        Build the visual descriptors of the player character.
+
+        Args:
+            character_info (dict): Character details, with gender, race and class
+
+        Returns:
+            str: Descriptors such as "a female elf wizard", or an empty string
+        """
+        if not character_info:
+            return ""
+        gender = str(character_info.get('gender', '')).lower()
+        if gender not in ("male", "female", "non-binary"):
+            gender = ""
+        parts = [gender, character_info.get('race', ''), character_info.get('class', '')]
+        descriptors = " ".join(str(part).lower() for part in parts if part)
+        return f"a {descriptors}" if descriptors else ""
+
+    def condense(self, text, character_info=None):
+        """
+        Build the image prompt for a narrative text.
+
+        Args:
+            text (str): The narrative to illustrate
+            character_info (dict): Character details to keep the player consistent
+
+        Returns:
+            str: The image prompt, including the character descriptors and style
+        """
+        text = self._MARKDOWN.sub("", text or "")
+        sentences = [s.strip() for s in self._SENTENCE.findall(text) if s.strip()]
+
+        # Take the most visual sentences within budget, then restore their story order
+        scores = [self._score(sentence) for sentence in sentences]
+        ranked = sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True)
+        if any(score > 0 for score in scores):
+            # Sentences with nothing to draw only add noise
+            ranked = [i for i in ranked if scores[i] > 0]
+        chosen = []
+        used = 0
+        for index in ranked:
+            length = len(sentences[index]) + 1
+            if chosen and used + length > self.scene_length:
+                continue
+            chosen.append(index)
+            used += length
+        scene = " ".join(sentences[i].strip(' "“”') for i in sorted(chosen))[:self.scene_length]
+
+        parts = []
+        character = self.describe_character(character_info)
+        if character:
+            parts.append(f"Featuring {character}")
+        if scene:
+            parts.append(scene)
+        parts.append(ImagePrompts.BASE_STYLE)
+        return ", ".join(parts)[:self.max_length]
+
+    @staticmethod
+    def negative_prompt():
+        """
+        Get the elements image generation should avoid.
+
+        Returns:
+            str: The shared negative prompt
+        """
+        return ImagePrompts.NEGATIVE_PROMPT
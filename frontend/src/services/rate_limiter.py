@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+from src.config.aws_config import RATE_LIMIT_CONFIG
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Callers reserve a token and wait until it becomes available, so
+    concurrent callers are spaced out at the configured rate instead of
+    all retrying at once.
+    """
+
+    def __init__(self, tokens_per_second, capacity=None):
+        """
+        Initialize the RateLimiter with a full bucket.
+
+        Args:
+            tokens_per_second (float): Rate at which tokens are added to the bucket
+            capacity (float): Maximum burst size, defaults to one second of tokens
+        """
+        self.tokens_per_second = tokens_per_second
+        self.capacity = capacity or max(1.0, tokens_per_second)
+        self.tokens = self.capacity
+        self.last_update = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_update) * self.tokens_per_second)
+        self.last_update = now
+
+    def _reserve(self, blocking=True):
+        """
+        Reserve a token and return the time to wait before using it.
+
+        Args:
+            blocking (bool): If False, only reserve a token that is available now
+
+        Returns:
+            float: Time to wait in seconds, or None if no token is available and not blocking
+        """
+        with self._lock:
+            self._refill()
+            if not blocking and self.tokens < 1:
+                return None
+            # The balance may go negative: later callers queue up behind this reservation
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.tokens_per_second)
+
+    def acquire(self, blocking=True):
+        """
+        Acquire a token, sleeping until it is available.
+
+        Args:
+            blocking (bool): If False, return immediately when no token is available
+
+        Returns:
+            bool: True if a token was acquired
+        """
+        wait_time = self._reserve(blocking)
+        if wait_time is None:
+            return False
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return True
+
+    async def acquire_async(self):
+        """
+        Acquire a token without blocking the event loop.
+
+        Returns:
+            bool: True once a token was acquired
+        """
+        wait_time = self._reserve()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        return True
+
+
+# Process-wide limiters, one bucket per Bedrock model id
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model_id):
+    """
+    Get the process-wide rate limiter for a Bedrock model id.
+
+    Args:
+        model_id (str): Bedrock model id, or another key identifying a quota (e.g. an agent)
+
+    Returns:
+        RateLimiter: The limiter shared by every session and service using that model
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(model_id)
+        if limiter is None:
+            rate = RATE_LIMIT_CONFIG['model_rps'].get(model_id, RATE_LIMIT_CONFIG['default_rps'])
+            limiter = RateLimiter(rate)
+            _limiters[model_id] = limiter
+        return limiter
@@ -0,0 +1,403 @@
+import atexit
+import fcntl
+import gzip
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from src.config.aws_config import SESSION_STORE_CONFIG
+from src.services.metrics_service import METRICS
+
+
+class SessionStore:
+    """
+    Shared store of the live game sessions, so any app replica can serve any player.
+
+    Sessions are saved write-behind: save() only records the latest state
+    of a game, and a background thread writes the pending states every
+    flush interval, coalescing the updates made in between. States are
+    stored as gzip'd JSON; images are not part of them, only references to
+    their S3 copies. Subclasses implement the reads and writes of a backend.
+
+    Every state carries a revision, increased by each change of the game.
+    A write is a compare-and-set: it only replaces the revision this
+    process last loaded or wrote, so a replica still playing an outdated
+    copy of a game cannot overwrite the progress made on another one.
+    """
+
+    # Minimum delay in seconds between two purges of the expired sessions
+    PURGE_INTERVAL_SECONDS = 3600
+
+    def __init__(self, ttl_seconds=None, flush_interval=None):
+        """
+        Initialize the store.
+
+        Args:
+            ttl_seconds (int): Time after which an untouched session expires
+            flush_interval (float): Delay in seconds between a save and its write
+        """
+        self.ttl_seconds = ttl_seconds or SESSION_STORE_CONFIG['ttl_seconds']
+        self.flush_interval = SESSION_STORE_CONFIG['flush_interval_seconds'] if flush_interval is None else flush_interval
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pending = {}  # game id -> latest state not written yet
+        self._revisions = {}  # game id -> revision last loaded or written by this process
+        self._dirty = threading.Event()
+        self._writer = None
+        # The writer thread and the flush at exit must not write the same game concurrently
+        self._flush_lock = threading.Lock()
+        self._last_purge = 0
+        # Write what is still pending when the process stops, e.g. during a rolling deploy
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _encode(state):
+        return gzip.compress(json.dumps(state, separators=(',', ':')).encode('utf-8'))
+
+    @staticmethod
+    def _decode(data):
+        return json.loads(gzip.decompress(data).decode('utf-8'))
+
+    def _read(self, game_id):
+        raise NotImplementedError
+
+    def _write(self, game_id, data, revision, expected_revision):
+        """
+        Write a state unless the stored one is not at the expected revision.
+
+        A game that is not stored, or expired, can always be written.
+
+        Returns:
+            bool: False if the stored state was changed by another process
+        """
+        raise NotImplementedError
+
+    def _delete(self, game_id):
+        raise NotImplementedError
+
+    def _purge(self, expired_before):
+        """
+        Remove the sessions last written before the given time, for backends without expiry.
+        """
+
+    def load(self, game_id):
+        """
+        Load the state of a game.
+
+        Args:
+            game_id (str): Identifier of the game
+
+        Returns:
+            dict: The latest state of the game, or None if it is unknown or expired
+        """
+        with self._lock:
+            state = self._pending.get(game_id)
+        if state is not None:
+            return state
+        with METRICS.trace("session_store.read") as span:
+            data = self._read(game_id)
+            if data is None:
+                return None
+            span.add_output(len(data))
+            state = self._decode(data)
+        with self._lock:
+            if game_id not in self._pending:
+                self._revisions[game_id] = state.get('revision', 0)
+        return state
+
+    def save(self, game_id, state):
+        """
+        Queue the state of a game to be written in the background.
+
+        Args:
+            game_id (str): Identifier of the game
+            state (dict): JSON-serializable state of the game, with its revision
+
+        Returns:
+            bool: False if the state is older than one already saved, and was dropped
+        """
+        revision = state.get('revision', 0)
+        with self._lock:
+            pending = self._pending.get(game_id)
+            latest = pending.get('revision', 0) if pending is not None else self._revisions.get(game_id, 0)
+            if revision <= latest:
+                self.logger.warning(f"Dropping revision {revision} of session {game_id}, revision {latest} is newer")
+                return False
+            self._pending[game_id] = state
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run_writer, name="session-store", daemon=True)
+                self._writer.start()
+        self._dirty.set()
+        return True
+
+    def delete(self, game_id):
+        """
+        Forget a game.
+
+        Args:
+            game_id (str): Identifier of the game
+        """
+        with self._lock:
+            self._pending.pop(game_id, None)
+            self._revisions.pop(game_id, None)
+        self._delete(game_id)
+
+    def flush(self):
+        """
+        Write every pending state now.
+
+        A state that fails to be written stays pending for the next flush,
+        unless a newer one was saved in the meantime. A state whose game was
+        changed by another process since this one loaded it is dropped.
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._dirty.clear()
+                pending, self._pending = self._pending, {}
+            for game_id, state in pending.items():
+                revision = state.get('revision', 0)
+                try:
+                    with METRICS.trace("session_store.write") as span:
+                        data = self._encode(state)
+                        span.add_input(len(data))
+                        written = self._write(game_id, data, revision, self._revisions.get(game_id, 0))
+                except Exception as e:
+                    self.logger.warning(f"Could not write session {game_id}, will retry: {str(e)}")
+                    with self._lock:
+                        self._pending.setdefault(game_id, state)
+                        self._dirty.set()
+                    continue
+                if written:
+                    with self._lock:
+                        self._revisions[game_id] = revision
+                else:
+                    self.logger.warning(f"Session {game_id} was changed by another process, dropping revision {revision}")
+            if time.time() - self._last_purge > self.PURGE_INTERVAL_SECONDS:
+                self._last_purge = time.time()
+                try:
+                    self._purge(time.time() - self.ttl_seconds)
+                except Exception as e:
+                    self.logger.warning(f"Could not purge expired sessions: {str(e)}")
+
+    def _run_writer(self):
+        """
+        Write the pending states, at most once per flush interval.
+        """
+        while True:
+            self._dirty.wait()
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+class FileSessionStore(SessionStore):
+    """
+    Session store keeping one file per game in a directory, e.g. a volume shared by the replicas.
+
+    Writes and purges hold an exclusive lock on the directory, so the
+    compare-and-set of a write is atomic across the processes sharing it.
+    """
+
+    def __init__(self, directory, **kwargs):
+        """
+        Initialize the store.
+
+        Args:
+            directory (str): Directory holding the session files
+            **kwargs: Options of SessionStore
+        """
+        super().__init__(**kwargs)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, game_id):
+        return os.path.join(self.directory, re.sub(r'[^0-9a-zA-Z_-]', '_', game_id) + '.json.gz')
+
+    def _locked(self):
+        """
+        Open the lock file of the directory, locked exclusively until it is closed.
+        """
+        lock_file = open(os.path.join(self.directory, '.lock'), 'a')
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def _read(self, game_id):
+        path = self._path(game_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, game_id, data, revision, expected_revision):
+        path = self._path(game_id)
+        with self._locked():
+            stored = self._read(game_id)
+            if stored is not None and self._decode(stored).get('revision', 0) != expected_revision:
+                return False
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return True
+
+    def _delete(self, game_id):
+        try:
+            os.remove(self._path(game_id))
+        except FileNotFoundError:
+            pass
+
+    def _purge(self, expired_before):
+        with self._locked():
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(('.json.gz', '.tmp')) and entry.stat().st_mtime < expired_before:
+                    os.remove(entry.path)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store backed by a SQLite database, shared by the processes of a host.
+    """
+
+    def __init__(self, path, **kwargs):
+        """
+        Initialize the store, creating the database if needed.
+
+        Args:
+            path (str): Path of the database file
+            **kwargs: Options of SessionStore
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        with self._db_lock, self._connection:
+            # Readers don't block the writer of another process
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(game_id TEXT PRIMARY KEY, state BLOB, updated_at REAL, revision INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = [row[1] for row in self._connection.execute("PRAGMA table_info(sessions)")]
+            if 'revision' not in columns:
+                # Database created before states had revisions
+                self._connection.execute("ALTER TABLE sessions ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+
+    def _read(self, game_id):
+        with self._db_lock:
+            row = self._connection.execute(
+                "SELECT state FROM sessions WHERE game_id = ? AND updated_at > ?",
+                (game_id, time.time() - self.ttl_seconds)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _write(self, game_id, data, revision, expected_revision):
+        now = time.time()
+        with self._db_lock, self._connection:
+            # The upsert only replaces the expected revision, or an expired session
+            cursor = self._connection.execute(
+                "INSERT INTO sessions (game_id, state, updated_at, revision) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (game_id) DO UPDATE SET "
+                "state = excluded.state, updated_at = excluded.updated_at, revision = excluded.revision "
+                "WHERE sessions.revision = ? OR sessions.updated_at <= ?",
+                (game_id, data, now, revision, expected_revision, now - self.ttl_seconds)
+            )
+        return cursor.rowcount > 0
+
+    def _delete(self, game_id):
+        with self._db_lock, self._connection:
+            self._connection.execute("DELETE FROM sessions WHERE game_id = ?", (game_id,))
+
+    def _purge(self, expired_before):
+        with self._db_lock, self._connection:
+            self._connection.execute("DELETE FROM sessions WHERE updated_at <= ?", (expired_before,))
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Session store backed by a Redis-compatible server, shared by every replica.
+
+    Each game is a hash of its state and revision, which the server
+    expires. Writes run as a script, so their compare-and-set is atomic.
+
+    Requires the optional `redis` package.
+    """
+
+    KEY_PREFIX = "game-session:"
+
+    # Write the state unless the stored revision is not the expected one
+    WRITE_SCRIPT = """
+local stored = redis.call('HGET', KEYS[1], 'revision')
+if stored and tonumber(stored) ~= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'state', ARGV[1], 'revision', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+    def __init__(self, url, **kwargs):
+        """
+        Initialize the store.
+
+        Args:
+            url (str): Server URL, e.g. redis://localhost:6379/0
+            **kwargs: Options of SessionStore
+
+        Raises:
+            ImportError: If the redis package is not installed
+        """
+        super().__init__(**kwargs)
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("The redis session store requires the redis package: pip install redis")
+        self.client = redis.Redis.from_url(url)
+        self._write_script = self.client.register_script(self.WRITE_SCRIPT)
+
+    def _read(self, game_id):
+        return self.client.hget(self.KEY_PREFIX + game_id, 'state')
+
+    def _write(self, game_id, data, revision, expected_revision):
+        keys = [self.KEY_PREFIX + game_id]
+        return bool(self._write_script(keys=keys, args=[data, revision, expected_revision, self.ttl_seconds]))
+
+    def _delete(self, game_id):
+        self.client.delete(self.KEY_PREFIX + game_id)
+
+
+# Store class and default location by backend name
+_BACKENDS = {
+    'file': (FileSessionStore, '.sessions'),
+    'sqlite': (SQLiteSessionStore, '.sessions/sessions.db'),
+    'redis': (RedisSessionStore, 'redis://localhost:6379/0')
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """
+    Get the process-wide session store configured by SESSION_STORE_CONFIG.
+
+    Returns:
+        SessionStore: The shared store, or None if sessions are not shared
+    """
+    global _store
+    backend = SESSION_STORE_CONFIG['backend']
+    if backend == 'none':
+        return None
+    with _store_lock:
+        if _store is None:
+            if backend not in _BACKENDS:
+                raise ValueError(f"Unknown session store: {backend}")
+            store_class, default_url = _BACKENDS[backend]
+            _store = store_class(SESSION_STORE_CONFIG['url'] or default_url)
+        return _store
@@ -0,0 +1,198 @@
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.config.aws_config import SPECULATION_CONFIG
+
+
+# Process-wide worker pool for speculative agent calls
+_SPECULATION_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculation")
+
+
+class SpeculationBudget:
+    """
+    Sliding-window budget of speculative calls per minute.
+
+    Thread-safe, so one instance can cap the whole process.
+    """
+
+    def __init__(self, max_per_minute):
+        """
+        Initialize the budget.
+
+        Args:
+            max_per_minute (int): Maximum number of calls in any 60 second window
+        """
+        self.max_per_minute = max_per_minute
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def try_spend(self):
+        """
+        Spend one call from the budget if any is left.
+
+        Returns:
+            bool: True if the call may be made
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._calls and now - self._calls[0] > 60:
+                self._calls.popleft()
+            if len(self._calls) >= self.max_per_minute:
+                return False
+            self._calls.append(now)
+            return True
+
+
+class SpeculationMetrics:
+    """
+    Process-wide counters for tuning the cost/latency tradeoff of speculation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {
+            'issued': 0,         # Speculative calls made
+            'denied': 0,         # Calls skipped because a budget was exhausted
+            'hits': 0,           # Clicks answered from a finished speculative call
+            'pending_hits': 0,   # Clicks that waited on an in-flight speculative call
+            'misses': 0,         # Clicks with no usable speculative call
+            'expired': 0,        # Speculative results dropped after their TTL
+            'failed': 0          # Speculative calls that raised an error
+        }
+
+    def increment(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def snapshot(self):
+        """
+        Get the current counters and the hit rate.
+
+        Returns:
+            dict: Counters plus 'hit_rate', the share of clicks served by speculation
+        """
+        with self._lock:
+            counts = dict(self.counts)
+        lookups = counts['hits'] + counts['pending_hits'] + counts['misses']
+        counts['hit_rate'] = (counts['hits'] + counts['pending_hits']) / lookups if lookups else 0.0
+        return counts
+
+
+# Shared by every session of the process
+PROCESS_BUDGET = SpeculationBudget(SPECULATION_CONFIG['max_per_minute'])
+METRICS = SpeculationMetrics()
+
+
+class SpeculationService:
+    """
+    Speculative prefetch of agent responses for the suggestion buttons.
+
+    Each session owns one instance. Suggested actions are sent to the agent
+    in the background, each on its own throwaway agent session so the
+    game's real session is not polluted. Results are cached with a TTL and
+    consumed when the player clicks the matching suggestion.
+    """
+
+    def __init__(self, agent, ttl_seconds=None, max_per_session_per_minute=None):
+        """
+        Initialize the service for a session.
+
+        Args:
+            agent (BedrockAgent): Agent used for the speculative calls
+            ttl_seconds (float): How long a speculative result stays usable
+            max_per_session_per_minute (int): Speculative call budget of this session
+        """
+        self.agent = agent
+        self.ttl_seconds = ttl_seconds or SPECULATION_CONFIG['ttl_seconds']
+        self.budget = SpeculationBudget(
+            max_per_session_per_minute or SPECULATION_CONFIG['max_per_session_per_minute']
+        )
+        self._entries = {}  # (context key, action) -> (future, created_at)
+
+    @staticmethod
+    def _context_key(context):
+        return zlib.crc32((context or "").encode('utf-8'))
+
+    def _speculate(self, prompt):
+        """
+        Run a speculative agent call on a throwaway session.
+
+        Args:
+            prompt (str): The full prompt for the speculative turn
+
+        Returns:
+            str: The agent's response
+        """
+        try:
+            return self.agent.get_response(prompt, session_id=f"spec-{uuid.uuid4().hex}")
+        except Exception:
+            METRICS.increment('failed')
+            raise
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key, (future, created_at) in list(self._entries.items()):
+            if now - created_at > self.ttl_seconds:
+                del self._entries[key]
+                METRICS.increment('expired')
+
+    def prefetch(self, context, prompts):
+        """
+        Start speculative calls for the suggested actions, within budget.
+
+        Args:
+            context (str): The scene the actions respond to (usually the last AI response)
+            prompts (dict): Full speculative prompt for each suggested action
+        """
+        self._evict_expired()
+        context_key = self._context_key(context)
+        for action, prompt in prompts.items():
+            key = (context_key, action)
+            if key in self._entries:
+                continue
+            # Both the session and the process budget must allow the call
+            if not self.budget.try_spend() or not PROCESS_BUDGET.try_spend():
+                METRICS.increment('denied')
+                continue
+            self._entries[key] = (_SPECULATION_EXECUTOR.submit(self._speculate, prompt), time.monotonic())
+            METRICS.increment('issued')
+
+    def take(self, context, action, timeout=None):
+        """
+        Consume the speculative response for an action, if there is one.
+
+        Args:
+            context (str): The scene the action responds to
+            action (str): The action chosen by the player
+            timeout (float): How long to wait for an in-flight speculative call
+
+        Returns:
+            str: The speculative response, or None on a miss
+        """
+        self._evict_expired()
+        entry = self._entries.pop((self._context_key(context), action), None)
+        if entry is None:
+            METRICS.increment('misses')
+            return None
+
+        future, _ = entry
+        was_done = future.done()
+        try:
+            response = future.result(timeout=timeout)
+        except Exception:
+            METRICS.increment('misses')
+            return None
+        if not response:
+            METRICS.increment('misses')
+            return None
+        METRICS.increment('hits' if was_done else 'pending_hits')
+        return response
+
+    def clear(self):
+        """
+        Drop all speculative results, e.g. once the scene has moved on.
+        """
+        self._entries.clear()
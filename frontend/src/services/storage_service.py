@@ -1,51 +1,308 @@
-import boto3
+import gzip
+import io
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
 from src.config.aws_config import S3_CONFIG
-from src.services.pdf_service import PDFService
+from src.config.aws_clients import get_client
+from src.services.metrics_service import METRICS
+from src.services.pdf_service import PDFExporter
+
+
+# Process-wide worker pool running the background saves of every session
+_SAVE_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="save")
 
 
 class StorageService:
     """
     Service for storing game data in AWS S3.
     
-    This class handles saving game sessions as PDF files to S3 buckets.
+    This class handles saving game sessions as PDF files to S3 buckets,
+    along with a compact snapshot from which a session can be resumed.
+    Saves can run in the background: requests made while a save is queued
+    or running are coalesced into a single upload of the latest state.
     """
     
+    IDLE = 'idle'
+    PENDING = 'pending'
+    SAVING = 'saving'
+    SAVED = 'saved'
+    FAILED = 'failed'
+    
+    # Version of the session snapshot format
+    SNAPSHOT_VERSION = 1
+    
     def __init__(self):
         """
         Initialize the StorageService with S3 client and bucket configuration.
         """
-        self.s3_client = boto3.client('s3')
+        self.s3_client = get_client('s3')
         self.bucket_name = S3_CONFIG['bucket_name']
+        self.logger = logging.getLogger(__name__)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_CONFIG['multipart_threshold'],
+            multipart_chunksize=S3_CONFIG['multipart_chunksize'],
+            max_concurrency=S3_CONFIG['max_concurrency'],
+            use_threads=True
+        )
+        self.debounce_seconds = S3_CONFIG['save_debounce_seconds']
+        # Keeps the turns already prepared for the PDF between saves of this session
+        self.pdf_exporter = PDFExporter()
+        # Background save state
+        self.save_status = self.IDLE
+        self.last_save_result = None
+        self._save_lock = threading.Lock()
+        self._save_future = None
+        self._pending_save = None
+        # S3 keys of the images already uploaded, by message index
+        self.image_keys = {}
+    
+    @staticmethod
+    def _player_prefix(player_name):
+        """
+        Get the S3 prefix holding the saves of a player.
+        
+        Args:
+            player_name (str): Name of the player
+            
+        Returns:
+            str: The S3 key prefix
+        """
+        player_id = player_name.lower().strip()
+        return f"game_sessions/{player_id}"
+    
+    def save_snapshot(self, messages, player_name, generated_images=None, character=None, suggestions=None):
+        """
+        Save a compact, resumable snapshot of the game session to S3.
+        
+        Args:
+            messages (list): List of message dictionaries containing the chat history
+            player_name (str): Name of the player
+            generated_images (dict): Images by message index
+            character (dict): Current character specifications
+            suggestions (list): Current action suggestions
+            
+        Images are stored as separate S3 objects, uploaded only once, and the
+        snapshot holds gzip'd JSON with references to them.
+        """
+        prefix = self._player_prefix(player_name)
+        
+        for index, image in (generated_images or {}).items():
+            if index in self.image_keys or image is None:
+                continue
+            self.save_image(character['character_id'], index, image)
+        
+        snapshot = {
+            'version': self.SNAPSHOT_VERSION,
+            'saved_at': time.time(),
+            'player_name': player_name,
+            'character': character,
+            'messages': messages,
+            'suggestions': suggestions or [],
+            'images': {str(index): key for index, key in list(self.image_keys.items())}
+        }
+        body = gzip.compress(json.dumps(snapshot, separators=(',', ':')).encode('utf-8'))
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=f"{prefix}/session.json.gz",
+            Body=body,
+            ContentType='application/json',
+            ContentEncoding='gzip'
+        )
+    
+    def save_image(self, character_id, message_index, image):
+        """
+        Upload the image of a message, unless it is already stored.
+        
+        Images are stored by character rather than by player name, so
+        games of players sharing a name don't overwrite each other's images.
+        
+        Args:
+            character_id (str): ID of the character of the game
+            message_index (int): The index of the message in the chat history
+            image (BytesIO): The image
+            
+        Returns:
+            str: S3 key of the image, or None if its data could not be read
+        """
+        key = self.image_keys.get(message_index)
+        if key is not None:
+            return key
+        data = image.getvalue() if hasattr(image, 'getvalue') else image
+        if data is None:
+            # A spilled original that was evicted everywhere: save the game without it
+            self.logger.warning(f"Image {message_index} could not be read, not saving it")
+            return None
+        key = f"game_sessions/images/{character_id}/{message_index}.png"
+        self.s3_client.put_object(Bucket=self.bucket_name, Key=key, Body=data, ContentType='image/png')
+        self.image_keys[message_index] = key
+        return key
+    
+    def load_game_session(self, player_name):
+        """
+        Load the snapshot of a saved game session from S3.
+        
+        Args:
+            player_name (str): Name of the player
+            
+        Returns:
+            dict: The snapshot with messages, character, suggestions and image keys
+                  by message index, or None if the player has no saved session
+        """
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=f"{self._player_prefix(player_name)}/session.json.gz"
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+        
+        snapshot = json.loads(gzip.decompress(response['Body'].read()).decode('utf-8'))
+        snapshot['images'] = {int(index): key for index, key in snapshot.get('images', {}).items()}
+        # These images are already stored, so later saves don't upload them again
+        self.image_keys = dict(snapshot['images'])
+        return snapshot
     
-    def save_game_session(self, messages, player_name):
+    def load_image(self, key):
         """
-        Save game session as PDF to S3.
+        Download an image referenced by a session snapshot.
+        
+        Args:
+            key (str): S3 key of the image
+            
+        Returns:
+            BytesIO: Image data as a BytesIO object
+        """
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+        return io.BytesIO(response['Body'].read())
+    
+    def load_saved_image(self, message_index):
+        """
+        Download the saved image of a message, if it was uploaded.
+        
+        Args:
+            message_index (int): The index of the message in the chat history
+            
+        Returns:
+            BytesIO: Image data as a BytesIO object, or None if the image was never saved
+        """
+        key = self.image_keys.get(message_index)
+        if key is None:
+            return None
+        return self.load_image(key)
+    
+    def save_game_session(self, messages, player_name, generated_images=None, character=None, suggestions=None):
+        """
+        Save game session as PDF to S3, along with its resumable snapshot.
         
         Args:
             messages (list): List of message dictionaries containing the chat history
             player_name (str): Name of the player for filename generation
+            generated_images (dict): Images by message index to embed in the PDF
+            character (dict): Current character specifications
+            suggestions (list): Current action suggestions
             
         Returns:
             tuple: (success, result) where success is a boolean indicating if the
                   operation was successful, and result is either the filename or
                   an error message
         """
+        pdf_path = None
+        span = METRICS.start_span("storage.save")
         try:
-            # Convert messages to PDF
-            pdf_buffer = PDFService.create_chat_pdf(messages)
+            # Credit the retries botocore makes for the snapshot and PDF uploads to the save
+            with METRICS.activate(span):
+                # The snapshot is small and cheap, so save it before rendering the PDF
+                self.save_snapshot(messages, player_name, generated_images, character, suggestions)
 
-            player_id = player_name.lower().strip()
-            
-            # Generate filename
-            filename = f"game_session_{player_id}.pdf"
+                # Convert messages to a PDF file, only laying out the turns added since the last full part
+                pdf_path = self.pdf_exporter.export(messages, generated_images)
+
+                span.add_output(os.path.getsize(pdf_path))
+
+                player_id = player_name.lower().strip()
+
+                # Generate filename
+                filename = f"game_session_{player_id}.pdf"
+
+                # Upload to S3, streaming from the file
+                self.s3_client.upload_file(
+                    pdf_path,
+                    self.bucket_name,
+                    f"{self._player_prefix(player_name)}/{filename}",
+                    ExtraArgs={'ContentType': 'application/pdf'},
+                    Config=self.transfer_config
+                )
+                return True, filename
+        except Exception as e:
+            span.finish(e)
+            return False, str(e)
+        finally:
+            span.finish()
+            if pdf_path and os.path.exists(pdf_path):
+                os.remove(pdf_path)
+    
+    def request_save(self, messages, player_name, generated_images=None, character=None, suggestions=None):
+        """
+        Save game session as PDF to S3 in the background.
+        
+        Args:
+            messages (list): List of message dictionaries containing the chat history
+            player_name (str): Name of the player for filename generation
+            generated_images (dict): Images by message index to embed in the PDF
+            character (dict): Current character specifications
+            suggestions (list): Current action suggestions
             
-            # Upload to S3
-            self.s3_client.upload_fileobj(
-                pdf_buffer,
-                self.bucket_name,
-                f"game_sessions/{player_id}/{filename}",
-                ExtraArgs={'ContentType': 'application/pdf'}
+        Rapid successive requests are debounced and coalesced, so only the
+        latest state is uploaded. Progress is reported by save_status.
+        """
+        with self._save_lock:
+            # Snapshot the state so the session can keep playing while saving
+            self._pending_save = (
+                list(messages),
+                player_name,
+                dict(generated_images or {}),
+                dict(character) if character else None,
+                list(suggestions or [])
             )
-            return True, filename
-        except Exception as e:
-            return False, str(e) 
\ No newline at end of file
+            if self.save_status != self.SAVING:
+                self.save_status = self.PENDING
+            if self._save_future is None:
+                self._save_future = _SAVE_EXECUTOR.submit(self._run_saves)
+    
+    def _run_saves(self):
+        """
+        Run queued saves until no request is pending.
+        """
+        time.sleep(self.debounce_seconds)
+        while True:
+            with self._save_lock:
+                request = self._pending_save
+                self._pending_save = None
+                if request is None:
+                    self._save_future = None
+                    return
+                self.save_status = self.SAVING
+            
+            result = self.save_game_session(*request)
+            
+            with self._save_lock:
+                self.last_save_result = result
+                if self._pending_save is None:
+                    self.save_status = self.SAVED if result[0] else self.FAILED
+    
+    def is_saving(self):
+        """
+        Check whether a background save is queued or running.
+        
+        Returns:
+            bool: True if a save is in progress
+        """
+        return self.save_status in (self.PENDING, self.SAVING)
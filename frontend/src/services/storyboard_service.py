@@ -0,0 +1,88 @@
+import argparse
+import random
+from src.services.image_service import ImageService
+from src.services.storage_service import StorageService
+
+
+class StoryboardService:
+    """
+    Regenerates every image of a saved game session in one batch.
+
+    Scenes are generated in parallel on the image service's bounded batch
+    pool, under the shared Nova Canvas rate limit, then the snapshot and
+    the PDF of the session are saved again with the new images.
+    """
+
+    def __init__(self, image_service=None, storage=None):
+        """
+        Initialize the service.
+
+        Args:
+            image_service (ImageService): Service used to generate the images
+            storage (StorageService): Service holding the saved sessions
+        """
+        self.image_service = image_service or ImageService()
+        self.storage = storage or StorageService()
+
+    def regenerate(self, player_name, seed=None, width=None, height=None):
+        """
+        Regenerate the storyboard of a saved game session.
+
+        Args:
+            player_name (str): Name of the player
+            seed (int): Generation seed shared by every scene, a random one by default
+                so the scenes are not served again from the image cache
+            width (int): Image width in pixels, overriding the configured resolution
+            height (int): Image height in pixels, overriding the configured resolution
+
+        Returns:
+            tuple: (success, result) where result is the PDF filename or an error message
+        """
+        if seed is None:
+            # Nova Canvas seeds range from 0 to 858993459
+            seed = random.randint(0, 858993459)
+        snapshot = self.storage.load_game_session(player_name)
+        if snapshot is None:
+            return False, f"No saved game found for {player_name}"
+
+        self.image_service.set_character_info(snapshot['character'])
+        messages = snapshot['messages']
+        indices = [i for i, message in enumerate(messages) if message['role'] == 'assistant']
+        images = self.image_service.generate_storyboard(
+            [messages[i]['content'] for i in indices], seed, width, height
+        )
+
+        generated_images = {}
+        previous_keys = dict(self.storage.image_keys)
+        for index, image in zip(indices, images):
+            if image is not None:
+                generated_images[index] = image
+            elif index in previous_keys:
+                # Keep the saved image of a scene that could not be regenerated
+                generated_images[index] = self.storage.load_image(previous_keys[index])
+
+        # Upload the new images over the saved ones
+        self.storage.image_keys = {}
+        return self.storage.save_game_session(
+            messages,
+            snapshot['player_name'],
+            generated_images,
+            snapshot['character'],
+            snapshot['suggestions']
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate all images of a saved game session")
+    parser.add_argument("player_name", help="Name of the player whose game to regenerate")
+    parser.add_argument("--seed", type=int, default=None, help="Generation seed shared by every scene, random by default")
+    parser.add_argument("--width", type=int, default=None, help="Image width in pixels")
+    parser.add_argument("--height", type=int, default=None, help="Image height in pixels")
+    args = parser.parse_args()
+
+    success, result = StoryboardService().regenerate(args.player_name, args.seed, args.width, args.height)
+    print(f"Storyboard saved as {result}" if success else f"Error regenerating storyboard: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import logging
+import re
+import zlib
+from collections import Counter
+from src.agents.response_parser import parse_suggestions
+from src.config.prompts import SUGGESTION_PROMPT
+
+
+class AgentSuggestionEngine:
+    """
+    Suggestion engine asking the Bedrock agent for the next actions.
+
+    Produces the most relevant suggestions, at the cost of a full agent call.
+    """
+
+    def __init__(self, agent):
+        """
+        Initialize the engine.
+
+        Args:
+            agent (BedrockAgent): Agent used to generate the suggestions
+        """
+        self.agent = agent
+        self.logger = logging.getLogger(__name__)
+
+    def suggest(self, character, context):
+        """
+        Ask the agent for action suggestions based on the current context.
+
+        Args:
+            character (dict): Current character specifications
+            context (str): The current game context (usually the last AI response)
+
+        Returns:
+            list: Up to 3 suggestions, or an empty list if none could be extracted
+        """
+        suggestion_prompt = SUGGESTION_PROMPT.format(
+            player_name=character['name'],
+            player_race=character['race'],
+            player_class=character['class'],
+            player_gender=character['gender'],
+            context=context
+        )
+
+        self.logger.debug(f"Generating suggestions based on context: {context[:100]}...")
+
+        suggestions_text = self.agent.get_response(suggestion_prompt) or ""
+        self.logger.debug(f"Raw suggestions response: {suggestions_text}")
+
+        suggestions = parse_suggestions(suggestions_text)
+        self.logger.debug(f"Extracted suggestions: {suggestions}")
+
+        return suggestions
+
+
+class LocalSuggestionEngine:
+    """
+    CPU-only suggestion engine built from templates.
+
+    Extracts the people, places and things mentioned in the last response
+    and combines them with actions typical of the character's class and
+    race. It needs no Bedrock call and answers in well under 10ms, so its
+    suggestions can be shown instantly or used when the agent is throttled.
+    """
+
+    # Actions typical of each class from the character creation page
+    CLASS_ACTIONS = {
+        "Fighter": ["Draw your weapon and face {thing}", "Stand guard near {thing}"],
+        "Wizard": ["Cast Detect Magic on {thing}", "Study the arcane traces around {thing}"],
+        "Rogue": ["Sneak closer to {thing}", "Look for anything hidden around {thing}"],
+        "Cleric": ["Pray for guidance about {thing}", "Sense for evil near {thing}"],
+        "Ranger": ["Track footprints leading to {thing}", "Scout the surroundings of {thing}"],
+        "Paladin": ["Use Divine Sense on {thing}", "Offer protection near {thing}"],
+        "Barbarian": ["Charge boldly toward {thing}", "Smash your way past {thing}"],
+        "Bard": ["Charm your way closer to {thing}", "Recall legends about {thing}"],
+        "Druid": ["Ask nearby animals about {thing}", "Commune with nature near {thing}"],
+        "Monk": ["Move silently toward {thing}", "Meditate to sense {thing}"],
+        "Sorcerer": ["Unleash a spell at {thing}", "Feel the magic flowing from {thing}"],
+        "Warlock": ["Ask your patron about {thing}", "Use Eldritch Sight on {thing}"]
+    }
+
+    # Actions drawing on each race from the character creation page
+    RACE_ACTIONS = {
+        "Human": ["Ask around about {thing}"],
+        "Elf": ["Listen closely with keen elven ears to {thing}"],
+        "Dwarf": ["Inspect the stonework around {thing}"],
+        "Halfling": ["Slip quietly past {thing}"],
+        "Gnome": ["Examine {thing} with gnomish curiosity"],
+        "Half-Elf": ["Talk your way closer to {thing}"],
+        "Half-Orc": ["Intimidate anyone guarding {thing}"],
+        "Dragonborn": ["Stand tall and confront {thing}"],
+        "Tiefling": ["Use your darkvision to study {thing}"]
+    }
+
+    GENERIC_ACTIONS = ["Investigate {thing}", "Approach {thing} carefully", "Ask about {thing}"]
+
+    # Used when nothing worth acting on could be extracted from the context
+    FALLBACK_ACTIONS = ["Explore the area", "Talk to someone nearby", "Check your inventory"]
+
+    _STOPWORDS = {
+        "you", "your", "yours", "yourself", "the", "a", "an", "and", "or", "but", "of", "to", "in",
+        "on", "at", "for", "with", "as", "by", "from", "into", "it", "its", "this", "that", "these",
+        "those", "there", "here", "what", "who", "whom", "which", "while", "when", "where", "way",
+        "one", "some", "any", "each", "every", "other", "another", "such", "more", "most", "very",
+        "game", "master", "adventure", "adventurer", "welcome", "moment", "time", "air", "feeling",
+        "sense", "sound", "side", "kind", "bit", "lot", "thing", "things", "something", "anything"
+    }
+
+    _ADJECTIVES = {
+        "old", "dark", "great", "small", "large", "tall", "ancient", "huge", "tiny", "grim",
+        "strange", "hidden", "broken", "distant", "narrow", "wide", "deep", "cold", "red", "black",
+        "white", "grey", "gray", "green", "golden", "silver", "wooden", "stone", "iron", "young"
+    }
+    _ADJECTIVE_SUFFIXES = ("y", "ing", "ed", "ous", "ful", "al", "ic", "en", "ent", "ant", "ive", "ish", "less", "ern")
+
+    _NOUN_PHRASE = re.compile(r"\b(?:the|a|an)\s+((?:[a-z][a-z'-]+\s+)?[a-z][a-z'-]+)\b", re.IGNORECASE)
+    _PROPER_NAME = re.compile(r"(?<![.!?]\s)(?<!^)\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b")
+
+    def _extract_things(self, character, context):
+        """
+        Extract the people, places and things mentioned in the context.
+
+        Args:
+            character (dict): Current character specifications
+            context (str): The current game context
+
+        Returns:
+            list: Phrases ordered by relevance, most relevant first
+        """
+        excluded = {str(character.get('name', '')).lower()}
+        scores = Counter()
+        length = max(len(context), 1)
+
+        def add(phrase, position, weight):
+            words = phrase.lower().split()
+            if words[-1] in self._STOPWORDS or phrase.lower() in excluded:
+                return
+            # Frequent and recently mentioned phrases are the most likely next targets
+            scores[phrase] += weight * (1.0 + position / length)
+
+        for match in self._NOUN_PHRASE.finditer(context):
+            words = match.group(1).lower().split()
+            # Keep a leading word only when it reads like an adjective ("the misty valley", not "the wind carries")
+            if len(words) == 2 and not (words[0] in self._ADJECTIVES or words[0].endswith(self._ADJECTIVE_SUFFIXES)):
+                words = words[:1]
+            add(f"the {' '.join(words)}", match.start(), 1.0)
+        for match in self._PROPER_NAME.finditer(context):
+            if match.group(1).lower() not in self._STOPWORDS:
+                add(match.group(1), match.start(), 1.5)
+
+        return [phrase for phrase, _ in scores.most_common()]
+
+    def suggest(self, character, context):
+        """
+        Build action suggestions from the context and the character.
+
+        Args:
+            character (dict): Current character specifications
+            context (str): The current game context (usually the last AI response)
+
+        Returns:
+            list: Exactly 3 suggestions
+        """
+        context = context or ""
+        things = self._extract_things(character, context)
+        if not things:
+            return list(self.FALLBACK_ACTIONS)
+
+        # Derive choices from the context, so reruns show the same suggestions
+        seed = zlib.crc32(context.encode('utf-8'))
+        pools = [
+            self.CLASS_ACTIONS.get(character.get('class'), self.GENERIC_ACTIONS),
+            self.RACE_ACTIONS.get(character.get('race'), self.GENERIC_ACTIONS),
+            self.GENERIC_ACTIONS
+        ]
+
+        suggestions = []
+        for i, pool in enumerate(pools):
+            template = pool[(seed + i) % len(pool)]
+            thing = things[i % len(things)]
+            suggestion = template.format(thing=thing)
+            suggestions.append(suggestion[0].upper() + suggestion[1:])
+
+        # Pad with fallback actions if the templates collided
+        suggestions = list(dict.fromkeys(suggestions))
+        for action in self.FALLBACK_ACTIONS:
+            if len(suggestions) >= 3:
+                break
+            suggestions.append(action)
+        return suggestions[:3]
@@ -1,17 +1,8 @@
 # Standard library imports
+import asyncio
+import logging
 import uuid
-import re
 import time
-import random
-import asyncio
-
-# AWS SDK + Retry imports
-from botocore.exceptions import EventStreamError
-from tenacity import retry, stop_after_attempt, wait_exponential
-
-# MCP imports
-from fastmcp import Client
-from fastmcp.client.transports import SSETransport
 
 # Third-party imports
 import streamlit as st
@@ -26,10 +17,20 @@ st.set_page_config(
 )
 
 # Local application imports
-from src.agents.bedrock_agent import BedrockAgent
+from src.engine.game_session import GameSession
 from src.services.storage_service import StorageService
-from src.services.image_service import ImageService
-from src.config.prompts import LAUNCH_PROMPT, SUGGESTION_PROMPT
+from src.services.circuit_breaker import CircuitOpenError, open_circuits
+from src.services.session_store import get_session_store
+from src.services.image_job_service import ImageJobService
+from src.services.suggestion_service import LocalSuggestionEngine
+from src.services.speculation_service import METRICS as SPECULATION_METRICS
+from src.services.metrics_service import METRICS, start_exporters
+from src.config.aws_config import GAME_CONFIG, METRICS_CONFIG, SPECULATION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Suggestions offered when none could be generated
+DEFAULT_SUGGESTIONS = LocalSuggestionEngine.FALLBACK_ACTIONS
 
 
 class GameMasterUI:
@@ -37,42 +38,66 @@ class GameMasterUI:
     Main UI class for the Game Master application.
     
     This class handles all UI components, including character creation,
-    game display, chat interactions, and image generation.
+    game display, chat interactions, and image display. The game itself
+    is played by a headless GameSession kept in the session state; the
+    script thread has no event loop, so its coroutines are run to
+    completion with asyncio.run.
     """
     
     def __init__(self):
         """Initialize the GameMasterUI and set up session state variables."""
         self._initialize_session_state()
-        self.rate_limiter = RateLimiter(2.0)  # 2 requests per second
+        # Metrics exporters are shared by the whole process and only started once
+        start_exporters()
 
     def _initialize_session_state(self):
         """
         Initialize all session state variables needed for the application.
         
-        This includes messages, services, character information, and UI state.
-        """
-        if 'messages' not in st.session_state:
-            st.session_state.messages = []
-        if 'agent' not in st.session_state:
-            st.session_state.agent = BedrockAgent()
-        if 'storage' not in st.session_state:
-            st.session_state.storage = StorageService()
-        if 'image_service' not in st.session_state:
-            st.session_state.image_service = ImageService()
-        if 'name' not in st.session_state:
-            st.session_state.name = None
+        This includes the game session and the UI state.
+        """
+        if 'game' not in st.session_state:
+            shared_game = self._load_shared_game()
+            st.session_state.game = shared_game or GameSession()
+            if shared_game and shared_game.character:
+                st.session_state.character_created = True
+                st.session_state.current_page = 'game'
         if 'character_created' not in st.session_state:
             st.session_state.character_created = False
         if 'current_page' not in st.session_state:
             st.session_state.current_page = 'character_creation'
-        if 'launch_prompt_sent' not in st.session_state:
-            st.session_state.launch_prompt_sent = False
-        if 'suggestions' not in st.session_state:
-            st.session_state.suggestions = []
-        if 'last_message_had_suggestions' not in st.session_state:
-            st.session_state.last_message_had_suggestions = False
-        if 'generated_images' not in st.session_state:
-            st.session_state.generated_images = {}  # Store images by message index
+
+    @staticmethod
+    def _load_shared_game():
+        """
+        Pick up the game named in the page URL from the shared session store.
+        
+        Returns:
+            GameSession: The game, e.g. after a reload served by another replica,
+                or None if there is no such game or sessions are not shared
+        """
+        store = get_session_store()
+        game_id = st.query_params.get('game')
+        if store is None or not game_id:
+            return None
+        try:
+            state = store.load(game_id)
+            if not state:
+                return None
+            game = GameSession(game_id=game_id, store=store)
+            game.restore_state(state)
+        except Exception as e:
+            logger.exception(f"Error loading shared game {game_id}: {str(e)}")
+            return None
+        return game
+
+    @staticmethod
+    def _share_game_url():
+        """
+        Name the game in the page URL, so a reload on any replica picks it up.
+        """
+        if get_session_store() is not None:
+            st.query_params['game'] = st.session_state.game.game_id
 
     def _display_character_creation_page(self):
         """
@@ -84,8 +109,6 @@ class GameMasterUI:
         
         # Player name input
         name_input = st.text_input("What is your name adventurer?", key="name_input")
-        if name_input:
-            st.session_state.name = name_input
             
         # Race, Class, and Gender selection
         col1, col2, col3 = st.columns(3)
@@ -179,13 +202,13 @@ class GameMasterUI:
             
             # Show saving message
             with st.spinner("Saving your character..."):
-                success = asyncio.run(self._create_character_async(specs))
+                success = asyncio.run(st.session_state.game.create_character(specs))
             
             if success:
                 st.success(f"Character saved successfully! Preparing your adventure...")
                 st.session_state.character_created = True
-                st.session_state.current_character = specs
                 st.session_state.current_page = 'game'
+                self._share_game_url()
                 
                 # Use a short delay to ensure the success message is seen
                 time.sleep(1)
@@ -194,56 +217,24 @@ class GameMasterUI:
                 st.rerun()
             else:
                 st.error("Failed to save character. Please try again.")
-    
-    
-    async def _create_character_async(self, character):
-        """
-        Asynchronously create a character using the MCP client.
         
-        Args:
-            character (dict): Character specifications
-                
-        Returns:
-            bool: True if character creation was successful, False otherwise
-        """
-        async with Client("http://localhost:8081/sse") as client:
-            try:
-                # Restructure the character data to match the Java GameCharacters model
-                character_payload = {
-                    "characterId": character['character_id'],
-                    "playerId": character['name'],  # Using character name as playerId for now
-                    "name": character['name'],
-                    "race": character['race'],
-                    "characterClass": character['class'],
-                    "gender": character['gender'],
-                    "stats": {
-                        "intelligence": character['Intelligence'],
-                        "strength": character['Strength'],
-                        "dexterity": character['Dexterity'],
-                        "constitution": character['Constitution'],
-                        "wisdom": character['Wisdom'],
-                        "charisma": character['Charisma']
-                    }
-                }
-
-                # print(f"Sending character payload: {character_payload}")
-                
-                # Call the createCharacter tool with the properly structured payload
-                result = await client.call_tool(
-                    "createCharacter",
-                    {"character": character_payload}
-                )
-                
-                # print(f"Character creation result: {result}")
-                return True
-                
-            except Exception as tool_error:
-                print(f"createCharacter Tool call error: {str(tool_error)}")
-                return False
-
-
+        # Resume a previously saved game instead of creating a new character
+        if st.button("Resume Saved Game", disabled=not name_input):
+            with st.spinner("Loading your saved game..."):
+                try:
+                    resumed = asyncio.run(st.session_state.game.resume(name_input))
+                except Exception as e:
+                    resumed = None
+                    st.error(f"Error loading saved game: {str(e)}")
             
-    
+            if resumed:
+                st.session_state.character_created = True
+                st.session_state.current_page = 'game'
+                self._share_game_url()
+                st.rerun()
+            elif resumed is False:
+                st.warning(f"No saved game found for {name_input}.")
+
     def _display_game_page(self):
         """
         Display the main game interface.
@@ -251,16 +242,18 @@ class GameMasterUI:
         Includes the character sidebar, chat history, suggestion buttons,
         and text input for player actions.
         """
+        game = st.session_state.game
+        
         # Setup sidebar with character info first
         with st.sidebar:
-            st.title(st.session_state.current_character['name'])
-            st.write(f"**{st.session_state.current_character['race']} {st.session_state.current_character['class']}**")
-            st.write(f"**Gender:** {st.session_state.current_character['gender']}")
+            st.title(game.character['name'])
+            st.write(f"**{game.character['race']} {game.character['class']}**")
+            st.write(f"**Gender:** {game.character['gender']}")
             
             st.divider()
 
             # Display character stats with modifiers
-            for stat, value in st.session_state.current_character.items():
+            for stat, value in game.character.items():
                 if stat not in ['character_id', 'name', 'race', 'class', 'gender']:
                     try:
                         stat_value = int(value)
@@ -272,21 +265,35 @@ class GameMasterUI:
                         continue
 
             st.button("Save Game", on_click=self.save_game)
+            self._display_save_status()
+            
+            if SPECULATION_CONFIG['enabled']:
+                metrics = SPECULATION_METRICS.snapshot()
+                st.caption(
+                    f"Speculation: {metrics['hit_rate']:.0%} hit rate, "
+                    f"{metrics['issued']} calls, {metrics['denied']} over budget"
+                )
+            
+            if METRICS_CONFIG['debug_panel']:
+                self._display_metrics_panel()
 
         # Main game area
         self._display_chat_history()
         
-        # Debug information about suggestions
-        print(f"Current suggestions in session state: {st.session_state.suggestions}")
+        # Swap in the agent's suggestions as soon as they are ready
+        if game.collect_suggestions():
+            self._poll_suggestions()
+        
+        game.prefetch_suggestion_responses()
         
         # Display suggestion buttons if available - make them more prominent
-        if st.session_state.suggestions and len(st.session_state.suggestions) > 0:
+        if game.suggestions and len(game.suggestions) > 0:
             
             # Create a container with a light background for better visibility
             suggestion_container = st.container()
             with suggestion_container:
-                cols = st.columns(min(3, len(st.session_state.suggestions)))
-                for i, suggestion in enumerate(st.session_state.suggestions[:3]):  # Limit to 3 suggestions
+                cols = st.columns(min(3, len(game.suggestions)))
+                for i, suggestion in enumerate(game.suggestions[:3]):  # Limit to 3 suggestions
                     with cols[i]:
                         if st.button(suggestion, key=f"suggestion_{i}", use_container_width=True):
                             self._handle_user_input(suggestion)
@@ -296,11 +303,7 @@ class GameMasterUI:
             # If no suggestions are available, show a message and default suggestions
             st.warning("No specific suggestions available. Here are some general actions you can take:")
             
-            default_suggestions = [
-                "Explore the area",
-                "Talk to someone nearby",
-                "Check your inventory"
-            ]
+            default_suggestions = DEFAULT_SUGGESTIONS
             
             suggestion_container = st.container()
             with suggestion_container:
@@ -317,61 +320,13 @@ class GameMasterUI:
             self._handle_user_input(prompt)
             
 
-    def _generate_suggestions(self, context):
+    @st.fragment(run_every=1.0)
+    def _poll_suggestions(self):
         """
-        Generate action suggestions based on the current context.
-        
-        Args:
-            context (str): The current game context (usually the last AI response)
-            
-        This method uses the AI to generate contextually relevant action suggestions
-        for the player to choose from.
+        Poll the pending agent suggestions and rerun the page once they are ready.
         """
-        try:
-            character = st.session_state.current_character
-            suggestion_prompt = SUGGESTION_PROMPT.format(
-                player_name=character['name'],
-                player_race=character['race'],
-                player_class=character['class'],
-                player_gender=character['gender'],
-                context=context
-            )
-            
-            print(f"Generating suggestions based on context: {context[:100]}...")
-            
-            with st.spinner("Generating suggestions..."):
-                suggestions_text = st.session_state.agent.get_response(suggestion_prompt)
-                print(f"Raw suggestions response: {suggestions_text}")
-                
-                # Extract suggestions using regex
-                suggestions = re.findall(r'\d+\.\s+(.*?)(?=\n\d+\.|\Z)', suggestions_text, re.DOTALL)
-                
-                # Clean up suggestions
-                suggestions = [s.strip() for s in suggestions if s.strip()]
-                print(f"Extracted suggestions: {suggestions}")
-                
-                if suggestions:
-                    st.session_state.suggestions = suggestions[:3]  # Limit to 3 suggestions
-                else:
-                    # Fallback if no suggestions were extracted
-                    st.session_state.suggestions = [
-                        "Explore the area",
-                        "Talk to someone nearby",
-                        "Check your inventory"
-                    ]
-                    print("Using fallback suggestions")
-            
-            print(f"Final suggestions set: {st.session_state.suggestions}")
-        except Exception as e:
-            error_msg = f"Error generating suggestions: {str(e)}"
-            print(error_msg)
-            # Provide default suggestions if generation fails
-            st.session_state.suggestions = [
-                "Explore the area",
-                "Talk to someone nearby",
-                "Check your inventory"
-            ]
-            print("Using default suggestions due to error")
+        if not st.session_state.game.collect_suggestions():
+            st.rerun()
 
     def run(self):
         """
@@ -396,41 +351,17 @@ class GameMasterUI:
             game_container = st.container()
             
             with game_container:
-                if not st.session_state.launch_prompt_sent:
+                if not st.session_state.game.launched:
                     # Show loading state
                     st.title("Game Master")  # Display title once
                     st.markdown("## Preparing Your Adventure")
                     with st.spinner("The Game Master is preparing your adventure..."):
-                        character = st.session_state.current_character
-                        print("****"+str(character))
-                        
-                        # Set character info in the image service for consistent image generation
-                        st.session_state.image_service.set_character_info(character)
-                        
-                        launch_prompt = LAUNCH_PROMPT.format(
-                            player_name=character['name'],
-                            player_race=character['race'],
-                            player_class=character['class'],
-                            player_gender=character['gender']
-                        )
-                        
-                        response = st.session_state.agent.get_response(launch_prompt)
+                        # The first image and suggestions are queued along with the opening scene
+                        response = asyncio.run(st.session_state.game.launch())
                         if response:
-                            # Add the initial message
-                            message_index = len(st.session_state.messages)
-                            st.session_state.messages.append({"role": "assistant", "content": response})
-                            
-                            # Generate image for the initial message
-                            with st.spinner("Generating your first adventure image..."):
-                                image = st.session_state.image_service.generate_image(response)
-                                if image:
-                                    # Store the generated image
-                                    st.session_state.generated_images[message_index] = image
-                            
-                            st.session_state.launch_prompt_sent = True
-                            
-                            # Generate initial suggestions based on the first response
-                            self._generate_suggestions(response)
+                            # Show the opening scene while the image is being generated
+                            with st.chat_message("assistant"):
+                                st.markdown(response)
                             
                             st.rerun()
                 else:
@@ -438,40 +369,45 @@ class GameMasterUI:
                     st.title("Game Master")  # Display title once
                     self._display_game_page()
 
-    def _generate_and_display_image(self, text, message_index):
+    def _display_image(self, message_index):
         """
-        Generate and display an image based on the text.
+        Display the image for a message, or a placeholder while it is generated.
         
         Args:
-            text (str): The text to generate an image from
             message_index (int): The index of the message in the chat history
             
-        This method checks if an image already exists for the message,
-        and only generates a new one if needed.
+        The game session only queues a new image if needed. Generation is
+        never waited on: the image is filled in by a later rerun once its
+        job is done.
         """
-        # Check if we already have this image generated
-        if message_index in st.session_state.generated_images:
-            # Use the stored image
-            image = st.session_state.generated_images[message_index]
+        image, status = st.session_state.game.image(message_index)
+        
+        if status == ImageJobService.READY:
+            if image is None:
+                st.caption("Could not load the image for this response")
+                return
+            # Use the stored thumbnail, sent to the browser as is
             st.image(
                 image,
                 use_container_width=True,
-                output_format="PNG",
+                output_format="auto",
                 clamp=True
             )
+        elif status == ImageJobService.PENDING:
+            st.info("🎨 Painting the scene...")
         else:
-            # Generate a new image if we don't have it yet
-            with st.spinner("Generating image..."):
-                image = st.session_state.image_service.generate_image(text)
-                if image:
-                    # Store the image for future use
-                    st.session_state.generated_images[message_index] = image
-                    st.image(
-                        image,
-                        use_container_width=True,
-                        output_format="PNG",
-                        clamp=True
-                    )
+            st.caption("Could not generate image for this response")
+
+    @st.fragment(run_every=1.0)
+    def _poll_image_jobs(self):
+        """
+        Poll the background image jobs and rerun the page once they are done.
+        
+        This fragment is only rendered while jobs are pending, so the timer
+        stops as soon as every image has been filled in.
+        """
+        if not st.session_state.game.has_pending_images():
+            st.rerun()
 
     def _display_message(self, message, index):
         """
@@ -492,117 +428,129 @@ class GameMasterUI:
                 
                 # Generated image in right column
                 with right_col:
-                    self._generate_and_display_image(message["content"], index)
+                    self._display_image(index)
             else:
                 # Player's messages use full width
                 st.markdown(message["content"])
 
-    def _display_chat_history(self):
+    def _display_earlier_messages(self, end):
         """
-        Display all messages in the chat history with their images.
+        Display a selector for the messages before the window, and the selected page.
+        
+        Args:
+            end (int): Index of the first message of the window
+            
+        Only the selected page is rendered, so older messages and their
+        images cost nothing on reruns while they are collapsed.
         """
-        for i, message in enumerate(st.session_state.messages):
-            self._display_message(message, i)
+        page_size = max(GAME_CONFIG['history_page_size'], 1)
+        pages = [(start, min(start + page_size, end)) for start in range(0, end, page_size)]
+        options = [None] + list(range(len(pages)))
+        # The options grow with the game, which makes Streamlit recreate the widget,
+        # so the selection is kept separately and passed back as its default
+        selected = st.session_state.get('history_page')
+        page = st.selectbox(
+            "Earlier messages",
+            options=options,
+            index=options.index(selected) if selected in options else 0,
+            format_func=lambda i: "Hidden" if i is None else f"Messages {pages[i][0] + 1}–{pages[i][1]}"
+        )
+        st.session_state.history_page = page
+        st.caption(f"{end} earlier messages")
+        if page is None:
+            return
+        
+        start, stop = pages[page]
+        for i in range(start, stop):
+            self._display_message(st.session_state.game.messages[i], i)
+        st.divider()
 
-    def save_game(self):
+    def _display_metrics_panel(self):
         """
-        Save the current game session to a PDF file in S3.
+        Display the latency and cost metrics of the process, to see where a turn's time goes.
+        """
+        with st.expander("📊 Performance"):
+            rows = []
+            for operation, stats in METRICS.snapshot().items():
+                rows.append({
+                    'operation': operation,
+                    'calls': stats['calls'],
+                    'errors': stats['errors'],
+                    'retries': stats['retries'],
+                    'throttles': stats['throttles'],
+                    'hedges': stats['hedges'],
+                    'rejected': stats['rejections'],
+                    'p50 (s)': stats['latency_seconds']['p50'],
+                    'p95 (s)': stats['latency_seconds']['p95'],
+                    'p99 (s)': stats['latency_seconds']['p99'],
+                    'first chunk p50 (s)': stats['time_to_first_chunk_seconds']['p50'],
+                    'tokens in/out': f"{stats['input_tokens']}/{stats['output_tokens']}"
+                })
+            if rows:
+                st.dataframe(rows, hide_index=True)
+            else:
+                st.caption("No calls recorded yet")
+            circuits = open_circuits()
+            if circuits:
+                st.caption("Circuits not closed: " + ", ".join(f"{name} ({state})" for name, state in circuits.items()))
+
+    def _display_chat_history(self):
+        """
+        Display the latest messages in the chat history with their images.
         
-        Displays success or error messages to the user.
+        Older messages are collapsed into pages, so the cost of a rerun does
+        not grow with the length of the game.
         """
-        if not st.session_state.messages:
-            st.warning("No conversation to save!")
-            return
+        messages = st.session_state.game.messages
+        window_start = max(len(messages) - GAME_CONFIG['history_window'], 0)
+        if window_start:
+            self._display_earlier_messages(window_start)
         
-        success, result = st.session_state.storage.save_game_session(
-            st.session_state.messages,
-            st.session_state.name
-        )
+        for i in range(window_start, len(messages)):
+            self._display_message(messages[i], i)
         
-        if success:
-            st.success(f"Game saved successfully as {result}!")
-        else:
-            st.error(f"Error saving game: {result}")
+        # Fill in placeholders as soon as their images are ready
+        if st.session_state.game.has_pending_images():
+            self._poll_image_jobs()
 
-    @retry(
-            stop=stop_after_attempt(3),
-            wait=wait_exponential(multiplier=1, min=4, max=10),
-            reraise=True
-        )
-    def _get_ai_response_with_retry(self, prompt: str) -> str:
+    def save_game(self):
         """
-        Get AI response with exponential backoff retry mechanism.
+        Save the current game session to a PDF file in S3.
         
-        Args:
-            prompt (str): The user input prompt
-            
-        Returns:
-            str: The AI response
-            
-        Raises:
-            EventStreamError: If all retry attempts fail
+        The save runs in the background; its progress is shown by
+        _display_save_status.
         """
-        try:
-            # Add jitter to prevent thundering herd
-            jitter = random.uniform(0.1, 0.5)
-            time.sleep(jitter)
-            
-            # Wait if rate limit requires
-            wait_time = self.rate_limiter.acquire()
-            if wait_time > 0:
-                time.sleep(wait_time)
-                
-            return st.session_state.agent.get_response(prompt)
-            
-        except EventStreamError as e:
-            if "throttlingException" in str(e):
-                print(f"Rate limit hit, retrying with backoff: {str(e)}")
-                raise  # This will trigger the retry
-            raise  # Re-raise other EventStreamErrors
+        if not st.session_state.game.request_save():
+            st.warning("No conversation to save!")
 
-    def _process_successful_response(self, response: str) -> None:
+    def _display_save_status(self):
         """
-        Process a successful AI response.
-        
-        Args:
-            response (str): The AI response to process
+        Display the status of the background game save.
         """
-        # Add the new message to chat history
-        message_index = len(st.session_state.messages)
-        st.session_state.messages.append({"role": "assistant", "content": response})
-        
-        # Generate image with rate limiting
-        try:
-            with st.spinner("Generating image for the new response..."):
-                if 'generated_images' not in st.session_state:
-                    st.session_state.generated_images = {}
-                
-                # Add delay before image generation to prevent rate limiting
-                time.sleep(1)
-                image = st.session_state.image_service.generate_image(response)
-                
-                if image:
-                    st.session_state.generated_images[message_index] = image
-                else:
-                    st.warning("Could not generate image for this response")
-        except Exception as e:
-            st.warning(f"Error generating image: {str(e)}")
-            
-        # Generate suggestions with rate limiting
-        try:
-            # Add delay before generating suggestions
-            time.sleep(1)
-            self._generate_suggestions(response)
-        except Exception as e:
-            st.warning(f"Error generating suggestions: {str(e)}")
-            
-        # Rerun if we have messages
-        if st.session_state.messages:
+        storage = st.session_state.game.storage
+        if storage.is_saving():
+            self._poll_save_status()
+        elif storage.save_status == StorageService.SAVED:
+            st.success(f"Game saved successfully as {storage.last_save_result[1]}!")
+        elif storage.save_status == StorageService.FAILED:
+            st.error(f"Error saving game: {storage.last_save_result[1]}")
+
+    @st.fragment(run_every=1.0)
+    def _poll_save_status(self):
+        """
+        Show a progress indicator until the background save is done, then rerun the page.
+        """
+        storage = st.session_state.game.storage
+        if not storage.is_saving():
             st.rerun()
+        elif storage.save_status == StorageService.SAVING:
+            st.info("⏳ Saving game...")
+        else:
+            st.info("⏳ Save queued...")
 
     def _handle_user_input(self, prompt: str) -> None:
         """
-        Process user input and get AI response with rate limiting and retries.
+        Play the user's input as a turn, rendering the response as it streams in.
         
         Args:
             prompt (str): The user's input text
@@ -611,60 +559,34 @@ class GameMasterUI:
             if not prompt or not isinstance(prompt, str):
                 st.error("Invalid input. Please provide a valid text message.")
                 return
-
-            # Add user message to chat history
-            if 'messages' not in st.session_state:
-                st.session_state.messages = []
-            st.session_state.messages.append({"role": "user", "content": prompt})
             
-            # Clear suggestions
-            if 'suggestions' not in st.session_state:
-                st.session_state.suggestions = []
-            st.session_state.suggestions.clear()
+            with st.chat_message("user"):
+                st.markdown(prompt)
             
-            # Get AI response with retry mechanism
-            response = None
-            with st.spinner("Thinking..."):
+            # Get AI response with retry mechanism, then render it as it streams in
+            with st.chat_message("assistant"):
                 try:
-                    response = self._get_ai_response_with_retry(prompt)
-                    if not response:
+                    with st.spinner("Thinking..."):
+                        stream = asyncio.run(st.session_state.game.start_turn(prompt))
+                    if stream is None:
                         st.warning("Received empty response from AI agent")
                         return
+                    # In combined mode only the narrative is streamed, the suggestions become buttons
+                    response = st.write_stream(stream)
+                except CircuitOpenError as e:
+                    st.warning(f"The Game Master is overwhelmed and resting for a moment: {str(e)}")
+                    return
                 except Exception as e:
                     st.error(f"Error getting AI response: {str(e)}")
                     return
-                
-            # Process response if successful
+            
+            # The game session has recorded the response, show it with its image
             if response:
-                self._process_successful_response(response)
+                st.rerun()
 
         except Exception as e:
             st.error(f"An unexpected error occurred: {str(e)}")
 
-class RateLimiter:
-    def __init__(self, tokens_per_second: float):
-        self.tokens_per_second = tokens_per_second
-        self.tokens = tokens_per_second
-        self.last_update = time.time()
-
-    def acquire(self) -> float:
-        """
-        Acquire a token and return the time to wait if necessary.
-        
-        Returns:
-            float: Time to wait in seconds before proceeding
-        """
-        now = time.time()
-        time_passed = now - self.last_update
-        self.tokens = min(self.tokens_per_second,
-                         self.tokens + time_passed * self.tokens_per_second)
-        self.last_update = now
-
-        if self.tokens < 1:
-            return (1 - self.tokens) / self.tokens_per_second
-        else:
-            self.tokens -= 1
-            return 0
 
 def main():
     """
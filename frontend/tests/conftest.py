@@ -0,0 +1,5 @@
+import os
+
+# Tests never reach AWS: any client created while importing the services is an offline stand-in
+os.environ.setdefault('BACKEND_MODE', 'offline')
+os.environ.setdefault('OFFLINE_LATENCY_SCALE', '0')
@@ -0,0 +1,45 @@
+import os
+from src.services.cache_service import DiskCache
+
+
+def test_put_and_get(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1024)
+    cache.put("a", b"alpha")
+    assert cache.get("a") == b"alpha"
+    assert cache.get("missing") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    cache.get("a")  # b is now the least recently used
+    cache.put("c", b"cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert not os.path.exists(tmp_path / "b")
+
+
+def test_entries_survive_a_restart(tmp_path):
+    DiskCache(str(tmp_path), max_bytes=1024).put("a", b"alpha")
+    assert DiskCache(str(tmp_path), max_bytes=1024).get("a") == b"alpha"
+
+
+def test_entry_removed_from_disk_is_a_miss(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1024)
+    cache.put("a", b"alpha")
+    os.remove(tmp_path / "a")
+    assert cache.get("a") is None
+    cache.put("b", b"b" * 1024)  # The lost entry no longer counts toward the limit
+    assert cache.get("b") == b"b" * 1024
+
+
+def test_make_key_depends_on_every_part():
+    key = DiskCache.make_key("model", {"width": 512, "height": 512}, "a castle")
+    assert key == DiskCache.make_key("model", {"height": 512, "width": 512}, "a castle")
+    assert key != DiskCache.make_key("model", {"width": 512, "height": 512}, "a castle", 1)
+
+
+def test_shared_returns_one_instance_per_directory(tmp_path):
+    assert DiskCache.shared(str(tmp_path), 1024) is DiskCache.shared(str(tmp_path), 2048)
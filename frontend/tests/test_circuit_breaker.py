@@ -0,0 +1,120 @@
+import time
+import pytest
+from botocore.exceptions import ClientError
+from src.services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    get_circuit_breaker,
+    open_circuits
+)
+
+
+def _breaker(**kwargs):
+    breaker = CircuitBreaker("test-model", failure_threshold=2, reset_seconds=0.05, **kwargs)
+    breaker.enabled = True
+    return breaker
+
+
+def _client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "InvokeModel")
+
+
+def test_opens_after_consecutive_failures():
+    breaker = _breaker()
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.is_open()
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_check_raises_while_open():
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.check()
+    assert error.value.name == "test-model"
+    assert 0 < error.value.retry_after <= 0.05
+
+
+def test_single_trial_call_after_the_reset_time():
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert not breaker.is_open()
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # Only one trial at a time
+
+
+def test_trial_success_closes_the_circuit():
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_trial_failure_opens_the_circuit_again():
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_lost_trial_is_retried_after_the_reset_time():
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()  # This trial never reports back
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_invalid_requests_do_not_count():
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record_failure(_client_error("ValidationException"))
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure(_client_error("ThrottlingException"))
+    breaker.record_failure(_client_error("ServiceUnavailableException"))
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_disabled_breaker_always_allows():
+    breaker = _breaker()
+    breaker.enabled = False
+    for _ in range(5):
+        breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.is_open()
+
+
+def test_breakers_are_shared_per_model():
+    breaker = get_circuit_breaker("test-shared-model")
+    assert breaker is get_circuit_breaker("test-shared-model")
+    breaker.enabled = True
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert open_circuits()["test-shared-model"] == CircuitBreaker.OPEN
+    breaker.record_success()
+    assert "test-shared-model" not in open_circuits()
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import uuid
+from concurrent.futures import Future
+import pytest
+from src.config.aws_config import SPECULATION_CONFIG
+from src.config.prompts import SUGGESTIONS_DELIMITER
+from src.engine.game_session import GameSession
+from src.services.circuit_breaker import CircuitOpenError
+
+
+def _character(name="Aria"):
+    return {
+        'character_id': str(uuid.uuid4()),
+        'name': name,
+        'race': "Elf",
+        'class': "Ranger",
+        'gender': "Female",
+        'Intelligence': 12,
+        'Strength': 10,
+        'Dexterity': 16,
+        'Constitution': 11,
+        'Wisdom': 14,
+        'Charisma': 9
+    }
+
+
+async def _launched_game():
+    game = GameSession(store=None)
+    assert await game.create_character(_character())
+    assert await game.launch()
+    return game
+
+
+async def _play(game, action):
+    stream = await game.start_turn(action)
+    assert stream is not None
+    return "".join([delta async for delta in stream])
+
+
+def _record_prompts(monkeypatch, game):
+    prompts = []
+    stream_response = game.agent.stream_response
+
+    def recording(prompt, session_id=None):
+        prompts.append(prompt)
+        return stream_response(prompt, session_id=session_id)
+
+    monkeypatch.setattr(game.agent, 'stream_response', recording)
+    return prompts
+
+
+def test_offline_turn_is_recorded_with_its_suggestions():
+    async def scenario():
+        game = await _launched_game()
+        response = await _play(game, "I look around")
+        suggestions = await game.settle_suggestions()
+        return game, response, suggestions
+
+    game, response, suggestions = asyncio.run(scenario())
+    assert [message['role'] for message in game.messages] == ["assistant", "user", "assistant"]
+    assert game.messages[1]['content'] == "I look around"
+    assert game.messages[2]['content'] == response.strip()
+    assert SUGGESTIONS_DELIMITER not in response
+    assert len(suggestions) == 3
+
+
+def test_turn_drops_the_suggestions_of_the_previous_turn():
+    async def scenario():
+        game = await _launched_game()
+        stale_job = Future()
+        game.suggestions = ["A stale suggestion"]
+        game.suggestion_job = stale_job
+        stream = await game.start_turn("I open the door")
+        # Cleared before the response is read, so no stale button can be clicked meanwhile
+        assert game.suggestions == [] and game.suggestion_job is None
+        assert game.messages[-1] == {"role": "user", "content": "I open the door"}
+        response = "".join([delta async for delta in stream])
+        # Suggestions of the previous turn arriving late are ignored
+        stale_job.set_result(["A late suggestion"])
+        game.collect_suggestions()
+        return game, response, await game.settle_suggestions()
+
+    game, response, suggestions = asyncio.run(scenario())
+    assert game.messages[-1] == {"role": "assistant", "content": response.strip()}
+    assert suggestions and "A late suggestion" not in suggestions
+    assert "A stale suggestion" not in suggestions
+
+
+def test_speculative_hit_is_folded_into_the_next_prompt(monkeypatch):
+    monkeypatch.setitem(SPECULATION_CONFIG, 'enabled', True)
+
+    async def scenario():
+        game = await _launched_game()
+        prompts = _record_prompts(monkeypatch, game)
+        speculated = f"The door creaks open.\n{SUGGESTIONS_DELIMITER}\n1. Step inside\n2. Listen\n3. Leave"
+        monkeypatch.setattr(
+            game.speculation, 'take',
+            lambda context, action, timeout: speculated if action == "I knock on the door" else None
+        )
+        hit = await _play(game, "I knock on the door")
+        assert prompts == []  # Answered without calling the agent
+        assert game.speculative_turns == [("I knock on the door", "The door creaks open.")]
+        assert game.suggestions == ["Step inside", "Listen", "Leave"]
+        await _play(game, "I step inside")
+        return game, hit, prompts
+
+    game, hit, prompts = asyncio.run(scenario())
+    assert hit.strip() == "The door creaks open."
+    assert len(prompts) == 1
+    assert "I knock on the door" in prompts[0] and "The door creaks open." in prompts[0]
+    assert "Step inside" not in prompts[0]
+    assert prompts[0].index("The door creaks open.") < prompts[0].index("I step inside")
+    assert game.speculative_turns == []
+
+
+def test_open_circuit_is_not_retried(monkeypatch):
+    async def scenario():
+        game = await _launched_game()
+        calls = []
+
+        def open_circuit(prompt, session_id=None):
+            calls.append(prompt)
+            raise CircuitOpenError("agent", 30)
+
+        monkeypatch.setattr(game.agent, 'stream_response', open_circuit)
+        with pytest.raises(CircuitOpenError):
+            await game.start_turn("I attack")
+        return calls
+
+    assert len(asyncio.run(scenario())) == 1
+
+
+def test_state_round_trip():
+    async def scenario():
+        game = await _launched_game()
+        await _play(game, "I look around")
+        await game.settle_suggestions()
+        game.speculative_turns.append(("I wave", "Nobody waves back."))
+        return game
+
+    game = asyncio.run(scenario())
+    # States go through JSON in the session store
+    state = json.loads(json.dumps(game.to_state()))
+    restored = GameSession(game_id="other", store=None)
+    restored.restore_state(state)
+    assert restored.game_id == game.game_id
+    assert restored.messages == game.messages
+    assert restored.suggestions == game.suggestions
+    assert restored.speculative_turns == [("I wave", "Nobody waves back.")]
+    assert restored.agent.session_state() == game.agent.session_state()
+    assert restored.to_state() == state
+
+
+def test_state_of_another_version_is_rejected():
+    state = GameSession(store=None).to_state()
+    state['version'] = GameSession.STATE_VERSION + 1
+    with pytest.raises(ValueError):
+        GameSession(store=None).restore_state(state)
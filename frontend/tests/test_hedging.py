@@ -0,0 +1,105 @@
+import threading
+import time
+import pytest
+from src.config.aws_config import HEDGING_CONFIG
+from src.services import hedging
+from src.services.hedging import hedged_call
+from src.services.metrics_service import METRICS
+from src.services.rate_limiter import RateLimiter
+from src.services.speculation_service import SpeculationBudget
+
+
+OPERATION = "test.hedged"
+
+
+@pytest.fixture(autouse=True)
+def hedged_operation(monkeypatch):
+    monkeypatch.setitem(HEDGING_CONFIG, 'operations', [OPERATION])
+    monkeypatch.setitem(HEDGING_CONFIG, 'min_samples', 10 ** 6)  # Always use the default delay
+    monkeypatch.setitem(HEDGING_CONFIG, 'default_delay_seconds', 0.05)
+    monkeypatch.setattr(hedging, '_HEDGE_BUDGET', SpeculationBudget(100))
+
+
+class Calls:
+    """
+    Callable whose attempts take the given durations and outcomes, in order.
+    """
+
+    def __init__(self, *attempts):
+        self.attempts = list(attempts)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            duration, outcome = self.attempts[self.count]
+            self.count += 1
+        time.sleep(duration)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _hedges():
+    return METRICS.snapshot().get(OPERATION, {}).get('hedges', 0)
+
+
+def test_operations_not_configured_are_called_once():
+    calls = Calls((0.2, "primary"), (0, "hedge"))
+    assert hedged_call("test.not_hedged", calls) == "primary"
+    assert calls.count == 1
+
+
+def test_fast_call_is_not_hedged():
+    calls = Calls((0, "primary"), (0, "hedge"))
+    assert hedged_call(OPERATION, calls) == "primary"
+    assert calls.count == 1
+
+
+def test_slow_call_is_hedged_and_the_first_success_wins():
+    hedges = _hedges()
+    calls = Calls((0.5, "primary"), (0, "hedge"))
+    assert hedged_call(OPERATION, calls) == "hedge"
+    assert calls.count == 2
+    assert _hedges() == hedges + 1
+
+
+def test_call_failing_fast_with_a_timeout_is_not_hedged():
+    calls = Calls((0, TimeoutError("socket timed out")), (0, "hedge"))
+    with pytest.raises(TimeoutError):
+        hedged_call(OPERATION, calls)
+    assert calls.count == 1
+
+
+def test_failed_hedge_falls_back_to_the_primary():
+    calls = Calls((0.2, "primary"), (0, RuntimeError("hedge failed")))
+    assert hedged_call(OPERATION, calls) == "primary"
+
+
+def test_error_of_the_primary_is_raised_when_both_fail():
+    calls = Calls((0.1, ValueError("primary failed")), (0, RuntimeError("hedge failed")))
+    with pytest.raises(ValueError):
+        hedged_call(OPERATION, calls)
+
+
+def test_no_hedge_once_the_budget_is_spent(monkeypatch):
+    monkeypatch.setattr(hedging, '_HEDGE_BUDGET', SpeculationBudget(0))
+    calls = Calls((0.2, "primary"), (0, "hedge"))
+    assert hedged_call(OPERATION, calls) == "primary"
+    assert calls.count == 1
+
+
+def test_no_hedge_without_a_rate_limit_token():
+    limiter = RateLimiter(0.001, capacity=1)
+    limiter.acquire()
+    calls = Calls((0.2, "primary"), (0, "hedge"))
+    assert hedged_call(OPERATION, calls, limiter) == "primary"
+    assert calls.count == 1
+
+
+def test_delay_follows_the_measured_p95(monkeypatch):
+    monkeypatch.setitem(HEDGING_CONFIG, 'min_samples', 1)
+    with METRICS.trace("test.delay"):
+        pass
+    assert hedging.hedge_delay("test.delay") < 0.05
+    assert hedging.hedge_delay("test.unmeasured") == 0.05
@@ -0,0 +1,113 @@
+import io
+import pytest
+from PIL import Image as PILImage
+from src.services.cache_service import DiskCache
+from src.services.image_store import ImageStore
+
+
+def _image(seed, size=256):
+    image = PILImage.frombytes('RGB', (size, size), bytes((seed * 37 + i) % 256 for i in range(size * size * 3)))
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    def make(spill_max_bytes=10 ** 8, **kwargs):
+        store = ImageStore(thumbnail_size=64, **kwargs)
+        # A spill directory of the test's own, rather than the process-wide one
+        store.originals_cache = DiskCache(str(tmp_path / 'spill'), max_bytes=spill_max_bytes)
+        return store
+    return make
+
+
+def test_only_a_downscaled_thumbnail_is_kept_in_memory(make_store):
+    store = make_store()
+    image = _image(1)
+    store.put(3, image)
+    with PILImage.open(store.thumbnail(3)) as thumbnail:
+        assert max(thumbnail.size) <= 64
+    assert 0 < store.memory_bytes() < len(image.getvalue())
+    assert 3 in store and len(store) == 1
+
+
+def test_originals_are_spilled_to_the_disk_cache(make_store):
+    store = make_store()
+    image = _image(1)
+    store.put(3, image)
+    original = store.originals()[3]
+    assert store.originals_cache.get(original.key) == image.getvalue()
+    assert original.getvalue() == image.getvalue()
+
+
+def test_thumbnails_over_the_memory_cap_are_evicted(make_store):
+    probe = make_store()
+    probe.put(0, _image(0))
+    thumbnail_bytes = probe.memory_bytes()
+
+    store = make_store(max_memory_bytes=int(thumbnail_bytes * 2.5))
+    for index in range(4):
+        store.put(index, _image(index))
+    assert store.memory_bytes() <= store.max_memory_bytes
+    assert list(store._thumbnails) == [2, 3]
+    # Evicted thumbnails are rebuilt from their originals, evicting the least recently used
+    assert store.thumbnail(0) is not None
+    assert list(store._thumbnails) == [3, 0]
+    assert len(store) == 4
+
+
+def test_newest_thumbnail_is_kept_even_over_the_cap(make_store):
+    store = make_store(max_memory_bytes=1)
+    store.put(0, _image(0))
+    store.put(1, _image(1))
+    assert list(store._thumbnails) == [1]
+    assert store.memory_bytes() > store.max_memory_bytes
+
+
+def test_original_evicted_from_disk_is_loaded_from_the_fallback(make_store):
+    saved = {3: _image(1)}
+    calls = []
+
+    def fallback(message_index):
+        calls.append(message_index)
+        return io.BytesIO(saved[message_index].getvalue())
+
+    store = make_store(fallback=fallback)
+    store.put(3, saved[3])
+    original = store.originals()[3]
+    store.originals_cache = DiskCache(store.originals_cache.directory + '-empty', max_bytes=10 ** 8)
+    assert original.getvalue() == saved[3].getvalue()
+    assert calls == [3]
+    # The original is spilled again, so the fallback is not called twice
+    assert original.getvalue() == saved[3].getvalue()
+    assert calls == [3]
+
+
+def test_thumbnail_is_the_last_resort_for_a_lost_original(make_store):
+    def fallback(message_index):
+        raise ConnectionError("S3 unreachable")
+
+    store = make_store(fallback=fallback)
+    store.put(3, _image(1))
+    thumbnail = store.thumbnail(3).getvalue()
+    store.originals_cache = DiskCache(store.originals_cache.directory + '-empty', max_bytes=10 ** 8)
+    assert store.originals()[3].getvalue() == thumbnail
+
+
+def test_lost_image_without_thumbnail_or_fallback_is_none(make_store):
+    store = make_store(max_memory_bytes=1)
+    store.put(0, _image(0))
+    store.put(1, _image(1))
+    store.originals_cache = DiskCache(store.originals_cache.directory + '-empty', max_bytes=10 ** 8)
+    assert store.originals()[0].getvalue() is None
+    assert store.thumbnail(0) is None
+
+
+def test_clear_forgets_every_image(make_store):
+    store = make_store()
+    store.put(0, _image(0))
+    store.clear()
+    assert len(store) == 0
+    assert store.memory_bytes() == 0
+    assert store.thumbnail(0) is None
@@ -0,0 +1,87 @@
+import threading
+import time
+from src.services.memory_service import ConversationMemory, LocalSummarizer
+
+
+class RecordingSummarizer:
+    """
+    Summarizer listing the folded turns, optionally held until released.
+    """
+
+    def __init__(self, hold=False):
+        self.calls = []
+        self.released = threading.Event()
+        if not hold:
+            self.released.set()
+
+    def summarize(self, summary, turns, max_chars):
+        self.calls.append([action for action, _ in turns])
+        self.released.wait(5)
+        return " ".join(filter(None, [summary] + [action for action, _ in turns]))
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _messages(count):
+    messages = []
+    for i in range(count):
+        messages += [{"role": "user", "content": f"a{i}"}, {"role": "assistant", "content": f"n{i}"}]
+    return messages
+
+
+def test_older_turns_are_folded_into_the_summary():
+    summarizer = RecordingSummarizer()
+    memory = ConversationMemory(summarizer=summarizer, summarize_every=2, verbatim_turns=1)
+    for i in range(3):
+        memory.add_turn(f"a{i}", f"n{i}")
+    _wait_for(lambda: memory.state()['summarized'] == 2)
+    assert summarizer.calls == [["a0", "a1"]]
+    assert memory.state() == {'summary': "a0 a1", 'summarized': 2}
+    context = memory.context()
+    assert context.startswith("Story so far: a0 a1")
+    assert "n2" in context and "n0" not in context
+
+
+def test_context_is_bounded_while_the_summary_lags():
+    summarizer = RecordingSummarizer(hold=True)
+    memory = ConversationMemory(summarizer=summarizer, summarize_every=2, verbatim_turns=1)
+    for i in range(10):
+        memory.add_turn(f"a{i}", f"n{i}")
+    context = memory.context()
+    assert "n9" in context and "n6" not in context
+    summarizer.released.set()
+
+
+def test_restore_rebuilds_the_turns():
+    memory = ConversationMemory(summarizer=LocalSummarizer(), summarize_every=10, verbatim_turns=3)
+    memory.restore(_messages(2), summary="Earlier", summarized=1)
+    assert memory.turn_count() == 2
+    assert memory.state() == {'summary': "Earlier", 'summarized': 1}
+
+
+def test_restore_during_a_summary_discards_it_without_overlap():
+    summarizer = RecordingSummarizer(hold=True)
+    memory = ConversationMemory(summarizer=summarizer, summarize_every=2, verbatim_turns=1)
+    for i in range(3):
+        memory.add_turn(f"old{i}", f"n{i}")
+    _wait_for(lambda: len(summarizer.calls) == 1)
+
+    memory.restore(_messages(6))
+    time.sleep(0.05)
+    assert len(summarizer.calls) == 1  # No second summary while the stale one runs
+
+    summarizer.released.set()
+    _wait_for(lambda: memory.state()['summarized'] == 5)
+    assert summarizer.calls[1] == ["a0", "a1", "a2", "a3", "a4"]
+    assert "old" not in memory.state()['summary']
+
+
+def test_format_turns_truncates_narratives():
+    text = ConversationMemory.format_turns([(None, "x" * 50), ("go", "short")], max_turn_chars=10)
+    assert "x" * 11 not in text
+    assert "go" in text and "short" in text
@@ -0,0 +1,87 @@
+import io
+import os
+import pytest
+from PIL import Image as PILImage
+from pypdf import PdfReader
+from src.services.pdf_service import PDFExporter, PDFService
+
+
+def _messages(count):
+    return [
+        {"role": "user" if index % 2 else "assistant", "content": f"Message number {index}"}
+        for index in range(count)
+    ]
+
+
+def _image():
+    buffer = io.BytesIO()
+    PILImage.new('RGB', (64, 64), 'red').save(buffer, format='PNG')
+    return buffer
+
+
+def _text(path):
+    return "".join(page.extract_text() for page in PdfReader(path).pages)
+
+
+@pytest.fixture
+def laid_out(monkeypatch):
+    """
+    Record the contents of the messages laid out by the exporter.
+    """
+    contents = []
+    message_paragraph = PDFService.message_paragraph
+
+    def recording(message):
+        contents.append(message['content'])
+        return message_paragraph(message)
+
+    monkeypatch.setattr(PDFService, 'message_paragraph', staticmethod(recording))
+    return contents
+
+
+def test_second_export_only_lays_out_the_new_turns(laid_out):
+    exporter = PDFExporter(part_messages=2)
+    messages = _messages(5)
+    first = exporter.export(messages)
+    assert len(laid_out) == 5
+    laid_out.clear()
+
+    messages += _messages(8)[5:]
+    second = exporter.export(messages)
+    # Messages 0-3 are in full parts; the open part (4) is laid out again with the new turns
+    assert laid_out == [f"Message number {index}" for index in range(4, 8)]
+    text = _text(second)
+    assert all(f"Message number {index}" in text for index in range(8))
+    assert _text(first).count("Message number") == 5
+    exporter.close()
+
+
+def test_late_image_lays_out_its_part_again(laid_out):
+    exporter = PDFExporter(part_messages=2)
+    messages = _messages(6)
+    exporter.export(messages)
+    laid_out.clear()
+
+    exporter.export(messages, {3: _image()})
+    assert laid_out == [f"Message number {index}" for index in range(2, 6)]
+    exporter.close()
+
+
+def test_changed_history_is_laid_out_again(laid_out):
+    exporter = PDFExporter(part_messages=2)
+    exporter.export(_messages(6))
+    laid_out.clear()
+
+    messages = _messages(6)
+    messages[0] = {"role": "assistant", "content": "A resumed story"}
+    path = exporter.export(messages)
+    assert len(laid_out) == 6
+    assert "A resumed story" in _text(path)
+    exporter.close()
+
+
+def test_empty_history_exports_a_document():
+    exporter = PDFExporter()
+    path = exporter.export([])
+    assert os.path.getsize(path) > 0
+    exporter.close()
@@ -0,0 +1,35 @@
+import asyncio
+import time
+from src.services.rate_limiter import RateLimiter, get_rate_limiter
+
+
+def test_non_blocking_acquire_fails_on_an_empty_bucket():
+    limiter = RateLimiter(1, capacity=2)
+    assert limiter.acquire(blocking=False)
+    assert limiter.acquire(blocking=False)
+    assert not limiter.acquire(blocking=False)
+
+
+def test_callers_are_spaced_out_at_the_rate():
+    limiter = RateLimiter(20, capacity=1)
+    started_at = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    # The first token is in the bucket, the next two wait 50ms each
+    assert time.monotonic() - started_at >= 0.09
+
+
+def test_async_acquire_waits_without_blocking():
+    limiter = RateLimiter(20, capacity=1)
+
+    async def acquire_twice():
+        started_at = time.monotonic()
+        await asyncio.gather(limiter.acquire_async(), limiter.acquire_async())
+        return time.monotonic() - started_at
+
+    assert asyncio.run(acquire_twice()) >= 0.04
+
+
+def test_limiters_are_shared_per_model():
+    assert get_rate_limiter("test-model") is get_rate_limiter("test-model")
+    assert get_rate_limiter("test-model") is not get_rate_limiter("other-model")
@@ -0,0 +1,56 @@
+from src.agents.response_parser import SuggestionStreamParser, parse_suggestions
+from src.config.prompts import SUGGESTIONS_DELIMITER
+
+
+def _stream(deltas):
+    parser = SuggestionStreamParser()
+    shown = list(parser.stream(deltas))
+    return parser, shown
+
+
+def test_delimiter_straddling_two_deltas():
+    parser, shown = _stream([
+        "The cave is dark.\n[SUGG",
+        "ESTIONS]\n1. Light a torch\n2. Call out\n3. Turn back"
+    ])
+    assert "".join(shown) == "The cave is dark.\n"
+    assert not any("[" in text for text in shown)
+    assert parser.suggestions == ["Light a torch", "Call out", "Turn back"]
+
+
+def test_delimiter_split_into_single_characters():
+    response = f"A goblin grins.\n{SUGGESTIONS_DELIMITER}\n1. Attack\n2. Talk\n3. Flee"
+    parser, shown = _stream(list(response))
+    assert "".join(shown) == "A goblin grins.\n"
+    assert parser.suggestions == ["Attack", "Talk", "Flee"]
+
+
+def test_text_resembling_the_delimiter_is_released():
+    parser, shown = _stream(["You read [SUG", "AR] on the jar."])
+    assert "".join(shown) == "You read [SUGAR] on the jar."
+    assert parser.suggestions == []
+
+
+def test_missing_delimiter_keeps_the_whole_narrative():
+    parser, shown = _stream(["The door creaks open", " and a draft blows [S"])
+    assert "".join(shown) == "The door creaks open and a draft blows [S"
+    assert parser.narrative == "The door creaks open and a draft blows [S"
+    assert parser.suggestions == []
+
+
+def test_more_than_three_suggestions_are_capped():
+    response = f"Night falls.\n{SUGGESTIONS_DELIMITER}\n1. Rest\n2. Keep watch\n3. Build a fire\n4. Scout\n5. Pray"
+    narrative, suggestions = SuggestionStreamParser.split(response)
+    assert narrative == "Night falls."
+    assert suggestions == ["Rest", "Keep watch", "Build a fire"]
+
+
+def test_delimiter_is_matched_case_insensitively():
+    narrative, suggestions = SuggestionStreamParser.split("Rain.\n[suggestions]\n1. Take shelter")
+    assert narrative == "Rain."
+    assert suggestions == ["Take shelter"]
+
+
+def test_parse_suggestions_without_a_list():
+    assert parse_suggestions("No numbered actions here") == []
+    assert parse_suggestions(None) == []
@@ -0,0 +1,87 @@
+import os
+import time
+import pytest
+from src.services.session_store import FileSessionStore, SQLiteSessionStore
+
+
+@pytest.fixture(params=['file', 'sqlite'])
+def make_store(request, tmp_path):
+    def make(**kwargs):
+        if request.param == 'file':
+            return FileSessionStore(str(tmp_path / 'sessions'), flush_interval=0, **kwargs)
+        return SQLiteSessionStore(str(tmp_path / 'sessions.db'), flush_interval=0, **kwargs)
+    return make
+
+
+def _state(revision, turn="Hello"):
+    return {'version': 1, 'revision': revision, 'messages': [turn]}
+
+
+def test_saved_state_is_loaded_by_another_process(make_store):
+    store = make_store()
+    store.save("game", _state(1))
+    store.flush()
+    assert make_store().load("game") == _state(1)
+
+
+def test_pending_saves_are_coalesced(make_store):
+    store = make_store()
+    store.save("game", _state(1, "first"))
+    store.save("game", _state(2, "second"))
+    assert store.load("game") == _state(2, "second")
+    store.flush()
+    assert make_store().load("game") == _state(2, "second")
+
+
+def test_older_revision_is_dropped(make_store):
+    store = make_store()
+    assert store.save("game", _state(2))
+    assert not store.save("game", _state(1))
+    store.flush()
+    assert not store.save("game", _state(2))
+    assert make_store().load("game")['revision'] == 2
+
+
+def test_write_of_an_outdated_copy_is_rejected(make_store):
+    store = make_store()
+    store.save("game", _state(1))
+    store.flush()
+    replica_a, replica_b = make_store(), make_store()
+    replica_a.load("game")
+    replica_b.load("game")
+    replica_a.save("game", _state(2, "from a"))
+    replica_a.flush()
+    replica_b.save("game", _state(3, "from b"))
+    replica_b.flush()
+    assert make_store().load("game") == _state(2, "from a")
+    # The replica that won keeps writing
+    replica_a.save("game", _state(3, "from a again"))
+    replica_a.flush()
+    assert make_store().load("game") == _state(3, "from a again")
+
+
+def test_expired_session_can_be_written_again(make_store):
+    store = make_store(ttl_seconds=0.05)
+    store.save("game", _state(5))
+    store.flush()
+    time.sleep(0.1)
+    other = make_store(ttl_seconds=0.05)
+    assert other.load("game") is None
+    other.save("game", _state(1))
+    other.flush()
+    assert other.load("game") == _state(1)
+
+
+def test_expired_sessions_are_purged(make_store):
+    store = make_store(ttl_seconds=0.05)
+    store.save("old", _state(1))
+    store.flush()
+    time.sleep(0.1)
+    store.save("new", _state(1))
+    store._last_purge = 0
+    store.flush()
+    if isinstance(store, FileSessionStore):
+        assert sorted(os.listdir(store.directory)) == ['.lock', 'new.json.gz']
+    else:
+        rows = store._connection.execute("SELECT game_id FROM sessions").fetchall()
+        assert rows == [("new",)]